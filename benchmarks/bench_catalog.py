@@ -0,0 +1,114 @@
+"""
+Save and load time of a whole catalog: a folder per dataset against one JSONL snapshot.
+
+Builds a synthetic catalog of datasets with CKAN-like metadata (a few
+resources each) and times:
+
+- save/json: pe.save(), a folder, an indented <id>.json and the index rows per dataset
+- save/jsonl and save/jsonl-stdlib: pe.save(format='jsonl'), with orjson and with json
+- load/json-lazy and load/json: pe.load() from the folders, lazy and eager
+- load/jsonl and load/jsonl-stdlib: pe.load() streaming the snapshot back
+
+and reports the size on disk and the number of files of each layout.
+
+    python benchmarks/bench_catalog.py [--datasets 5000] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+CATEGORIES = ['salud-27', 'educacion-15', 'vivienda-4', 'transporte-19', 'economia-y-finanzas-9']
+
+def make_datasets(count):
+    from openpe import Dataset
+
+    datasets = []
+    for index in range(count):
+        name = f'dataset-{index:06d}'
+        resources = [{
+            'id': f'{index:06d}-{i}',
+            'name': f'Registro de atenciones {2020 + i} - {name}',
+            'format': 'CSV' if i else 'XLSX',
+            'url': f'https://www.datosabiertos.gob.pe/sites/default/files/{name}-{i}.csv',
+            'description': 'Atenciones registradas por establecimiento, distrito y mes. ' * 3,
+            'last_modified': '2024-06-01T00:00:00',
+        } for i in range(3)]
+        metadata = {'help': '', 'success': True, 'result': [{
+            'id': f'id-{index:06d}', 'name': name, 'title': f'Atenciones {index}',
+            'notes': 'Información de las atenciones realizadas en los establecimientos de salud. ' * 4,
+            'groups': [{'name': CATEGORIES[index % len(CATEGORIES)], 'title': 'Salud'}],
+            'resources': resources,
+        }]}
+        datasets.append(Dataset(
+            id=f'id-{index:06d}', title=f'Atenciones {index}', description=metadata['result'][0]['notes'],
+            categories=[CATEGORIES[index % len(CATEGORIES)]], url=f'https://www.datosabiertos.gob.pe/dataset/{name}',
+            modified_date='2024-06-01T00:00:00', release_date='2020-01-01T00:00:00',
+            publisher='Ministerio de Salud', metadata=metadata,
+        ))
+    return datasets
+
+def folder_size(folder):
+    """Total bytes and number of files under a folder."""
+    size = files = 0
+    for root, _, names in os.walk(folder):
+        for name in names:
+            size += os.path.getsize(os.path.join(root, name))
+            files += 1
+    return size, files
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return round(time.perf_counter() - start, 4), result
+
+def run(count=5000):
+    import openpe as pe
+    from openpe import module, snapshot
+
+    datasets = make_datasets(count)
+    results = {'datasets': count, 'orjson': snapshot.orjson is not None}
+    with tempfile.TemporaryDirectory() as tmp:
+        layouts = {'json': os.path.join(tmp, 'folders'), 'jsonl': os.path.join(tmp, 'snapshot')}
+        serializer = snapshot.orjson
+        # (name, layout, use orjson, call)
+        cases = [
+            ('save/json', 'json', True, lambda: pe.save(datasets)),
+            ('save/jsonl', 'jsonl', True, lambda: pe.save(datasets, format='jsonl')),
+            ('save/jsonl-stdlib', 'jsonl', False, lambda: pe.save(datasets, format='jsonl')),
+            ('load/json-lazy', 'json', True, lambda: pe.load()),
+            ('load/json', 'json', True, lambda: pe.load(lazy=False)),
+            ('load/jsonl', 'jsonl', True, lambda: pe.load()),
+            ('load/jsonl-stdlib', 'jsonl', False, lambda: pe.load()),
+        ]
+        for name, layout, use_orjson, case in cases:
+            with mock.patch.object(module, 'DATASETS_DIR', layouts[layout]), \
+                    mock.patch.object(snapshot, 'orjson', serializer if use_orjson else None):
+                seconds, loaded = timed(case)
+            results[name] = {'seconds': seconds}
+            if loaded is not None:
+                results[name]['datasets'] = len(loaded)
+        for layout, folder in layouts.items():
+            size, files = folder_size(folder)
+            results[f'disk/{layout}'] = {'mb': round(size / 2 ** 20, 2), 'files': files}
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--datasets', type=int, default=5000)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.datasets)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{results.pop('datasets')} datasets, orjson: {results.pop('orjson')}")
+        for name, result in results.items():
+            print(f"{name:<18} " + ' '.join(f"{key}={value}" for key, value in result.items()))
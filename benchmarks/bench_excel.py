@@ -0,0 +1,70 @@
+"""
+Read time of XLSX files: pandas' default engine against the openpe readers.
+
+Writes a synthetic workbook (the same text-heavy columns as bench_load.py)
+and reads it with:
+
+- openpyxl: pd.read_excel() with pandas' default engine, the previous path
+- fast: openpe.readers.read_excel(), calamine when installed
+- fast/nrows: the same, stopping after --nrows rows (a preview)
+- cached: Dataset.data()'s path once the parsed frame is in the columnar cache
+
+    python benchmarks/bench_excel.py [--rows 20000] [--nrows 1000] [--repeat 3] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from bench_load import make_files
+
+def best_of(repeat, function):
+    """Fastest of repeat calls, in seconds, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return round(min(times), 4), result
+
+def run(rows=20_000, nrows=1000, repeat=3):
+    import pandas as pd
+
+    from openpe import Dataset, readers
+
+    results = {'engine': readers.EXCEL_ENGINE or 'openpyxl'}
+    with tempfile.TemporaryDirectory() as folder:
+        dataset = Dataset('bench', '', '', [], '', '', '', '', {})
+        path = make_files(folder, 0, rows)['xlsx']
+        cases = {
+            'openpyxl': lambda: pd.read_excel(path, engine='openpyxl'),
+            'fast': lambda: readers.read_excel(path),
+            'fast/nrows': lambda: readers.read_excel(path, nrows=nrows),
+            'cached': lambda: dataset._load_local_file(path),
+        }
+        dataset._load_local_file(path)  # Fill the cache outside the timing
+        for name, case in cases.items():
+            seconds, df = best_of(repeat, case)
+            results[name] = {'rows': len(df), 'seconds': seconds}
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--nrows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.nrows, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"engine: {results.pop('engine')}")
+        for name, result in results.items():
+            print(f"{name:<12} {result['rows']:>8} rows {result['seconds']:>8.3f} s")
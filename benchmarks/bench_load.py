@@ -0,0 +1,108 @@
+"""
+Load time and memory of Dataset.data() per file format and dtype backend.
+
+Writes a synthetic, text-heavy dataset (districts, names and free-text
+columns, like most ministry CSVs) as a Latin-1 semicolon CSV, an XLSX and a
+Parquet file. Each one is then loaded through Dataset._load_file_as_dataframe
+with the NumPy backend and with dtype_backend='pyarrow'. Every case runs in
+a fresh process, so the RSS figures don't carry over between cases.
+
+    python benchmarks/bench_load.py [--rows 200000] [--xlsx-rows 20000] [--json]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+BACKENDS = ['numpy', 'pyarrow']
+
+def _rss_mb():
+    """Current resident set size in MB (Linux), or the peak elsewhere."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+def make_files(folder, rows, xlsx_rows):
+    import pandas as pd
+
+    districts = ['Lima', 'Arequipa', 'Cusco', 'Piura', 'Cajamarca', 'Puno', 'Junín', 'Áncash']
+    def frame(n):
+        return pd.DataFrame({
+            'id': range(n),
+            'departamento': [districts[i % len(districts)] for i in range(n)],
+            'establecimiento': [f'Centro de Salud N° {i % 997}' for i in range(n)],
+            'observación': [f'Atención registrada en el año {2015 + i % 9}, categoría {i % 5}' for i in range(n)],
+            'monto': [i * 1.25 for i in range(n)],
+        })
+
+    df = frame(rows)
+    paths = {
+        'csv': os.path.join(folder, 'datos.csv'),
+        'parquet': os.path.join(folder, 'datos.parquet'),
+        'xlsx': os.path.join(folder, 'datos.xlsx'),
+    }
+    df.to_csv(paths['csv'], sep=';', index=False, encoding='latin1')
+    df.to_parquet(paths['parquet'])
+    frame(xlsx_rows).to_excel(paths['xlsx'], index=False)
+    return paths
+
+def run_case(path, backend):
+    """Load one file in this process and return its timings and memory."""
+    from openpe import Dataset
+
+    dataset = Dataset('bench', '', '', [], '', '', '', '', {})
+    if path.endswith('.csv'):
+        # Sniff outside the timing, like every data() call after the first one
+        from openpe.sniff import sniff_csv
+        dataset.dialects['datos.csv'] = sniff_csv(path)
+    before = _rss_mb()
+    start = time.perf_counter()
+    df = dataset._load_file_as_dataframe(path, dtype_backend=None if backend == 'numpy' else backend)
+    seconds = time.perf_counter() - start
+    return {
+        'rows': len(df),
+        'seconds': round(seconds, 4),
+        'rss_mb': round(_rss_mb() - before, 1),
+        'frame_mb': round(df.memory_usage(deep=True).sum() / 2 ** 20, 1),
+    }
+
+def run(rows=200_000, xlsx_rows=20_000):
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        paths = make_files(folder, rows, xlsx_rows)
+        for fmt, path in paths.items():
+            for backend in BACKENDS:
+                output = subprocess.run([sys.executable, __file__, '--case', path, backend],
+                                        check=True, capture_output=True, text=True).stdout
+                results[f'{fmt}/{backend}'] = json.loads(output.strip().splitlines()[-1])
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--xlsx-rows', type=int, default=20_000)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    parser.add_argument('--case', nargs=2, metavar=('PATH', 'BACKEND'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(*args.case)))
+        sys.exit()
+
+    results = run(args.rows, args.xlsx_rows)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            print(f"{name:<16} {result['rows']:>8} rows {result['seconds']:>8.3f} s "
+                  f"{result['rss_mb']:>8.1f} MB RSS {result['frame_mb']:>8.1f} MB frame")
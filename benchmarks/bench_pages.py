@@ -0,0 +1,69 @@
+"""
+Per-page parsing cost of listing and dataset pages.
+
+Compares the previous approach (a full html.parser parse in get_items, another
+in get_next_page_url, and a full parse of each dataset page) with the
+parse-once page model in openpe.page, on the recorded fixtures in
+tests/fixtures.
+
+    python benchmarks/bench_pages.py [--repeat 200] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'tests')]
+
+from openpe.page import DatasetPage, ListingPage, lxml
+from openpe.utils import parse_html
+from portal import Portal
+
+def legacy_listing(content):
+    page = parse_html(content)
+    page.find('div', class_='view-content').find_all('article', class_='node-search-result')
+    parse_html(content).find('ul', class_='pagination pager')
+
+def legacy_dataset(content):
+    page = parse_html(content)
+    page.find('div', class_='field-name-field-topic')
+    page.find('a', {'title': 'json view of content'})
+
+def run(repeat=200):
+    portal = Portal.generate(count=30)
+    listing = portal.render_listing('salud-27', 1).encode('utf-8')
+    detail = portal.render_dataset(portal.datasets[0]).encode('utf-8')
+
+    cases = {
+        'listing/legacy': lambda: legacy_listing(listing),
+        'listing/html.parser': lambda: ListingPage(listing, backend='html.parser'),
+        'dataset/legacy': lambda: legacy_dataset(detail),
+        'dataset/html.parser': lambda: DatasetPage(detail, backend='html.parser'),
+    }
+    if lxml is not None:
+        cases['listing/lxml'] = lambda: ListingPage(listing, backend='lxml')
+        cases['dataset/lxml'] = lambda: DatasetPage(detail, backend='lxml')
+
+    results = {}
+    for name, case in sorted(cases.items()):
+        seconds = min(timeit.repeat(case, number=repeat, repeat=3)) / repeat
+        results[name] = {'ms_per_page': round(seconds * 1000, 4)}
+    for name, result in results.items():
+        legacy = results[name.split('/')[0] + '/legacy']['ms_per_page']
+        result['speedup'] = round(legacy / result['ms_per_page'], 2)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            print(f"{name:<22} {result['ms_per_page']:>9.3f} ms/page  x{result['speedup']}")
@@ -0,0 +1,173 @@
+"""
+Offline benchmark suite, for catching performance regressions between releases.
+
+Every case runs against the local stand-in portal of the tests (recorded
+listing pages, dataset pages and CKAN JSON from tests/fixtures, served over
+HTTP on localhost) or on synthetic files, so no network is needed:
+
+- parse/get_items, parse/get_next_page_url: one listing page
+- crawl/expand_dataset: one dataset page and its CKAN JSON
+- crawl/get_datasets, crawl/get_datasets-workers: a category, sequential and with 8 threads
+- csv/*: Dataset._load_file_as_dataframe on UTF-8 and Latin-1 CSVs, sniffed and with a known dialect
+- catalog/*: save(), load() and stats() on a synthetic catalog of 10,000 datasets (1,000 with --quick)
+
+The results are printed as JSON, with the environment they were measured in.
+--compare reports the cases that got slower than in a previous run and exits
+with status 1 if any did by more than --threshold.
+
+    python benchmarks/suite.py [--quick] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'tests')]
+
+from bench_catalog import make_datasets
+
+SIZES = {
+    'full': {'repeat': 5, 'portal_datasets': 200, 'rows': 100_000, 'datasets': 10_000},
+    'quick': {'repeat': 3, 'portal_datasets': 40, 'rows': 10_000, 'datasets': 1000},
+}
+
+def measure(function, repeat, number=1):
+    """Seconds per call of function: the best and the median of repeat rounds of number calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    return {'best': round(min(times), 6), 'median': round(statistics.median(times), 6)}
+
+def environment():
+    import pandas as pd
+
+    try:
+        from importlib.metadata import version
+        openpe_version = version('openpe')
+    except Exception:
+        openpe_version = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'openpe': openpe_version, 'commit': commit, 'python': platform.python_version(),
+        'pandas': pd.__version__, 'platform': platform.platform(), 'cpus': os.cpu_count(),
+    }
+
+def bench_portal(sizes):
+    import openpe as pe
+    from openpe import module
+    from portal import Portal
+
+    results = {}
+    with Portal.generate(count=sizes['portal_datasets'], page_size=20) as portal, portal.patch_module():
+        listing = portal.render_listing('salud-27', 1).encode('utf-8')
+        results['parse/get_items'] = measure(lambda: module.get_items(listing), sizes['repeat'], number=20)
+        results['parse/get_next_page_url'] = measure(lambda: module.get_next_page_url(listing), sizes['repeat'],
+                                                     number=20)
+        results['crawl/expand_dataset'] = measure(lambda: pe.get_dataset('dataset-00000'), sizes['repeat'], number=5)
+        results['crawl/get_datasets'] = measure(
+            lambda: pe.get_datasets('salud-27', show_progress=False), sizes['repeat'])
+        results['crawl/get_datasets-workers'] = measure(
+            lambda: pe.get_datasets('salud-27', show_progress=False, workers=8), sizes['repeat'])
+    return results
+
+def bench_csv(sizes, folder):
+    import pandas as pd
+
+    from openpe import Dataset
+    from openpe.sniff import sniff_csv
+
+    rows = sizes['rows']
+    df = pd.DataFrame({
+        'id': range(rows),
+        'distrito': [f'Distrito Ñ{i % 50}' for i in range(rows)],
+        'observación': [f'Atención registrada en el año {2015 + i % 9}' for i in range(rows)],
+        'monto': [i * 1.25 for i in range(rows)],
+    })
+    files = {'utf8-comma': ('utf-8', ','), 'latin1-semicolon': ('latin1', ';')}
+    results = {}
+    for name, (encoding, sep) in files.items():
+        path = os.path.join(folder, f'{name}.csv')
+        df.to_csv(path, sep=sep, index=False, encoding=encoding)
+        dataset = Dataset('bench', '', '', [], '', '', '', '', {})
+        # Sniffed on every call: no dialect is remembered between rounds
+        results[f'csv/{name}-sniffed'] = measure(
+            lambda: Dataset('bench', '', '', [], '', '', '', '', {})._load_file_as_dataframe(path), sizes['repeat'])
+        dataset.dialects[os.path.basename(path)] = sniff_csv(path)
+        results[f'csv/{name}-known-dialect'] = measure(lambda: dataset._load_file_as_dataframe(path), sizes['repeat'])
+    return results
+
+def bench_catalog(sizes, folder):
+    import openpe as pe
+    from openpe import module
+
+    datasets = make_datasets(sizes['datasets'])
+    catalog = os.path.join(folder, 'datasets')
+    results = {}
+    with mock.patch.object(module, 'DATASETS_DIR', catalog):
+        start = time.perf_counter()
+        pe.save(datasets)
+        results['catalog/save'] = {'best': round(time.perf_counter() - start, 6)}
+        name = datasets[len(datasets) // 2].metadata['result'][0]['name']
+        results['catalog/load-lazy'] = measure(lambda: pe.load(), sizes['repeat'])
+        results['catalog/load-eager'] = measure(lambda: pe.load(lazy=False), max(1, sizes['repeat'] // 2))
+        results['catalog/load-one'] = measure(lambda: pe.load(name), sizes['repeat'], number=20)
+        results['catalog/load-category'] = measure(lambda: pe.load_by_category('salud-27'), sizes['repeat'])
+        results['catalog/stats'] = measure(lambda: pe.stats(as_dict=True), sizes['repeat'], number=20)
+    return results
+
+def run(quick=False):
+    sizes = SIZES['quick' if quick else 'full']
+    results = {}
+    with tempfile.TemporaryDirectory() as folder, mock.patch('builtins.print'):
+        results.update(bench_portal(sizes))
+        results.update(bench_csv(sizes, folder))
+        results.update(bench_catalog(sizes, folder))
+    return {'environment': environment(), 'sizes': sizes, 'results': results}
+
+def compare(current, baseline, threshold):
+    """Cases whose best time grew by more than threshold (a fraction) since the baseline."""
+    regressions = {}
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before or not before.get('best'):
+            continue
+        change = result['best'] / before['best'] - 1
+        if change > threshold:
+            regressions[name] = {'before': before['best'], 'after': result['best'], 'change': round(change, 3)}
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes and fewer rounds, for a smoke run')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results of a previous run')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Slowdown reported as a regression, as a fraction (default: 0.25)')
+    args = parser.parse_args()
+
+    results = run(args.quick)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('sizes') != results['sizes']:
+            print("Warning: the baseline was measured with different sizes", file=sys.stderr)
+        results['regressions'] = compare(results, baseline, args.threshold)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if results.get('regressions') else 0)
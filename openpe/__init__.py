@@ -2,10 +2,16 @@
 
 from .categories import Categories
 from .errors import log_error  # Add this import
-from .dataset import Dataset
-from .webscraper import WebScraper
+from .dataset import Dataset, LazyDataset
+from .webscraper import WebScraper, configure_rate_limiter, get_rate_limiter, configure_session, get_session
+from .ratelimit import RateLimiter
 from .utils import to_json, from_json
-from .module import get_dataset, get_datasets, expand_datasets, download_dataset, save, load, expand_dataset, stats, load_by_category
+from .cache import ResponseCache
+from .catalog import CatalogIndex
+from .framecache import FrameCache
+from .scheduler import DownloadScheduler
+from .aio import AsyncClient
+from .module import get_dataset, get_datasets, get_all_datasets, expand_datasets, download_dataset, download_datasets, save, load, expand_dataset, stats, load_by_category, rebuild_index, prewarm_cache, fetch_data_dictionaries, sync_category, enable_cache, disable_cache, api_action
 
 import os
 import json
\ No newline at end of file
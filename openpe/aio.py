@@ -0,0 +1,241 @@
+"""
+Asyncio counterparts of the catalog discovery and download functions.
+
+All requests made by an AsyncClient go through a single aiohttp session, so
+they share one connection pool, and through the RateLimiter shared with
+WebScraper, whose waits are awaited instead of slept. Pages are parsed with
+the same helpers used by the synchronous functions in ``openpe.module``.
+
+Requires the optional ``aiohttp`` dependency (``pip install openpe[async]``).
+"""
+import asyncio
+import json
+import math
+import os
+import re
+from contextlib import asynccontextmanager
+from urllib.parse import urljoin
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None
+
+from . import module
+from .dataset import Dataset
+from .errors import log_error
+from .page import ListingPage
+from .webscraper import DEFAULT_HEADERS, get_rate_limiter, partial_offset, settle_partial
+
+
+class AsyncClient:
+    """
+    Async client for datosabiertos.gob.pe.
+
+    Use it as an async context manager so the connection pool is closed:
+
+        async with AsyncClient(limit=200) as client:
+            async for dataset in client.get_datasets(Categories.SALUD):
+                ...
+
+    Args:
+        base_url (str, optional): Portal URL (default: openpe.module.BASE_URL)
+        headers (dict, optional): Headers sent with every request
+        limit (int): Maximum number of connections kept in the pool
+        timeout (int): Total timeout in seconds for each request
+        rate_limiter (RateLimiter, optional): Limiter for this client (default:
+            the one shared by WebScraper instances)
+    """
+
+    def __init__(self, base_url=None, headers=None, limit=100, timeout=600, rate_limiter=None):
+        if aiohttp is None:
+            raise ImportError("AsyncClient requires aiohttp. Install it with: pip install openpe[async]")
+        self.base_url = base_url or module.BASE_URL
+        self.headers = headers or DEFAULT_HEADERS
+        self.limit = limit
+        self.timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter or get_rate_limiter()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _url(self, path):
+        path = re.sub(r'https?://(www\.)?datosabiertos.gob.pe', '', path)
+        return urljoin(self.base_url + '/', path)
+
+    @asynccontextmanager
+    async def _request(self, url, **kwargs):
+        """
+        Send a GET through the rate limiter, retrying throttled answers
+        (429/503) after the delay the limiter derives from Retry-After, as
+        WebScraper._request does.
+        """
+        limiter = self.rate_limiter
+        for attempt in range(limiter.max_retries + 1):
+            pause = limiter.pause()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            wait = limiter.bucket.reserve(1)
+            if wait:
+                await asyncio.sleep(wait)
+            async with self.session.get(url, **kwargs) as response:
+                throttled = limiter.report(response.status, response.headers.get('Retry-After'))
+                if not throttled or attempt == limiter.max_retries:
+                    yield response
+                    return
+
+    async def get_response(self, url, verify=True):
+        """
+        Fetch a URL and return ``(status, body)``, or ``(None, None)`` on error.
+        """
+        try:
+            async with self._request(url, ssl=True if verify else False) as response:
+                return response.status, await response.read()
+        except Exception as e:
+            log_error(f"Error fetching URL: {url}, Error: {str(e)}")
+            return None, None
+
+    async def get_dataset(self, url, log_errors=False):
+        """Async version of openpe.get_dataset."""
+        url = re.sub(r'https?://(www\.)?datosabiertos.gob.pe', '', url)
+        if not url.startswith('/'):
+            url = '/dataset/' + url
+        dataset = Dataset(url=url, id='', title='', description='', categories=[],
+                          modified_date='', release_date='', publisher='', metadata={})
+        return await self.expand_dataset(dataset, log_errors=log_errors)
+
+    async def expand_dataset(self, dataset, log_errors=False):
+        """Async version of openpe.expand_dataset."""
+        page_url = self._url(dataset.url)
+        try:
+            status, content = await self.get_response(page_url)
+            if content is None:
+                raise ValueError(f"Failed to get response for URL: {page_url}")
+
+            category_ids, link = module._parse_dataset_page(content)
+            if link is None:
+                raise ValueError("JSON link not found in page")
+
+            status, content = await self.get_response(urljoin(page_url, link))
+            if status != 200:
+                raise ValueError(f"Failed to get JSON metadata. Status code: {status}")
+            module._apply_metadata(dataset, json.loads(content), category_ids)
+        except Exception as e:
+            print(f"Error processing URL: {e}")
+            if log_errors:
+                dataset_identifier = f"Title: {dataset.title or 'Unknown'}, URL: {dataset.url or 'Unknown'}"
+                log_error(f"{e} - {dataset_identifier}")
+        return dataset
+
+    async def get_datasets(self, category, limit=math.inf, log_errors=False, start_page=1, end_page=None):
+        """
+        Async generator version of openpe.get_datasets.
+
+        The datasets of each listing page are expanded concurrently and yielded
+        in listing order. Concurrency is bounded by the connection pool size.
+        start_page and end_page (inclusive) are addressed directly, as in the
+        synchronous crawler.
+        """
+        page_url = module.listing_url(category, start_page)
+        dataset_counter = 0
+        page_counter = start_page - 1
+
+        while dataset_counter < limit and page_url and (end_page is None or page_counter < end_page):
+            try:
+                status, content = await self.get_response(self._url(page_url))
+                if content is None:
+                    raise ValueError(f"Failed to get listing page {page_url}")
+                page = ListingPage(content)
+                page_url = page.next_page_url
+                page_counter += 1
+
+                items = page.items
+                if not math.isinf(limit):
+                    items = items[:int(limit - dataset_counter)]
+                datasets = [module._item_to_dataset(item, category) for item in items]
+                for dataset in await asyncio.gather(*(self.expand_dataset(d, log_errors=log_errors) for d in datasets)):
+                    dataset_counter += 1
+                    yield dataset
+            except Exception as e:
+                error_msg = f"Error fetching page: {e}"
+                print(error_msg)
+                if log_errors:
+                    log_error(f"{error_msg} - category={category}, page={page_counter}")
+                break
+
+    async def download_files(self, dataset, base_folder="datasets", log_errors=False, skip_existing=False, verify_ssl=True, chunk_size=1024 * 1024):
+        """
+        Async version of Dataset.download_files.
+
+        All resources of the dataset are downloaded concurrently and streamed
+        to disk in chunks. Partial files are resumed with Range requests and
+        settled like in WebScraper.download: a complete one is kept, a stale
+        one is downloaded again from zero.
+
+        Files are written in worker threads, so the event loop keeps serving
+        the other downloads. Downloads are never cached, in either version:
+        the ResponseCache only holds pages and JSON.
+        """
+        folder_name = os.path.join(base_folder, dataset.id)
+        os.makedirs(folder_name, exist_ok=True)
+
+        async def download(resource_url, filename, file_path):
+            part_path = file_path + '.part'
+            try:
+                # A stale partial file is deleted on the first attempt and the second starts from zero
+                for _ in range(2):
+                    # Resume a partial file left by an interrupted download
+                    offset = partial_offset(part_path)
+                    headers = {'Range': f'bytes={offset}-'} if offset else None
+                    async with self._request(resource_url, headers=headers, ssl=True if verify_ssl else False) as response:
+                        if response.status == 416 and offset:
+                            content_range = response.headers.get('Content-Range')
+                            if await asyncio.to_thread(settle_partial, part_path, file_path, offset, content_range):
+                                return
+                            continue
+                        if response.status not in (200, 206):
+                            raise ValueError(f"Status code: {response.status}")
+                        file = await asyncio.to_thread(open, part_path, 'ab' if response.status == 206 else 'wb')
+                        try:
+                            async for chunk in response.content.iter_chunked(chunk_size):
+                                await asyncio.to_thread(file.write, chunk)
+                        finally:
+                            await asyncio.to_thread(file.close)
+                    await asyncio.to_thread(os.replace, part_path, file_path)
+                    return
+            except Exception as e:
+                message = f"Failed to download {filename}. {e}"
+                if log_errors:
+                    log_error(message)
+                else:
+                    print(message)
+
+        await asyncio.gather(*(
+            download(resource_url, filename, file_path)
+            for resource_url, filename, file_path in dataset._resource_targets(folder_name)
+            if not (skip_existing and os.path.exists(file_path))
+        ))
+        await asyncio.to_thread(dataset._write_metadata_json, folder_name)
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with a cached body. The body is stored decoded, so
+# transfer headers such as Content-Encoding/Content-Length are dropped.
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+class ResponseCache:
+    """
+    On-disk cache for WebScraper responses with conditional revalidation.
+
+    Bodies are stored together with their ETag/Last-Modified validators. While
+    an entry is fresh it is served without touching the network. Once it is
+    stale the request is sent with If-None-Match/If-Modified-Since, and a
+    304 answer refreshes the entry instead of downloading it again.
+
+    Args:
+        directory (str): Folder where cached responses are stored
+        ttl (int): Seconds an entry is served without revalidation (default: 0,
+            always revalidate)
+        ttls (dict, optional): Per-URL TTLs as {regex pattern: seconds}. The
+            first pattern found in the URL wins, otherwise ttl is used.
+        max_size (int, optional): Maximum total size of the cached bodies in
+            bytes. The least recently used entries are evicted beyond it.
+    """
+
+    def __init__(self, directory='.openpe_cache', ttl=0, ttls=None, max_size=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.ttls = [(re.compile(pattern), seconds) for pattern, seconds in (ttls or {}).items()]
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                entries.append((os.path.getmtime(path), name[:-5], meta['size']))
+            except (OSError, ValueError, KeyError):
+                continue
+        # Least recently used first, matching the order kept in memory
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def ttl_for(self, url):
+        """Return the TTL in seconds that applies to a URL."""
+        for pattern, seconds in self.ttls:
+            if pattern.search(url):
+                return seconds
+        return self.ttl
+
+    def _read(self, url):
+        key = self._key(url)
+        if key not in self._entries:
+            return None
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._paths(key)[0])
+        except OSError:
+            pass
+
+    def get(self, url):
+        """
+        Look up a URL.
+
+        Returns:
+            tuple: (cached response or None, validator headers for the request).
+                The response is only returned while the entry is fresh.
+        """
+        with self._lock:
+            cached = self._read(url)
+            if cached is None:
+                return None, {}
+            meta, body = cached
+            if time.time() - meta['stored_at'] < self.ttl_for(url):
+                self.hits += 1
+                self.bytes_saved += len(body)
+                self._touch(self._key(url))
+                return self._response(url, meta, body), {}
+
+        validators = {}
+        if meta['headers'].get('ETag'):
+            validators['If-None-Match'] = meta['headers']['ETag']
+        if meta['headers'].get('Last-Modified'):
+            validators['If-Modified-Since'] = meta['headers']['Last-Modified']
+        return None, validators
+
+    def update(self, url, response):
+        """
+        Record the network response for a URL.
+
+        A 304 answer is replaced by the cached response, a 200 answer is stored.
+        Any other response is returned unchanged.
+
+        Returns:
+            requests.Response: The response to hand to the caller, or None for a
+                304 whose entry was evicted or removed after get(). The request
+                then has to be sent again without validators.
+        """
+        with self._lock:
+            if response.status_code == 304:
+                cached = self._read(url)
+                if cached is None:
+                    return None
+                meta, body = cached
+                meta['stored_at'] = time.time()
+                self._write_meta(self._key(url), meta)
+                self._touch(self._key(url))
+                self.revalidated += 1
+                self.bytes_saved += len(body)
+                return self._response(url, meta, body)
+            if response.status_code == 200:
+                self.misses += 1
+                self._store(url, response)
+        return response
+
+    def _write_meta(self, key, meta):
+        meta_path = self._paths(key)[0]
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _store(self, url, response):
+        key = self._key(url)
+        body = response.content
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+            'stored_at': time.time(),
+            'size': len(body),
+        }
+        body_path = self._paths(key)[1]
+        with open(body_path + '.tmp', 'wb') as f:
+            f.write(body)
+        os.replace(body_path + '.tmp', body_path)
+        self._write_meta(key, meta)
+
+        self._size += len(body) - self._entries.get(key, 0)
+        self._entries[key] = len(body)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        if self.max_size is None:
+            return
+        while self._size > self.max_size and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _response(self, url, meta, body):
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: hits (served without a request), revalidated (304 answers),
+                misses (bodies downloaded), bytes_saved, entries and size
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'bytes_saved': self.bytes_saved,
+                'entries': len(self._entries),
+                'size': self._size,
+            }
+
+    def clear(self):
+        """Remove every cached response and reset the counters."""
+        with self._lock:
+            for key in list(self._entries):
+                for path in self._paths(key):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.revalidated = self.bytes_saved = 0
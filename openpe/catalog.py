@@ -0,0 +1,246 @@
+"""
+SQLite index of the datasets saved under the local datasets folder.
+
+save() and Dataset.download_files() keep the index up to date, so lookups by
+name or category and the stats() aggregates don't need to open every
+metadata file. The index is filled from the existing folders when it is
+first created; folders written by other tools can be re-indexed with:
+
+    python -m openpe.catalog rebuild [--base-folder datasets]
+"""
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+INDEX_FILENAME = 'catalog.db'
+# Bumped whenever the tables change; older index files are rebuilt on open
+SCHEMA_VERSION = 2
+
+_SCHEMA = (
+    'DROP TABLE IF EXISTS datasets',
+    'DROP TABLE IF EXISTS dataset_categories',
+    """CREATE TABLE datasets (
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        title TEXT,
+        description TEXT,
+        categories TEXT,
+        url TEXT,
+        publisher TEXT,
+        modified_date TEXT,
+        release_date TEXT
+    )""",
+    'CREATE INDEX idx_datasets_name ON datasets(name)',
+    'CREATE INDEX idx_datasets_title ON datasets(title)',
+    """CREATE TABLE dataset_categories (
+        dataset_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        PRIMARY KEY (dataset_id, category)
+    )""",
+    'CREATE INDEX idx_dataset_categories_category ON dataset_categories(category)',
+    f'PRAGMA user_version = {SCHEMA_VERSION}',
+)
+
+# Columns returned by CatalogIndex.records(), in Dataset argument names
+RECORD_FIELDS = ('id', 'title', 'description', 'categories', 'url', 'modified_date', 'release_date', 'publisher')
+
+def _dataset_name(metadata):
+    """Return the CKAN name of a dataset from its metadata, or None."""
+    try:
+        return metadata['result'][0].get('name')
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+def _category_ids(categories):
+    """Category values as strings; group dicts are reduced to their name."""
+    category_ids = []
+    for category in categories or []:
+        if isinstance(category, dict):
+            category = category.get('name')
+        if category and category not in category_ids:
+            category_ids.append(category)
+    return category_ids
+
+class CatalogIndex:
+    """
+    Index of the datasets stored in a datasets folder.
+
+    Args:
+        base_folder (str): Folder holding one subfolder per dataset (default: "datasets")
+    """
+
+    def __init__(self, base_folder='datasets'):
+        self.base_folder = base_folder
+        self.path = os.path.join(base_folder, INDEX_FILENAME)
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def connect(self, populate=True):
+        """
+        Open the index, creating the tables if the file is new or was written
+        by an older version.
+
+        Args:
+            populate (bool): Whether to index the existing dataset folders when
+                the tables are (re)created
+        """
+        os.makedirs(self.base_folder, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        if self._version(connection) != SCHEMA_VERSION:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                # Another process may have created the tables while we waited for the lock
+                if self._version(connection) != SCHEMA_VERSION:
+                    for statement in _SCHEMA:
+                        connection.execute(statement)
+                    if populate:
+                        self._index_folders(connection)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                connection.close()
+                raise
+        return connection
+
+    @staticmethod
+    def _version(connection):
+        return connection.execute('PRAGMA user_version').fetchone()[0]
+
+    def upsert(self, datasets):
+        """
+        Add or update datasets in the index.
+
+        Args:
+            datasets: A Dataset object, a dataset dict as saved in <id>.json, or a list of them
+        """
+        if not isinstance(datasets, list):
+            datasets = [datasets]
+        with closing(self.connect()) as connection, connection:
+            for dataset in datasets:
+                self._upsert(connection, dataset if isinstance(dataset, dict) else dataset.to_dict())
+
+    def _upsert(self, connection, record):
+        dataset_id = record.get('id')
+        if not dataset_id:
+            return
+        connection.execute(
+            'INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (dataset_id, _dataset_name(record.get('metadata')), record.get('title'), record.get('description'),
+             json.dumps(record.get('categories'), ensure_ascii=False), record.get('url'), record.get('publisher'),
+             record.get('modified_date'), record.get('release_date')),
+        )
+        connection.execute('DELETE FROM dataset_categories WHERE dataset_id = ?', (dataset_id,))
+        connection.executemany(
+            'INSERT INTO dataset_categories VALUES (?, ?)',
+            [(dataset_id, category) for category in _category_ids(record.get('categories'))],
+        )
+
+    def remove(self, dataset_id):
+        with closing(self.connect()) as connection, connection:
+            connection.execute('DELETE FROM datasets WHERE id = ?', (dataset_id,))
+            connection.execute('DELETE FROM dataset_categories WHERE dataset_id = ?', (dataset_id,))
+
+    def rebuild(self):
+        """
+        Recreate the index from the <id>/<id>.json files of the datasets folder.
+
+        Returns:
+            int: Number of datasets indexed
+        """
+        with closing(self.connect(populate=False)) as connection, connection:
+            connection.execute('DELETE FROM datasets')
+            connection.execute('DELETE FROM dataset_categories')
+            return self._index_folders(connection)
+
+    def _index_folders(self, connection):
+        count = 0
+        for item in os.listdir(self.base_folder):
+            json_path = os.path.join(self.base_folder, item, f"{item}.json")
+            if not os.path.isfile(json_path):
+                continue
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    self._upsert(connection, json.load(f))
+                count += 1
+            except Exception as e:
+                print(f"Error indexing dataset {item}: {e}")
+        return count
+
+    def count(self):
+        """Number of indexed datasets, 0 without opening (or creating) a missing index."""
+        if not self.exists():
+            return 0
+        with closing(self.connect()) as connection:
+            return connection.execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+
+    def ids(self):
+        with closing(self.connect()) as connection:
+            return [row[0] for row in connection.execute('SELECT id FROM datasets ORDER BY id')]
+
+    def records(self, ids=None, name=None, category=None):
+        """
+        Return the indexed fields of datasets as dicts keyed by RECORD_FIELDS,
+        ordered by ID.
+
+        Args:
+            ids (list, optional): Only return these dataset IDs
+            name (str, optional): Only return datasets with this CKAN name or title
+            category (str, optional): Only return datasets in this category
+        """
+        query = f"SELECT {', '.join('d.' + field for field in RECORD_FIELDS)} FROM datasets d"
+        conditions, params = [], []
+        if category is not None:
+            query += ' JOIN dataset_categories c ON c.dataset_id = d.id'
+            conditions.append('c.category = ?')
+            params.append(category)
+        if ids is not None:
+            conditions.append(f"d.id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        if name is not None:
+            conditions.append('(d.name = ? OR d.title = ?)')
+            params.extend([name, name])
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY d.id'
+
+        with closing(self.connect()) as connection:
+            records = [dict(zip(RECORD_FIELDS, row)) for row in connection.execute(query, params)]
+        for record in records:
+            record['categories'] = json.loads(record['categories']) if record['categories'] else []
+        return records
+
+    def ids_by_category(self, category):
+        with closing(self.connect()) as connection:
+            return [row[0] for row in connection.execute(
+                'SELECT dataset_id FROM dataset_categories WHERE category = ? ORDER BY dataset_id', (category,))]
+
+    def stats(self):
+        """
+        Returns:
+            dict: {"total": number of datasets, "categories": {category: count}}
+                with categories sorted by count in descending order
+        """
+        with closing(self.connect()) as connection:
+            total = connection.execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+            categories = connection.execute(
+                'SELECT category, COUNT(*) AS n FROM dataset_categories GROUP BY category ORDER BY n DESC, category')
+            return {"total": total, "categories": {category: count for category, count in categories}}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m openpe.catalog', description='Manage the local dataset index.')
+    parser.add_argument('command', choices=['rebuild', 'stats'])
+    parser.add_argument('--base-folder', default='datasets')
+    args = parser.parse_args(argv)
+
+    index = CatalogIndex(args.base_folder)
+    if args.command == 'rebuild':
+        print(f"Indexed {index.rebuild()} datasets in {index.path}")
+    else:
+        print(json.dumps(index.stats(), indent=4, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,60 @@
 import json
 import os
 from .webscraper import WebScraper
-import time
+from .catalog import CatalogIndex
 import pandas as pd
 import glob
-import io
+import tempfile
+import threading
+import hashlib
 import re  # Add import for regex processing
 import urllib.parse  # Add this import for URL decoding
 from .errors import log_error  # Updated import to avoid circular dependency
+from .sniff import sniff_csv
+from .framecache import FrameCache, _temp_path
+from .readers import DEFAULT_CHUNKSIZE, iter_frames, read_frame
+from .dictionary import dictionary_notice, fetch_dictionary, find_dictionary_resource, parse_dictionary
 import requests
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Hidden folder inside datasets/<id> where data() keeps downloaded resources
+RESOURCE_CACHE_FOLDER = '.resources'
+
+# Held while <id>.json is snapshotted and rewritten, so a thread with an older
+# copy of the dialects can't replace the file after a newer one
+_metadata_lock = threading.Lock()
+
+def _write_json(path, data, indent=None):
+    """Write data as JSON to path through a temporary file, so threads rewriting it never interleave."""
+    temp_path = _temp_path(path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _parse_file(file_path, dialect=None, cache=True, dtype_backend=None):
+    """
+    Parse one file for Dataset.data_all(), in a worker process.
+    
+    Returns:
+        tuple: (DataFrame, CSV dialect that parsed the file or None)
+    """
+    detected = {'dialect': dialect}
+    
+    def load(path):
+        df, detected['dialect'] = read_frame(path, dialect, dtype_backend)
+        return df
+    
+    if not cache or file_path.lower().endswith('.parquet'):
+        return load(file_path), detected['dialect']
+    df = FrameCache(os.path.dirname(file_path), dtype_backend=dtype_backend).load(file_path, load)
+    return df, detected['dialect']
 
 class Dataset:
-    def __init__(self, id: str, title: str, description: str, categories: list, url: str, modified_date: str, release_date: str, publisher: str, metadata: dict, data_dictionary: str = None):
+    def __init__(self, id: str, title: str, description: str, categories: list, url: str, modified_date: str, release_date: str, publisher: str, metadata: dict, data_dictionary: str = None, dialects: dict = None):
         self.id = id
         self.title = title
         self.description = description
@@ -22,6 +65,8 @@ class Dataset:
         self.publisher = publisher
         self.metadata = metadata
         self._data_dictionary = data_dictionary  # Changed to private attribute
+        # CSV encoding/separator detected per file name or resource URL, reused by data()
+        self.dialects = dialects if dialects is not None else {}
 
     def __repr__(self, simple=False):
         if simple:
@@ -45,11 +90,9 @@ class Dataset:
     @property
     def data_dictionary(self):
         """
-        Property that returns the data dictionary. If it's None or empty,
-        it will attempt to fetch the data dictionary from the dataset resources.
+        The data dictionary text stored with the dataset, or None. It is never
+        downloaded here, see get_data_dictionary().
         """
-        if self._data_dictionary is None or self._data_dictionary == "":
-            self._data_dictionary = self.get_data_dictionary()
         return self._data_dictionary
     
     @data_dictionary.setter
@@ -57,105 +100,49 @@ class Dataset:
         """Setter for data_dictionary property"""
         self._data_dictionary = value
     
-    def get_data_dictionary(self):
+    def get_data_dictionary(self, refresh=False):
         """
-        Searches for and retrieves the data dictionary from the dataset resources.
+        Return the data dictionary, downloading it from the dataset resources if
+        it isn't stored yet. A downloaded dictionary is kept on the dataset and
+        saved in its <id>.json.
+        
+        Args:
+            refresh (bool, optional): Download it again even if it is stored (default: False).
         
         Returns:
-            str: The content of the data dictionary, or None if not found
+            str: The content of the data dictionary, one "column<TAB>description" line
+                per column for Excel dictionaries, or None if not found
         """
-        #print(f"DEBUG: Starting to retrieve data dictionary for dataset {self.id}")
-        if not self.metadata or 'result' not in self.metadata or not self.metadata['result'] or 'resources' not in self.metadata['result'][0]:
-            print("DEBUG: No metadata or resources found")
-            return None
-            
-        resources = self.metadata['result'][0]['resources']
-        #print(f"DEBUG: Found {len(resources)} resources in metadata")
-        dictionary_keywords = ["diccionario de datos", "diccionario", "Diccionario de datos", "Diccionario de Datos", "Diccionario De Datos"]
-        
-        # Filter resources to find data dictionary
-        dictionary_resources = []
-        for resource in resources:
-            resource_name = resource.get('name', '').lower()
-            for keyword in dictionary_keywords:
-                if keyword in resource_name:
-                    #print(f"DEBUG: Found potential data dictionary: {resource_name}")
-                    dictionary_resources.append(resource)
-                    break
-        
-        if not dictionary_resources:
-            #print("DEBUG: No data dictionary resources found")
+        if self.data_dictionary and not refresh:
+            return self.data_dictionary
+        data_dictionary = self._download_data_dictionary(refresh)
+        if data_dictionary is not None:
+            self._data_dictionary = data_dictionary
+            self._save_json("data dictionary")
+        return data_dictionary
+
+    def data_dictionary_frame(self):
+        """
+        Return the data dictionary as a DataFrame with 'column' and 'description'
+        columns, downloading it if needed (empty if there is none).
+        """
+        return parse_dictionary(self.get_data_dictionary())
+
+    def column_descriptions(self):
+        """Return a {column: description} mapping of the data dictionary, downloading it if needed."""
+        frame = self.data_dictionary_frame()
+        return dict(zip(frame['column'], frame['description']))
+
+    def _download_data_dictionary(self, refresh=False):
+        """Download and parse the first data dictionary resource, or return None."""
+        resource = find_dictionary_resource(self.metadata)
+        if resource is None:
             return None
-        
-        # Try to download and process the first matching dictionary resource
         try:
-            #print(f"DEBUG: Attempting to process {len(dictionary_resources)} data dictionary resources")
-            scraper = WebScraper()
-            resource = dictionary_resources[0]
-            resource_url = resource['url']
-            resource_format = resource.get('format', '').lower()
-            #print(f"DEBUG: Downloading data dictionary from {resource_url} (format: {resource_format})")
-            
-            # Download the content
-            response = scraper.get_response(resource_url)
-            #print(f"DEBUG: Download status code: {response.status_code if response else 'None'}")
-            if response is None or response.status_code != 200:
-                return None
-                
-            content = response.content
-            #print(f"DEBUG: Downloaded content size: {len(content)} bytes")
-            
-            # Process based on format
-            if resource_format == 'pdf':
-                #print("DEBUG: Found PDF data dictionary")
-                # For PDF, just return the URL since we can't easily extract text
-                return f"PDF data dictionary available at: {resource_url}"
-            elif resource_format in ['.xlsx', '.xls', 'xlsx', 'xls']:
-                #print("DEBUG: Processing Excel data dictionary")
-                # Process Excel files like in module.get_data_dictionary()
-                try:
-                    # Store the content in an in-memory file
-                    in_memory_file = io.BytesIO(content)
-                    
-                    # Load the Excel file into a DataFrame
-                    df = pd.read_excel(in_memory_file)
-                    #print(f"DEBUG: Excel data loaded, shape: {df.shape}")
-                    
-                    # Select only the first two columns, drop NaN values, and clean the data
-                    df_filtered = df.iloc[:, :2].dropna()  # First two columns and remove NaNs
-                    #print(f"DEBUG: Filtered data shape: {df_filtered.shape}")
-                    df_filtered = df_filtered.apply(lambda x: x.str.strip() if hasattr(x, 'str') else x)  # Strip whitespace
-                    
-                    # Convert to string without index or header
-                    df_text = df_filtered.to_string(index=False, header=False, justify='left')
-                    
-                    # Clean up excessive spaces and format with tabs
-                    df_text_cleaned = re.sub(r' {3,}', '\t', df_text)
-                    df_text_cleaned = '\n'.join(line.lstrip() for line in df_text_cleaned.split('\n'))
-                    #print(f"DEBUG: Processed text length: {len(df_text_cleaned)} chars")
-                    
-                    return df_text_cleaned
-                except Exception as e:
-                    #print(f"DEBUG: Error processing Excel file: {e}")
-                    return f"{resource_format.upper()} data dictionary available at: {resource_url}"
-            else:
-                #print(f"DEBUG: Attempting to decode text content from {resource_format} file")
-                # For text formats, decode and return the content
-                try:
-                    text_content = content.decode('utf-8')
-                    #print(f"DEBUG: Successfully decoded with utf-8, length: {len(text_content)}")
-                    return text_content
-                except UnicodeDecodeError:
-                    #print("DEBUG: utf-8 decode failed, trying latin1")
-                    try:
-                        text_content = content.decode('latin1')
-                        #print(f"DEBUG: Successfully decoded with latin1, length: {len(text_content)}")
-                        return text_content
-                    except:
-                        #print("DEBUG: All decoding attempts failed")
-                        return f"Data dictionary available at: {resource_url}"
-        except Exception as e:
-            #print(f"DEBUG: Error retrieving data dictionary: {str(e)}")
+            return fetch_dictionary(resource, refresh=refresh)
+        except ValueError:
+            return dictionary_notice(resource)
+        except Exception:
             return None
 
     def to_dict(self):
@@ -210,7 +197,7 @@ class Dataset:
         """
         scraper = WebScraper()
         try:
-            response = scraper.session.head(url, verify=verify_ssl, allow_redirects=True, timeout=10)
+            response = scraper.head(url, verify=verify_ssl, timeout=10)
             if response.status_code == 200 and 'Content-Length' in response.headers:
                 return int(response.headers['Content-Length'])
         except Exception:
@@ -242,56 +229,8 @@ class Dataset:
                 dataset_identifier = f"Title: {self.title or 'Unknown'}, URL: {self.url or 'Unknown'} ID: {self.id}"
                 log_error(f"No metadata available for dataset - {dataset_identifier}")
             #print(f"Warning: No metadata available for dataset {self.id}")
-            # Save the dataset info even if no files are downloaded
-            with open(os.path.join(folder_name, f"{self.id}.json"), 'w', encoding='utf-8') as json_file:
-                json.dump(self.to_dict(), json_file, ensure_ascii=False, indent=4)
-            return
-            
-        # Check if 'result' key exists
-        if 'result' not in self.metadata or not self.metadata['result']:
-            #print(f"Warning: No 'result' found in metadata for dataset {self.id}")
-            # Save the dataset info even if no files are downloaded
-            with open(os.path.join(folder_name, f"{self.id}.json"), 'w', encoding='utf-8') as json_file:
-                json.dump(self.to_dict(), json_file, ensure_ascii=False, indent=4)
-            return
-            
-        # Check if 'resources' key exists
-        if 'resources' not in self.metadata['result'][0]:
-            #print(f"Warning: No 'resources' found in metadata for dataset {self.id}")
-            # Save the dataset info even if no files are downloaded
-            with open(os.path.join(folder_name, f"{self.id}.json"), 'w', encoding='utf-8') as json_file:
-                json.dump(self.to_dict(), json_file, ensure_ascii=False, indent=4)
-            return
         
-        resources = self.metadata['result'][0]['resources']
-        
-        for resource in resources:
-            # Check if resource has required keys
-            if 'url' not in resource:
-                #print(f"Warning: Resource missing URL in dataset {self.id}")
-                continue
-                
-            resource_url = resource['url']
-            resource_format = resource.get('format', 'unknown')
-            
-            # Skip download if URL is empty
-            if resource_url == '':
-                #print(f"Skipping {resource.get('name', 'unnamed resource')} as URL is empty")
-                continue
-            
-            # Extract filename from URL or fall back to resource name
-            filename = self._extract_filename_from_url(resource_url)
-            if not filename:
-                # Fall back to original method
-                resource_name = resource.get('name', f'file_{id(resource)}')
-                file_extension = resource_format.lower()
-                filename = f"{resource_name}.{file_extension}"
-            
-            # Ensure the filename is URL-decoded (in case it wasn't done in _extract_filename_from_url)
-            filename = urllib.parse.unquote(filename)
-            
-            file_path = os.path.join(folder_name, filename)
-            
+        for resource_url, filename, file_path in self._resource_targets(folder_name):
             # Check if file exists and skip_existing is True
             if skip_existing and os.path.exists(file_path):
                 #print(f"Skipping {filename} as it already exists locally")
@@ -300,7 +239,7 @@ class Dataset:
             # Check file size if max_size is set
             if max_size > 0:
                 try:
-                    response = scraper.session.head(resource_url, verify=verify_ssl, timeout=request_timeout)
+                    response = scraper.head(resource_url, verify=verify_ssl, timeout=request_timeout, allow_redirects=False)
                     if "Content-Length" in response.headers:
                         file_size = int(response.headers["Content-Length"])
                         if file_size > max_size:
@@ -324,23 +263,78 @@ class Dataset:
                     else:
                         print(message)
                     # Continue with download attempt anyway
-            response = scraper.get_response(resource_url, verify=verify_ssl, timeout=request_timeout)
-            if response is not None and response.status_code == 200:
-                with open(file_path, 'wb') as file:
-                    file.write(response.content)
-                
-                time.sleep(5)  # Wait for 5 seconds before downloading the next file
-            else:
+            response = scraper.download(resource_url, file_path, verify=verify_ssl, timeout=request_timeout)
+            if response is None or response.status_code not in (200, 206, 416) or not os.path.exists(file_path):
                 status = response.status_code if response else "None (request failed)"
                 if log_errors:
                     log_error(f"Failed to download {filename}. Status code: {status}")
                 else:
                     print(f"Failed to download {filename}. Status code: {status}")
         
-        with open(os.path.join(folder_name, f"{self.id}.json"), 'w', encoding='utf-8') as json_file:
-            json.dump(self.to_dict(), json_file, ensure_ascii=False, indent=4)
+        self._write_metadata_json(folder_name)
+
+    def _folder(self):
+        """Folder where the dataset was saved by save() or download_files(), under module.DATASETS_DIR."""
+        from . import module  # module imports this one
+        return os.path.join(module.DATASETS_DIR, self.id)
+
+    def _resources(self):
+        """Return the resource list from the CKAN metadata, or an empty list."""
+        # Check if metadata has the expected structure
+        if not self.metadata or 'result' not in self.metadata or not self.metadata['result']:
+            return []
+        return self.metadata['result'][0].get('resources', [])
+
+    def _resource_targets(self, folder_name):
+        """
+        List the downloadable resources of the dataset.
+        
+        Args:
+            folder_name (str): Folder where the resources are stored
+            
+        Returns:
+            list: (resource_url, filename, file_path) tuples
+        """
+        targets = []
+        for resource in self._resources():
+            # Check if resource has required keys
+            if 'url' not in resource:
+                #print(f"Warning: Resource missing URL in dataset {self.id}")
+                continue
+                
+            resource_url = resource['url']
+            resource_format = resource.get('format', 'unknown')
+            
+            # Skip download if URL is empty
+            if resource_url == '':
+                #print(f"Skipping {resource.get('name', 'unnamed resource')} as URL is empty")
+                continue
+            
+            # Extract filename from URL or fall back to resource name
+            filename = self._extract_filename_from_url(resource_url)
+            if not filename:
+                # Fall back to original method
+                resource_name = resource.get('name', f'file_{id(resource)}')
+                file_extension = resource_format.lower()
+                filename = f"{resource_name}.{file_extension}"
+            
+            # Ensure the filename is URL-decoded (in case it wasn't done in _extract_filename_from_url)
+            filename = urllib.parse.unquote(filename)
+            
+            targets.append((resource_url, filename, os.path.join(folder_name, filename)))
+        return targets
+
+    def _write_metadata_json(self, folder_name):
+        """Save the dataset info as <id>.json inside its folder and index it."""
+        with _metadata_lock:
+            record = self.to_dict()
+            # Copied in one step, as other threads may be adding dialects while it's written
+            record['dialects'] = dict(record.get('dialects') or {})
+            _write_json(os.path.join(folder_name, f"{self.id}.json"), record, indent=4)
+        CatalogIndex(os.path.dirname(os.path.abspath(folder_name))).upsert(record)
 
-    def data(self, filename=None, file_index=0):
+    def data(self, filename=None, file_index=0, cache=True, dtype_backend=None, cache_dir=None, all_files=False,
+             sheet_name=0, nrows=None):
         """
         Load dataset files as pandas DataFrames.
         
@@ -348,6 +342,19 @@ class Dataset:
             filename (str, optional): Specific file to load. If None, loads the first available data file.
             file_index (int, optional): When multiple files are available and no filename is specified,
                                         determines which file to load (default: 0 - first file).
+            cache (bool, optional): Whether to keep downloaded resources in datasets/<id>/.resources
+                                    (revalidated by their last_modified) and to read and store parsed
+                                    files through the columnar cache in .frames (default: True).
+            dtype_backend (str, optional): pandas dtype backend of the result. 'pyarrow' parses CSVs
+                                           with the pyarrow engine into Arrow dtypes (strings included)
+                                           and memory-maps Parquet files instead of copying them.
+                                           'numpy_nullable' is also accepted (default: NumPy dtypes).
+            cache_dir (str, optional): Folder used instead of 'datasets' for the downloaded resources.
+            all_files (bool, optional): Load every data file and concatenate them, see data_all().
+            sheet_name (str or int, optional): Sheet to read from Excel files, by name or position
+                                               (default: 0 - first sheet). Each sheet is cached separately.
+            nrows (int, optional): Only load the first nrows rows, e.g. to preview a large file.
+                                   Partial frames are not cached.
         
         Returns:
             pandas.DataFrame: The loaded dataset as a DataFrame
@@ -357,85 +364,264 @@ class Dataset:
                 and no downloadable resources are available
             ValueError: If the file format is not supported or if the file_index is out of range
         """
+        if all_files:
+            return self.data_all(cache=cache, dtype_backend=dtype_backend, cache_dir=cache_dir)
+        source_type, source = self._select_source(filename, file_index)
+        options = {'dtype_backend': dtype_backend, 'sheet_name': sheet_name, 'nrows': nrows}
+        if source_type == 'local':
+            return self._load_local_file(source, cache, **options)
+        if cache:
+            return self._load_local_file(self._cached_resource(source, cache_dir), cache,
+                                         dialect_key=source['url'], **options)
+        return self._download_and_load_dataframe(source, **options)
+
+    def data_all(self, workers=None, source_column='source_file', join='outer', cache=True, dtype_backend=None,
+                 cache_dir=None):
+        """
+        Load every data file of the dataset and concatenate them into one DataFrame,
+        for tables split into monthly or yearly resources.
+        
+        The local files are used when the dataset folder has any; otherwise every
+        data resource is downloaded like in data(). Files are parsed in parallel
+        in a process pool and their columns are aligned by name.
+        
+        Args:
+            workers (int, optional): Number of processes parsing files (default: one per CPU).
+            source_column (str, optional): Column holding the file each row comes from,
+                                           or None to leave it out (default: 'source_file').
+            join (str, optional): 'outer' keeps every column, with missing values where a file
+                                  lacks it; 'inner' keeps the columns shared by all files.
+            cache, dtype_backend, cache_dir: As in data().
+        
+        Returns:
+            pandas.DataFrame: Rows of every file, in file order
+                
+        Raises:
+            FileNotFoundError: If there are no local files or downloadable resources
+        """
+        dataset_dir = self._folder()
+        local_files = self._local_data_files() if os.path.isdir(dataset_dir) else []
+        temp_paths = []
+        if local_files:
+            sources = [(os.path.basename(path), path, os.path.basename(path)) for path in sorted(local_files)]
+        else:
+            resources = self._data_resources()
+            if not resources:
+                raise FileNotFoundError(f"No data files found locally or available for download in dataset {self.id}")
+            # Download each URL once, even if several resources point to it
+            unique = {resource['url']: resource for resource in reversed(resources)}
+            fetch = (lambda resource: self._cached_resource(resource, cache_dir)) if cache else self._download_resource
+            with ThreadPoolExecutor(max_workers=min(8, len(unique))) as executor:
+                futures = {url: executor.submit(fetch, resource) for url, resource in unique.items()}
+            if not cache:
+                temp_paths = [future.result() for future in futures.values() if not future.exception()]
+            try:
+                paths = {url: future.result() for url, future in futures.items()}  # Raises the first download error
+            except BaseException:
+                # Don't leave the files that did download behind
+                for temp_path in temp_paths:
+                    self._remove_download(temp_path)
+                raise
+            sources = [(resource.get('name') or os.path.basename(resource['url']), paths[resource['url']], resource['url'])
+                       for resource in resources]
+        
+        jobs = {path: (path, self.dialects.get(dialect_key), cache, dtype_backend) for _, path, dialect_key in sources}
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        try:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = dict(zip(jobs, executor.map(_parse_file, *zip(*jobs.values()))))
+            else:
+                results = {path: _parse_file(*job) for path, job in jobs.items()}
+        finally:
+            for temp_path in temp_paths:
+                self._remove_download(temp_path)
+        
+        frames = []
+        dialects_changed = False
+        for name, path, dialect_key in sources:
+            df, dialect = results[path]
+            if dialect is not None and self.dialects.get(dialect_key) != dialect:
+                self.dialects[dialect_key] = dialect
+                dialects_changed = True
+            if source_column:
+                df = df.assign(**{source_column: name})
+            frames.append(df)
+        if dialects_changed:
+            self._save_json("CSV dialects")
+        
+        combined = pd.concat(frames, join=join, ignore_index=True)
+        if source_column:
+            combined[source_column] = combined.pop(source_column).astype('category')
+        return combined
+
+    def iter_data(self, filename=None, file_index=0, chunksize=DEFAULT_CHUNKSIZE, cache=True, cache_dir=None):
+        """
+        Iterate over a dataset file in DataFrame chunks, for files that don't fit in memory.
+        
+        The file is chosen like in data(). Remote resources are streamed to
+        disk first: into the resource cache shared with data(), or with
+        cache=False into a temporary file removed when the iteration ends.
+        
+        Args:
+            filename (str, optional): Specific file to load. If None, loads the first available data file.
+            file_index (int, optional): When multiple files are available and no filename is specified,
+                                        determines which file to load (default: 0 - first file).
+            chunksize (int, optional): Maximum number of rows per chunk (default: 100000).
+            cache (bool, optional): Whether to keep the downloaded resource (default: True).
+            cache_dir (str, optional): Folder used instead of 'datasets' for the downloaded resources.
+        
+        Yields:
+            pandas.DataFrame: Consecutive chunks of the file
+                
+        Raises:
+            FileNotFoundError: If no local file or downloadable resource matches
+            ValueError: If the file format is not supported or the download fails
+        """
+        source_type, source = self._select_source(filename, file_index)
+        if source_type == 'local':
+            yield from self._iter_file(source, chunksize)
+            return
+        if cache:
+            yield from self._iter_file(self._cached_resource(source, cache_dir), chunksize, dialect_key=source['url'])
+            return
+        
+        temp_path = self._download_resource(source)
+        try:
+            yield from self._iter_file(temp_path, chunksize, dialect_key=source['url'])
+        finally:
+            self._remove_download(temp_path)
+
+    def _iter_file(self, file_path, chunksize, dialect_key=None):
+        csv_options = None
+        if file_path.lower().endswith('.csv'):
+            dialect_key = dialect_key or os.path.basename(file_path)
+            csv_options = self.dialects.get(dialect_key) or sniff_csv(file_path)
+            self._remember_dialect(dialect_key, csv_options)
+        return iter_frames(file_path, chunksize, csv_options)
+
+    def _select_source(self, filename=None, file_index=0):
+        """
+        Choose the file loaded by data() and iter_data().
+        
+        Args:
+            filename (str, optional): Specific file to load
+            file_index (int, optional): Index of the file to load when no filename is given
+        
+        Returns:
+            tuple: ('local', file path) or ('remote', resource dict)
+        
+        Raises:
+            FileNotFoundError: If no local file or downloadable resource matches
+        """
         # Build the path to the dataset directory
-        dataset_dir = os.path.join('datasets', self.id)
+        dataset_dir = self._folder()
         
         # Check if directory exists and search for local files
         local_files_exist = os.path.isdir(dataset_dir)
-        data_files = []
-        
-        if local_files_exist:
-            # Search for data files with common extensions
-            for ext in ['.csv', '.xlsx', '.xls', '.json', '.parquet']:
-                found_files = glob.glob(os.path.join(dataset_dir, f'*{ext}'))
-                data_files.extend(found_files)
-            
-            # Filter out the dataset metadata JSON file and data dictionaries
-            data_files = [f for f in data_files 
-                         if not f.endswith(f"{self.id}.json") 
-                         and "diccionario de datos" not in os.path.basename(f).lower()
-                         and "Diccionario de datos" not in os.path.basename(f)
-                         and "Diccionario De Datos" not in os.path.basename(f)]
+        data_files = self._local_data_files() if local_files_exist else []
         
         # If a specific filename is provided and exists locally
         if filename and local_files_exist:
             file_path = os.path.join(dataset_dir, filename)
             if os.path.isfile(file_path):
-                return self._load_file_as_dataframe(file_path)
+                return 'local', file_path
         
         # If no local files found or looking for a specific file that's not local,
         # check if we can download on-demand from metadata
         if not data_files or (filename and not os.path.isfile(os.path.join(dataset_dir, filename))):
             # Check if we have metadata with resources
             if self.metadata and 'result' in self.metadata and self.metadata['result'] and 'resources' in self.metadata['result'][0]:
-                resources = self.metadata['result'][0]['resources']
-                
-                # Filter out data dictionaries
-                data_resources = []
-                for resource in resources:
-                    resource_name = resource['name'].lower() if resource.get('name') else ''
-                    resource_format = resource['format'].lower() if 'format' in resource else ''
-                    if ("diccionario de datos" not in resource_name and 
-                        "diccionario" not in resource_name and
-                        resource_format != 'pdf'):
-                        data_resources.append(resource)
+                data_resources = self._data_resources()
                 
                 # If looking for a specific file by name
                 if filename:
                     matching_resources = [r for r in data_resources 
                                          if r['name'] == filename or f"{r['name']}.{r['format'].lower()}" == filename]
                     if matching_resources:
-                        return self._download_and_load_dataframe(matching_resources[0])
+                        return 'remote', matching_resources[0]
                 
                 # If there are data resources available
                 elif data_resources:
                     # Check if file_index is valid
                     if file_index >= 0 and file_index < len(data_resources):
-                        return self._download_and_load_dataframe(data_resources[file_index])
+                        return 'remote', data_resources[file_index]
                     elif data_resources:
                         # If file_index is out of range, use the first resource
                         print(f"Warning: file_index {file_index} is out of range. Using first available resource.")
-                        return self._download_and_load_dataframe(data_resources[0])
+                        return 'remote', data_resources[0]
         
         # If we have local files, process them
         if data_files:
             # Check if file_index is valid for local files
             if file_index >= 0 and file_index < len(data_files):
-                return self._load_file_as_dataframe(data_files[file_index])
+                return 'local', data_files[file_index]
             else:
                 # If file_index is out of range, use the first file
                 print(f"Warning: file_index {file_index} is out of range. Using first available file.")
-                return self._load_file_as_dataframe(data_files[0])
+                return 'local', data_files[0]
         
         # If we reach here, we couldn't find or download any data files
         raise FileNotFoundError(f"No data files found locally or available for download in dataset {self.id}")
 
-    def _download_and_load_dataframe(self, resource):
+    def _data_resources(self):
+        """Return the resources of the metadata that hold data, without data dictionaries and PDFs."""
+        data_resources = []
+        for resource in self._resources():
+            resource_name = resource['name'].lower() if resource.get('name') else ''
+            resource_format = resource['format'].lower() if 'format' in resource else ''
+            if ("diccionario de datos" not in resource_name and 
+                "diccionario" not in resource_name and
+                resource_format != 'pdf'):
+                data_resources.append(resource)
+        return data_resources
+
+    def _local_data_files(self):
+        """
+        List the data files stored in the dataset folder.
+        
+        Returns:
+            list[str]: Paths of the CSV, Excel, JSON and Parquet files, without the
+                dataset metadata JSON file and data dictionaries
+        """
+        dataset_dir = self._folder()
+        data_files = []
+        # Search for data files with common extensions
+        for ext in ['.csv', '.xlsx', '.xls', '.json', '.parquet']:
+            found_files = glob.glob(os.path.join(dataset_dir, f'*{ext}'))
+            data_files.extend(found_files)
+        
+        # Filter out the dataset metadata JSON file and data dictionaries
+        return [f for f in data_files 
+                if not f.endswith(f"{self.id}.json") 
+                and "diccionario de datos" not in os.path.basename(f).lower()
+                and "Diccionario de datos" not in os.path.basename(f)
+                and "Diccionario De Datos" not in os.path.basename(f)]
+
+    def _load_local_file(self, file_path, cache=True, dtype_backend=None, dialect_key=None, sheet_name=0, nrows=None):
+        """Load a file of the dataset folder, through the columnar cache if enabled."""
+        def load(path):
+            return self._load_file_as_dataframe(path, dialect_key=dialect_key, dtype_backend=dtype_backend,
+                                                sheet_name=sheet_name, nrows=nrows)
+        
+        excel = file_path.lower().endswith(('.xlsx', '.xls'))
+        if not cache or nrows is not None or file_path.lower().endswith('.parquet'):
+            return load(file_path)
+        if excel and not isinstance(sheet_name, (str, int)):
+            # Several sheets come back as a dict of DataFrames
+            return load(file_path)
+        variant = f"sheet-{sheet_name}" if excel and sheet_name != 0 else None
+        return FrameCache(os.path.dirname(file_path), dtype_backend=dtype_backend, variant=variant).load(file_path, load)
+
+    def _download_and_load_dataframe(self, resource, dtype_backend=None, sheet_name=0, nrows=None):
         """
         Download a resource and load it as a pandas DataFrame.
         
         Args:
             resource (dict): Resource metadata containing URL and format
+            dtype_backend (str, optional): pandas dtype backend of the result
+            sheet_name (str or int, optional): Sheet to read from Excel files
+            nrows (int, optional): Only load the first nrows rows
             
         Returns:
             pandas.DataFrame: The loaded data
@@ -443,7 +629,21 @@ class Dataset:
         Raises:
             ValueError: If file format is not supported or download fails
         """
-        scraper = WebScraper()
+        temp_path = self._download_resource(resource)
+        try:
+            return self._load_file_as_dataframe(temp_path, dialect_key=resource['url'], dtype_backend=dtype_backend,
+                                                sheet_name=sheet_name, nrows=nrows)
+        finally:
+            self._remove_download(temp_path)
+
+    @staticmethod
+    def _resource_format(resource):
+        """
+        Return the file format of a resource, inferred from its URL if not given.
+        
+        Raises:
+            ValueError: If file format is not supported
+        """
         resource_url = resource['url']
         resource_format = resource['format'].lower() if 'format' in resource else ''
         
@@ -463,59 +663,93 @@ class Dataset:
         # Check if format is supported
         if resource_format not in ['csv', 'xlsx', 'xls', 'json', 'parquet']:
             raise ValueError(f"Unsupported file format: {resource_format}")
-        # Download the file
-        response = scraper.get_response(resource_url)
+        return resource_format
+
+    @staticmethod
+    def _fetch_resource(resource, file_path):
+        """Stream a resource to file_path, raising ValueError if the download fails."""
+        response = WebScraper().download(resource['url'], file_path, resume=False)
         if response is None:
             raise ValueError("Failed to download resource. Response was None")
         if response.status_code != 200:
             raise ValueError(f"Failed to download resource. Status code: {response.status_code}")
+
+    def _download_resource(self, resource):
+        """
+        Stream a resource to a temporary file whose extension matches its format.
         
-        # Create in-memory file object
-        content = response.content
-        content = response.content
-        
-        # For CSV files, use our existing encoding and separator detection logic
-        if resource_format == 'csv':
-            # Try multiple encodings and separators
-            encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1']
-            separators = [',', ';', '\t', '|']
+        Args:
+            resource (dict): Resource metadata containing URL and format
             
-            # First try different encodings with default separator
-            for encoding in encodings:
-                try:
-                    return pd.read_csv(io.BytesIO(content), encoding=encoding)
-                except UnicodeDecodeError:
-                    continue
-                except pd.errors.ParserError:
-                    # If it's a parser error, we might have the right encoding but wrong separator
-                    pass
+        Returns:
+            str: Path of the temporary file, to be removed with _remove_download()
+            
+        Raises:
+            ValueError: If file format is not supported or download fails
+        """
+        resource_format = self._resource_format(resource)
+        # Stream the file to a temporary path instead of holding it in memory
+        fd, temp_path = tempfile.mkstemp(suffix=f'.{resource_format}')
+        os.close(fd)
+        try:
+            self._fetch_resource(resource, temp_path)
+        except BaseException:
+            self._remove_download(temp_path)
+            raise
+        return temp_path
+
+    def _cached_resource(self, resource, cache_dir=None):
+        """
+        Return the local copy of a remote resource, downloading it if it is
+        missing or the resource's last_modified changed since it was stored.
+        
+        Args:
+            resource (dict): Resource metadata containing URL and format
+            cache_dir (str, optional): Base folder of the copies (default: the dataset folder)
             
-            # If we reach here, try different separators with each encoding
-            for encoding in encodings:
-                for sep in separators:
-                    try:
-                        return pd.read_csv(io.BytesIO(content), encoding=encoding, sep=sep)
-                    except (UnicodeDecodeError, pd.errors.ParserError):
-                        continue
+        Returns:
+            str: Path of the local copy
             
-            # Final fallback - try to read with the most permissive settings
-            return pd.read_csv(io.BytesIO(content), encoding='latin1', sep=None, engine='python')
-        
-        elif resource_format in ['xlsx', 'xls']:
-            return pd.read_excel(io.BytesIO(content))
-        elif resource_format == 'json':
-            return pd.read_json(io.BytesIO(content))
-        elif resource_format == 'parquet':
-            return pd.read_parquet(io.BytesIO(content))
-        else:
-            raise ValueError(f"Unsupported file format: {resource_format}")
+        Raises:
+            ValueError: If file format is not supported or download fails
+        """
+        folder = os.path.join(cache_dir, self.id) if cache_dir else self._folder()
+        folder = os.path.join(folder, RESOURCE_CACHE_FOLDER)
+        key = hashlib.sha256(resource['url'].encode('utf-8')).hexdigest()[:16]
+        file_path = os.path.join(folder, f"{key}.{self._resource_format(resource)}")
+        stamp_path = file_path + '.json'
+        version = resource.get('last_modified') or self.modified_date
+        
+        try:
+            with open(stamp_path, 'r', encoding='utf-8') as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            stamp = {}
+        if stamp.get('url') == resource['url'] and stamp.get('last_modified') == version and os.path.isfile(file_path):
+            return file_path
+        
+        os.makedirs(folder, exist_ok=True)
+        self._fetch_resource(resource, file_path)
+        _write_json(stamp_path, {'url': resource['url'], 'last_modified': version})
+        return file_path
 
-    def _load_file_as_dataframe(self, file_path):
+    @staticmethod
+    def _remove_download(temp_path):
+        for path in (temp_path, temp_path + '.part'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load_file_as_dataframe(self, file_path, dialect_key=None, dtype_backend=None, sheet_name=0, nrows=None):
         """
         Load a file as a pandas DataFrame based on its extension.
         
         Args:
             file_path (str): Path to the file
+            dialect_key (str, optional): Key of the CSV dialect in self.dialects
+                (default: the file name)
+            dtype_backend (str, optional): pandas dtype backend of the result
+            sheet_name (str or int, optional): Sheet to read from Excel files
+            nrows (int, optional): Only load the first nrows rows
             
         Returns:
             pandas.DataFrame: The loaded data
@@ -523,74 +757,26 @@ class Dataset:
         Raises:
             ValueError: If the file format is not supported
         """
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
-        if file_ext == '.csv':
-            # Try multiple encodings and separators
-            encodings = ['utf-8', 'latin1', 'cp1252', 'iso-8859-1']
-            separators = [',', ';', '\t', '|']
-            
-            # First try different encodings with default separator
-            for encoding in encodings:
-                try:
-                    return pd.read_csv(file_path, encoding=encoding)
-                except UnicodeDecodeError:
-                    continue
-                except pd.errors.ParserError:
-                    # If it's a parser error, we might have the right encoding but wrong separator
-                    pass
-            
-            # If we reach here, try different separators with each encoding
-            for encoding in encodings:
-                for sep in separators:
-                    try:
-                        return pd.read_csv(file_path, encoding=encoding, sep=sep)
-                    except (UnicodeDecodeError, pd.errors.ParserError):
-                        continue
-            
-            # If all attempts fail, try to convert the file to UTF-8 and then read it
-            try:
-                # Read the file in binary mode
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                
-                # Try to decode with a fallback encoding
-                decoded = content.decode('latin1', errors='replace')
-                
-                # Create a temporary UTF-8 file
-                utf8_path = file_path + '.utf8'
-                with open(utf8_path, 'w', encoding='utf-8') as f:
-                    f.write(decoded)
-                
-                # Try to read the UTF-8 file with different separators
-                for sep in separators:
-                    try:
-                        df = pd.read_csv(utf8_path, encoding='utf-8', sep=sep)
-                        # If successful, clean up and return
-                        os.remove(utf8_path)
-                        return df
-                    except pd.errors.ParserError:
-                        continue
-                
-                # Clean up if all separators failed
-                if os.path.exists(utf8_path):
-                    os.remove(utf8_path)
-                    
-            except Exception as e:
-                # If all else fails, raise a detailed error
-                raise ValueError(f"Could not read CSV file {file_path}: {str(e)}")
-            
-            # Final fallback - try to read with the most permissive settings
-            return pd.read_csv(file_path, encoding='latin1', sep=None, engine='python')
-            
-        elif file_ext in ['.xlsx', '.xls']:
-            return pd.read_excel(file_path)
-        elif file_ext == '.json':
-            return pd.read_json(file_path)
-        elif file_ext == '.parquet':
-            return pd.read_parquet(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {file_ext}")
+        dialect_key = dialect_key or os.path.basename(file_path)
+        df, dialect = read_frame(file_path, self.dialects.get(dialect_key), dtype_backend, sheet_name, nrows)
+        self._remember_dialect(dialect_key, dialect)
+        return df
+
+    def _remember_dialect(self, dialect_key, dialect):
+        """Store a CSV dialect detected while loading a file, saving it if it changed."""
+        if dialect is not None and self.dialects.get(dialect_key) != dialect:
+            self.dialects[dialect_key] = dialect
+            self._save_json("CSV dialects")
+
+    def _save_json(self, what):
+        """Persist fields learned after saving (what: for the error message) in the saved <id>.json, if there is one."""
+        folder_name = self._folder()
+        if not os.path.isfile(os.path.join(folder_name, f"{self.id}.json")):
+            return
+        try:
+            self._write_metadata_json(folder_name)
+        except OSError as e:
+            print(f"Could not save {what} for dataset {self.id}: {e}")
 
     def get_files_dict(self):
         """
@@ -660,4 +846,83 @@ class Dataset:
         Returns:
             str: Formatted string showing files details
         """
-        return self.format_files()
\ No newline at end of file
+        return self.format_files()
+
+
+# Marks LazyDataset fields that haven't been read from disk yet
+_NOT_LOADED = object()
+
+
+class LazyDataset(Dataset):
+    """
+    Dataset saved under the 'datasets' folder that keeps only its scalar
+    fields in memory. metadata, data_dictionary and dialects are read from the saved
+    <id>.json the first time they are needed (metadata, get_files_dict(),
+    data(), download_files(), to_dict()...).
+    
+    Args:
+        json_path (str): Path of the saved <id>.json file
+        The remaining arguments are the scalar fields of Dataset.
+    """
+
+    def __init__(self, json_path: str, id: str, title: str, description: str, categories: list, url: str, modified_date: str, release_date: str, publisher: str):
+        super().__init__(id, title, description, categories, url, modified_date, release_date, publisher,
+                         metadata=_NOT_LOADED, data_dictionary=_NOT_LOADED, dialects=_NOT_LOADED)
+        self._json_path = json_path
+
+    def _folder(self):
+        return os.path.dirname(self._json_path)
+
+    def _load_fields(self):
+        """Read the fields that are still unloaded from the JSON file."""
+        if _NOT_LOADED not in (self._metadata, self._data_dictionary, self._dialects):
+            return
+        with open(self._json_path, 'r', encoding='utf-8') as f:
+            dataset_dict = json.load(f)
+        if self._metadata is _NOT_LOADED:
+            self._metadata = dataset_dict.get('metadata')
+        if self._data_dictionary is _NOT_LOADED:
+            self._data_dictionary = dataset_dict.get('data_dictionary')
+        if self._dialects is _NOT_LOADED:
+            self._dialects = dataset_dict.get('dialects') or {}
+
+    @property
+    def loaded(self):
+        """Whether metadata has been read from disk."""
+        return self._metadata is not _NOT_LOADED
+
+    @property
+    def metadata(self):
+        if self._metadata is _NOT_LOADED:
+            self._load_fields()
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value):
+        self._metadata = value
+
+    @property
+    def data_dictionary(self):
+        if self._data_dictionary is _NOT_LOADED:
+            self._load_fields()
+        return Dataset.data_dictionary.fget(self)
+
+    @data_dictionary.setter
+    def data_dictionary(self, value):
+        self._data_dictionary = value
+
+    @property
+    def dialects(self):
+        if self._dialects is _NOT_LOADED:
+            self._load_fields()
+        return self._dialects
+
+    @dialects.setter
+    def dialects(self, value):
+        self._dialects = value
+
+    def to_dict(self):
+        self._load_fields()
+        dataset_dict = super().to_dict()
+        dataset_dict.pop('json_path', None)
+        return dataset_dict
@@ -0,0 +1,135 @@
+"""
+Data dictionaries: the resource describing the columns of a dataset.
+
+Most datasets publish it as an XLSX file whose first two columns hold each
+column name and its description. Datasets keep it as text, one
+"column<TAB>description" line per column, which parse_dictionary() turns
+back into a DataFrame.
+
+fetch_dictionary() keeps every parsed dictionary in memory by resource URL
+and last_modified, as many datasets of a publisher share the same file.
+"""
+import io
+import re
+import threading
+
+import pandas as pd
+
+from .readers import read_excel
+from .webscraper import WebScraper
+
+UNAVAILABLE = 'Diccionario de datos no disponible'
+EXCEL_FORMATS = ('xlsx', 'xls')
+COLUMNS = ['column', 'description']
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def find_dictionary_resource(metadata):
+    """Return the first resource of a CKAN package named like a data dictionary, or None."""
+    try:
+        resources = metadata['result'][0]['resources']
+    except (KeyError, IndexError, TypeError):
+        return None
+    for resource in resources or []:
+        if 'diccionario' in (resource.get('name') or '').lower():
+            return resource
+    return None
+
+def dictionary_format(resource_url, resource_format=''):
+    """Lowercase format of a dictionary resource, from its URL if not given (default: xlsx)."""
+    resource_format = (resource_format or '').lower().lstrip('.')
+    if resource_format:
+        return resource_format
+    extension = resource_url.rsplit('?', 1)[0].rsplit('.', 1)[-1].lower()
+    return extension if extension in EXCEL_FORMATS + ('pdf', 'csv', 'txt') else 'xlsx'
+
+def _clean(series):
+    """Cell values as single-line text, with runs of whitespace collapsed."""
+    return series.astype(str).str.split().str.join(' ')
+
+def read_dictionary(content):
+    """
+    Parse the content of an Excel data dictionary.
+
+    Returns:
+        pandas.DataFrame: 'column' and 'description' of every row with both values
+    """
+    df = read_excel(io.BytesIO(content)).iloc[:, :2].dropna()
+    if df.shape[1] < 2:
+        raise ValueError("The data dictionary has less than two columns")
+    frame = pd.DataFrame({'column': _clean(df.iloc[:, 0]), 'description': _clean(df.iloc[:, 1])})
+    return frame.reset_index(drop=True)
+
+def dictionary_notice(resource):
+    """Text stored for a dictionary resource that can't be parsed: where to find it."""
+    resource_format = dictionary_format(resource['url'], resource.get('format'))
+    return f"{resource_format.upper()} data dictionary available at: {resource['url']}"
+
+def dictionary_text(content, resource_format, resource_url):
+    """
+    Text stored on Dataset.data_dictionary for a downloaded dictionary resource.
+
+    Raises:
+        ValueError: If an Excel dictionary can't be parsed
+    """
+    if resource_format == 'pdf':
+        # PDFs can't be parsed, point to the file instead
+        return f"PDF data dictionary available at: {resource_url}"
+    if resource_format in EXCEL_FORMATS:
+        frame = read_dictionary(content)
+        return '\n'.join(f"{column}\t{description}" for column, description in frame.itertuples(index=False))
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('latin1')
+
+def parse_dictionary(text):
+    """
+    Parse data dictionary text back into a DataFrame of 'column' and 'description'.
+
+    Lines without a description, such as the notices stored for PDF or missing
+    dictionaries, are skipped.
+    """
+    rows = []
+    for line in (text or '').splitlines():
+        # Dictionaries saved by older versions may be aligned with spaces
+        parts = re.split(r'\t| {3,}', line.strip(), maxsplit=1)
+        if len(parts) == 2 and parts[0] and parts[1].strip():
+            rows.append((parts[0].strip(), parts[1].strip()))
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+def fetch_dictionary(resource, scraper=None, refresh=False):
+    """
+    Download and parse a data dictionary resource, or return the text already
+    parsed for the same URL and last_modified.
+
+    Args:
+        resource (dict): Resource with a 'url' and optionally 'format' and 'last_modified'
+        scraper (WebScraper, optional): Scraper used for the download
+        refresh (bool, optional): Download it even if it was already parsed
+
+    Returns:
+        str: The dictionary text (see dictionary_text()), or None if the download failed
+
+    Raises:
+        ValueError: If an Excel dictionary can't be parsed
+        requests.exceptions.RequestException: On network errors
+    """
+    resource_url = resource['url']
+    key = (resource_url, resource.get('last_modified'))
+    with _cache_lock:
+        if key in _cache and not refresh:
+            return _cache[key]
+    response = (scraper or WebScraper()).get_response(resource_url)
+    if response is None or response.status_code != 200:
+        return None
+    text = dictionary_text(response.content, dictionary_format(resource_url, resource.get('format')), resource_url)
+    with _cache_lock:
+        _cache[key] = text
+    return text
+
+def clear_cache():
+    """Forget the dictionaries parsed by fetch_dictionary()."""
+    with _cache_lock:
+        _cache.clear()
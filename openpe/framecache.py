@@ -0,0 +1,175 @@
+"""
+Columnar copies of parsed data files.
+
+Dataset.data() stores the DataFrame parsed from each local CSV/XLSX/JSON file
+as a Parquet (or Feather) file in a hidden ``.frames`` folder next to it. The
+copy is used as long as the source keeps its size and modification time, or
+its content hash when only the modification time changed.
+
+Requires the optional ``pyarrow`` dependency (``pip install openpe[cache]``);
+without it the cache is disabled and files are always parsed.
+"""
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - exercised only without the extra
+    pyarrow = None
+
+import pandas as pd
+
+CACHE_FOLDER = '.frames'
+FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _temp_path(path):
+    """Temporary name for writing path, unique to this process and thread."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def backend_options(dtype_backend):
+    return {'dtype_backend': dtype_backend} if dtype_backend else {}
+
+def read_parquet(file_path, dtype_backend=None):
+    """Read a Parquet file, memory-mapping it when the frame keeps Arrow memory."""
+    if dtype_backend == 'pyarrow':
+        return pd.read_parquet(file_path, dtype_backend='pyarrow', memory_map=True)
+    return pd.read_parquet(file_path, **backend_options(dtype_backend))
+
+class FrameCache:
+    """
+    Parsed DataFrames of the files in a dataset folder.
+
+    Args:
+        folder (str): Dataset folder holding the source files
+        format (str): 'parquet' (smaller) or 'feather' (faster to read)
+        dtype_backend (str, optional): pandas dtype backend of the cached frames.
+            Frames of each backend are stored separately; 'pyarrow' frames are
+            read from a memory map.
+        variant (str, optional): Name of a different frame parsed from the same
+            files, such as another sheet of Excel workbooks; stored separately
+    """
+
+    def __init__(self, folder, format='parquet', dtype_backend=None, variant=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported cache format: {format}")
+        self.folder = os.path.join(folder, CACHE_FOLDER)
+        self.format = format
+        self.dtype_backend = dtype_backend
+        self.variant = variant
+
+    @property
+    def enabled(self):
+        return pyarrow is not None
+
+    def _paths(self, source_path):
+        suffix = ''.join(f".{part}" for part in (self.variant, self.dtype_backend) if part)
+        frame_path = os.path.join(self.folder, os.path.basename(source_path) + suffix + FORMATS[self.format])
+        return frame_path, frame_path + '.json'
+
+    def _stamp(self, source_path):
+        stat = os.stat(source_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def fresh(self, source_path):
+        """Whether a cached copy matching the current source file exists."""
+        if not self.enabled:
+            return False
+        frame_path, stamp_path = self._paths(source_path)
+        try:
+            with open(stamp_path, 'r', encoding='utf-8') as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not os.path.exists(frame_path):
+            return False
+
+        current = self._stamp(source_path)
+        if stamp.get('size') != current['size'] or stamp.get('format') != self.format:
+            self.invalidate(source_path)
+            return False
+        if stamp.get('mtime_ns') != current['mtime_ns']:
+            # Touched or rewritten with the same size: compare the content
+            if stamp.get('sha256') != file_hash(source_path):
+                self.invalidate(source_path)
+                return False
+            stamp.update(current)
+            self._write_stamp(stamp_path, stamp)
+        return True
+
+    def get(self, source_path):
+        """Return the cached DataFrame of a source file, or None if it is missing or stale."""
+        if not self.fresh(source_path):
+            return None
+        try:
+            return self._read(self._paths(source_path)[0])
+        except Exception:
+            self.invalidate(source_path)
+            return None
+
+    def put(self, source_path, df):
+        """
+        Store the DataFrame parsed from a source file.
+
+        Returns:
+            bool: False if the DataFrame can't be stored in the cache format
+                (e.g. columns mixing numbers and text)
+        """
+        if not self.enabled:
+            return False
+        os.makedirs(self.folder, exist_ok=True)
+        frame_path, stamp_path = self._paths(source_path)
+        stamp = self._stamp(source_path)
+        stamp['sha256'] = file_hash(source_path)
+        stamp['format'] = self.format
+
+        temp_path = _temp_path(frame_path)
+        try:
+            self._write(df, temp_path)
+            os.replace(temp_path, frame_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+        self._write_stamp(stamp_path, stamp)
+        return True
+
+    def load(self, source_path, loader):
+        """Return the cached DataFrame of a source file, parsing it with loader() on a miss."""
+        df = self.get(source_path)
+        if df is None:
+            df = loader(source_path)
+            self.put(source_path, df)
+        return df
+
+    def invalidate(self, source_path):
+        for path in self._paths(source_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _read(self, frame_path):
+        if self.format == 'feather':
+            return pd.read_feather(frame_path, **backend_options(self.dtype_backend))
+        return read_parquet(frame_path, self.dtype_backend)
+
+    def _write(self, df, frame_path):
+        if self.format == 'feather':
+            # Feather can't store an index, keep the default one
+            df.reset_index(drop=True).to_feather(frame_path)
+        else:
+            df.to_parquet(frame_path)
+
+    @staticmethod
+    def _write_stamp(stamp_path, stamp):
+        temp_path = _temp_path(stamp_path)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+        os.replace(temp_path, stamp_path)
@@ -2,19 +2,56 @@ import json
 import os
 import requests
 from .webscraper import WebScraper
-from .utils import to_json, parse_html
-import io
+from .cache import ResponseCache
+from .scheduler import DownloadScheduler
+from .catalog import CatalogIndex
+from .framecache import FrameCache
+from .snapshot import SNAPSHOT_FILENAME, find_dataset, iter_datasets as iter_snapshot, snapshot_stats, write_snapshot
+from .dictionary import UNAVAILABLE, fetch_dictionary, find_dictionary_resource
+from .utils import to_json
+from .page import ListingPage, DatasetPage
 import pandas as pd
 import re
+import urllib.parse
 from tqdm import tqdm
 import math
-import time
 import datetime
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .errors import log_error  # Import log_error from new module
-from .dataset import Dataset  # Add this import statement
+from .dataset import Dataset, LazyDataset
+from .categories import Categories
 
 BASE_URL = "https://datosabiertos.gob.pe"
+API_PATH = "/api/3/action"
+# Filter query used by the 'api' backend of get_datasets
+API_CATEGORY_FILTER = 'groups:"{category}"'
+# Folder used by save(), load() and stats()
+DATASETS_DIR = 'datasets'
 scraper = WebScraper(BASE_URL)
+# Put in a shard's queue by _iter_shards() once the shard is done
+_SHARD_DONE = object()
+
+def enable_cache(directory='.openpe_cache', ttl=0, ttls=None, max_size=None):
+    """
+    Cache the listing pages, dataset pages and CKAN JSON fetched by this module.
+
+    Args:
+        directory (str): Folder where cached responses are stored
+        ttl (int): Seconds a response is reused without revalidation (default: 0)
+        ttls (dict, optional): Per-URL TTLs as {regex pattern: seconds}
+        max_size (int, optional): Maximum cache size in bytes (LRU eviction)
+
+    Returns:
+        ResponseCache: The cache, whose stats() reports hits and misses
+    """
+    scraper.cache = ResponseCache(directory, ttl=ttl, ttls=ttls, max_size=max_size)
+    return scraper.cache
+
+def disable_cache():
+    """Stop caching responses. Files already cached are kept on disk."""
+    scraper.cache = None
 
 def get_dataset(url, log_errors=False):
     #delete datosabiertos.gob.pe and alternatives on the url
@@ -40,70 +77,319 @@ def get_dataset(url, log_errors=False):
 def download_dataset(dataset: Dataset):
     dataset.download_files()
 
+def download_datasets(datasets, workers=8, per_host=2, bandwidth=None, **kwargs):
+    """
+    Download the resources of many datasets concurrently.
+
+    Args:
+        datasets: A Dataset object or a list of Dataset objects
+        workers (int): Number of files downloaded at the same time
+        per_host (int): Maximum concurrent downloads from a single host
+        bandwidth (int, optional): Global budget in bytes per second
+        **kwargs: Other DownloadScheduler options (base_folder, skip_existing,
+            verify_ssl, request_timeout, log_errors, show_progress)
+
+    Returns:
+        dict: Per-file and aggregate throughput report (see DownloadScheduler.run)
+    """
+    return DownloadScheduler(workers=workers, per_host=per_host, bandwidth=bandwidth, **kwargs).run(datasets)
+
+def sync_category(category, backend='scrape', download=False, stop_after=1, show_progress=True, log_errors=False,
+                  **download_options):
+    """
+    Update the saved datasets of a category with the ones changed on the portal.
+
+    The listing is sorted by last change, so it is walked newest-first and each
+    dataset's modified_date is compared with the one saved in the catalog index.
+    The walk stops after stop_after consecutive unchanged datasets, as the rest
+    of the listing is older. Only new and changed datasets are saved.
+
+    Args:
+        category (str): Category value, e.g. Categories.SALUD
+        backend (str): 'scrape' or 'api', see get_datasets(). With 'scrape' each
+            checked dataset costs a dataset page and its CKAN JSON; with 'api'
+            the dates come with the listing.
+        download (bool): Also download the files of the new and changed datasets
+        stop_after (int): Consecutive unchanged datasets that end the walk. Raise
+            it if datasets are also saved from other categories, which can leave
+            an up to date dataset ahead of changed ones.
+        show_progress (bool): Whether to show a progress bar for the downloads
+        log_errors (bool): Whether to log errors to the logs folder
+        **download_options: Other download_datasets() options
+
+    Returns:
+        dict: 'new' and 'updated' lists of saved datasets, and the number of
+            datasets 'checked'
+    """
+    saved = {record['id']: record['modified_date'] for record in CatalogIndex(DATASETS_DIR).records()}
+    result = {'new': [], 'updated': [], 'checked': 0}
+    unchanged = 0
+    datasets = get_datasets(category, show_progress=False, log_errors=log_errors, as_iterator=True, backend=backend)
+    try:
+        for dataset in datasets:
+            if not dataset.id:
+                continue  # Expansion failed, already reported
+            result['checked'] += 1
+            if dataset.id not in saved:
+                result['new'].append(dataset)
+            elif saved[dataset.id] != dataset.modified_date:
+                result['updated'].append(dataset)
+            else:
+                unchanged += 1
+                if unchanged >= stop_after:
+                    break
+                continue
+            unchanged = 0
+    finally:
+        datasets.close()
+
+    changed = result['new'] + result['updated']
+    if changed:
+        save(changed)
+        if download:
+            download_datasets(changed, base_folder=DATASETS_DIR, show_progress=show_progress, log_errors=log_errors,
+                              **download_options)
+    return result
+
 def get_items(page_content):
-    page = parse_html(page_content)
-    list_container = page.find('div', class_='view-content')
-    datasets = []
-    
-    for dataset_element in list_container.find_all('article', class_='node-search-result'):
-        dataset = {}
-        dataset['title'] = dataset_element.find('h2', class_='node-title').get_text(strip=True)
-        dataset['url'] = dataset_element.find('h2', class_='node-title').a['href']
-        dataset['organization'] = dataset_element.find('div', class_='group-membership').get_text(strip=True) if dataset_element.find('div', class_='group-membership') else ''
-        
-        # Check for topic (it might be nested in different divs)
-        topic_div = dataset_element.find('a', class_='name')
-        dataset['topic'] = topic_div.get_text(strip=True) if topic_div else "No topic"
-        
-        description_div = dataset_element.find('div', class_='node-description')
-        if description_div:
-            description = description_div.get_text(separator=' ', strip=True)
+    return ListingPage(page_content).items
+
+def get_next_page_url(page_content):
+    return ListingPage(page_content).next_page_url
+
+def get_datasets(category, limit=math.inf, show_progress=True, log_errors=False, as_iterator=False, start_page=1, workers=None, ordered=True, backend='scrape', rows=100, end_page=None, page_workers=None):
+    """
+    Fetch and expand the datasets listed under a category.
+
+    Args:
+        category (str): Category value, e.g. Categories.SALUD
+        limit (int): Maximum number of datasets to fetch (default: no limit)
+        show_progress (bool): Whether to show a progress bar
+        log_errors (bool): Whether to log errors to the logs folder
+        as_iterator (bool): Yield datasets one by one instead of returning a list
+        start_page (int): Listing page to start from (1-based)
+        workers (int, optional): Number of threads used to expand the datasets of
+            each listing page concurrently. None or 1 expands them one at a time.
+        ordered (bool): With workers, yield datasets in listing order (True) or
+            as soon as each one is expanded (False)
+        backend (str): 'scrape' to crawl the HTML listing and expand every dataset,
+            or 'api' to page through the CKAN package_search action, which returns
+            fully populated datasets without extra requests
+        rows (int): Datasets requested per package_search call with the 'api'
+            backend. start_page then counts pages of this size.
+        end_page (int, optional): Last listing page to fetch (inclusive). start_page
+            and end_page select a shard of the listing; pages are addressed directly,
+            so starting at any page costs no extra requests.
+        page_workers (int, optional): Split the pages from start_page to end_page
+            (default: the last page) into this many contiguous shards crawled in
+            parallel. Each shard expands its datasets with ``workers`` threads.
+
+    Returns:
+        list[Dataset] or generator of Dataset objects when as_iterator is True
+    """
+    if backend == 'api':
+        def crawl(first, last, progress):
+            return _iter_api_datasets(category, limit=limit, show_progress=progress, log_errors=log_errors,
+                                      start_page=first, end_page=last, rows=rows)
+    elif backend == 'scrape':
+        def crawl(first, last, progress):
+            return _iter_datasets(category, limit=limit, show_progress=progress, log_errors=log_errors,
+                                  start_page=first, end_page=last, workers=workers, ordered=ordered)
+    else:
+        raise ValueError(f"Unknown backend: {backend}. Use 'scrape' or 'api'")
+    if page_workers and page_workers > 1:
+        datasets = _iter_shards(category, crawl, backend, start_page, end_page, page_workers, rows=rows, limit=limit,
+                                show_progress=show_progress, log_errors=log_errors, ordered=ordered)
+    else:
+        datasets = crawl(start_page, end_page, show_progress)
+    if as_iterator:
+        return datasets
+    return list(datasets)
+
+def get_all_datasets(categories=None, workers=8, backend='scrape', show_progress=True, log_errors=False):
+    """
+    Fetch and expand the datasets of many categories, each dataset once.
+
+    The category listings are read concurrently first, then the datasets are
+    deduplicated by URL (or ID with the 'api' backend) and each one is expanded
+    a single time, with the categories of every listing it appeared in.
+
+    Args:
+        categories (iterable, optional): Category values (default: Categories.all_categories())
+        workers (int): Number of threads reading listings and expanding datasets
+        backend (str): 'scrape' or 'api', see get_datasets()
+        show_progress (bool): Whether to show a progress bar
+        log_errors (bool): Whether to log errors to the logs folder
+
+    Returns:
+        list[Dataset]: In the order they were first listed
+    """
+    if backend not in ('scrape', 'api'):
+        raise ValueError(f"Unknown backend: {backend}. Use 'scrape' or 'api'")
+    categories = sorted(Categories.all_categories()) if categories is None else list(categories)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        if backend == 'api':
+            listings = executor.map(
+                lambda category: [(d.id, d) for d in _iter_api_datasets(category, show_progress=False,
+                                                                          log_errors=log_errors)],
+                categories)
         else:
-            description = "No description available"
-        
-        dataset['description'] = description            
-        dataset['resources'] = []
-
-        # Extracting all resource links (xlsx, docx, csv)
-        resource_items = dataset_element.find_all('li')
-        for item in resource_items:
-            resource = {}
-            if item.a is not None and 'data-format' in item.a.attrs:
-                resource['format'] = item.a['data-format']
-            else:
-                resource['format'] = None
-            if item.a is not None and 'href' in item.a.attrs:
-                resource['format'] = item.a['href']
+            listings = executor.map(
+                lambda category: [(_site_path(item['url']), item) for item in _listing_items(category, log_errors)],
+                categories)
+
+        unique = {}
+        for category, listing in zip(categories, listings):
+            for key, entry in listing:
+                if key in unique:
+                    unique[key][1].append(category)
+                else:
+                    unique[key] = (entry, [category])
+
+        iterator = tqdm(total=len(unique), desc="Expanding datasets", unit=" dataset") if show_progress else None
+
+        def expand(entry, listed_categories):
+            if backend == 'api':
+                dataset = entry
             else:
-                resource['format'] = None
-            dataset['resources'].append(resource)
-    
-        datasets.append(dataset)
-    return datasets
+                dataset = expand_dataset(_item_to_dataset(entry, listed_categories[0]), log_errors=log_errors)
+            dataset.categories = _merge_categories(dataset.categories, listed_categories)
+            if iterator is not None:
+                iterator.update(1)
+            return dataset
 
-def get_next_page_url(page_content):
-    page = parse_html(page_content)
-    
-    # Find the pagination element
-    pagination = page.find('ul', class_='pagination pager')
+        try:
+            return list(executor.map(lambda pair: expand(*pair), unique.values()))
+        finally:
+            if iterator is not None:
+                iterator.close()
 
-    if pagination is None:
-        return None
-        
-    # Get the "next" page URL
-    next_page = pagination.find('li', class_='pager-next')
-    if next_page:
-        next_link = next_page.find('a')
-        if next_link and next_link.get('href'):
-            return next_link['href']
-    
-    # If we reach here, there's no next page
-    return None
+def _site_path(url):
+    """Path of a portal URL, the same whether or not it includes the host."""
+    return re.sub(r'https?://(www\.)?datosabiertos.gob.pe', '', url)
+
+def _merge_categories(categories, extra):
+    """Categories followed by the ones of extra it doesn't include (by ID for group dicts)."""
+    merged = list(categories or [])
+    known = {c.get('name') if isinstance(c, dict) else c for c in merged}
+    for category in extra:
+        if category not in known:
+            merged.append(category)
+            known.add(category)
+    return merged
+
+def _listing_items(category, log_errors=False):
+    """Every item listed under a category, without expanding them."""
+    items, page_url, page_counter = [], listing_url(category), 0
+    while page_url:
+        try:
+            page = ListingPage(scraper.fetch_page(page_url))
+        except Exception as e:
+            error_msg = f"Error fetching page: {e}"
+            print(error_msg)
+            if log_errors:
+                log_error(f"{error_msg} - category={category}, page={page_counter}")
+            break
+        items.extend(page.items)
+        page_url = page.next_page_url
+        page_counter += 1
+    return items
+
+def listing_url(category, page=1):
+    """URL of a 1-based listing page of a category, sorted by last change."""
+    url = f'search/field_topic/{category}/type/dataset?sort_by=changed'
+    return f'{url}&page={page - 1}' if page > 1 else url
+
+def _last_page(category, backend, start_page, rows=100):
+    """Number of the last listing page of a category, in pages of the backend."""
+    if backend == 'api':
+        count = api_action('package_search', fq=API_CATEGORY_FILTER.format(category=category), rows=0)['count']
+        return max(1, math.ceil(count / rows))
+    page = ListingPage(scraper.fetch_page(listing_url(category, start_page)))
+    return page.last_page or start_page
+
+def _shards(start_page, end_page, count):
+    """Split the pages from start_page to end_page into at most count contiguous (first, last) ranges."""
+    pages = end_page - start_page + 1
+    count = max(1, min(count, pages))
+    size, extra = divmod(pages, count)
+    shards, first = [], start_page
+    for index in range(count):
+        last = first + size - 1 + (1 if index < extra else 0)
+        shards.append((first, last))
+        first = last + 1
+    return shards
+
+def _iter_shards(category, crawl, backend, start_page, end_page, page_workers, rows=100, limit=math.inf,
+                 show_progress=True, log_errors=False, ordered=True):
+    """
+    Crawl page shards in parallel, yielding datasets as the shards produce them.
+
+    Each shard streams into a queue (one per shard when ordered, a shared one
+    otherwise). Once the consumer stops, on reaching limit or closing the
+    iterator, the shards stop after the dataset they are working on.
+    """
+    if end_page is None:
+        try:
+            end_page = _last_page(category, backend, start_page, rows)
+        except Exception as e:
+            error_msg = f"Error fetching {'package_search' if backend == 'api' else 'page'}: {e}"
+            print(error_msg)
+            if log_errors:
+                log_error(f"{error_msg} - category={category}, page={start_page - 1}")
+            return
+    if end_page < start_page:
+        return
+    shards = _shards(start_page, end_page, page_workers)
+    stop = threading.Event()
+    outputs = [queue.Queue() for _ in shards] if ordered else [queue.Queue()] * len(shards)
+
+    def run(shard, output):
+        datasets = crawl(*shard, False)
+        try:
+            for dataset in datasets:
+                if stop.is_set():
+                    break
+                output.put(dataset)
+        finally:
+            datasets.close()
+            output.put(_SHARD_DONE)
+
+    def drain(output, pending):
+        while pending:
+            item = output.get()
+            if item is _SHARD_DONE:
+                pending -= 1
+            else:
+                yield item
+
+    iterator = tqdm(desc="Fetching datasets", unit=" dataset") if show_progress else None
+    executor = ThreadPoolExecutor(max_workers=len(shards))
+    futures = [executor.submit(run, shard, output) for shard, output in zip(shards, outputs)]
+    sources = [(output, 1) for output in outputs] if ordered else [(outputs[0], len(shards))]
+    dataset_counter = 0
+    try:
+        for output, pending in sources:
+            for dataset in drain(output, pending):
+                if dataset_counter >= limit:
+                    return
+                dataset_counter += 1
+                if iterator is not None:
+                    iterator.update(1)
+                yield dataset
+                if dataset_counter >= limit:
+                    return
+        for future in futures:
+            future.result()
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+        if iterator is not None:
+            iterator.close()
 
-def get_datasets(category, limit=math.inf, show_progress=True, log_errors=False, as_iterator=False, start_page=1):
-    page_url = f'search/field_topic/{category}/type/dataset?sort_by=changed'
-    datasets = [] if not as_iterator else None
-    page_counter = 0
+def _iter_datasets(category, limit=math.inf, show_progress=True, log_errors=False, start_page=1, workers=None, ordered=True, end_page=None):
+    page_url = listing_url(category, start_page)
+    page_counter = start_page - 1
     dataset_counter = 0
 
     # Fix: Don't pass infinite limit to tqdm
@@ -117,65 +403,160 @@ def get_datasets(category, limit=math.inf, show_progress=True, log_errors=False,
     else:
         iterator = None
 
-    # Iterate to the start page first
-    for _ in range(start_page - 1):
-        try:
-            results = scraper.fetch_page(page_url)
-            page_url = get_next_page_url(results)
-            if not page_url:
-                raise ValueError("Reached the end of available pages before reaching the start page.")
-        except Exception as e:
-            error_msg = f"Error fetching page: {e}"
-            print(error_msg)
-            if log_errors:
-                log_error(f"{error_msg} - category={category}, page={page_counter}")
-            return datasets if not as_iterator else None
+    executor = ThreadPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    try:
+        while dataset_counter < limit and page_url and (end_page is None or page_counter < end_page):
+            try:
+                page = ListingPage(scraper.fetch_page(page_url))
+                items = page.items
+                if not math.isinf(limit):
+                    items = items[:int(limit - dataset_counter)]
 
-    while dataset_counter < limit and page_url:
-        try:
-            results = scraper.fetch_page(page_url)
-            items = get_items(results)
-            for item in items:
+                for dataset in _expand_items(items, category, log_errors=log_errors, executor=executor, ordered=ordered):
+                    dataset_counter += 1
+
+                    if show_progress and iterator is not None:
+                        iterator.update(1)
+
+                    yield dataset
+
+                page_url = page.next_page_url
+                page_counter += 1
+            except Exception as e:
+                error_msg = f"Error fetching page: {e}"
+                print(error_msg)
+                if log_errors:
+                    log_error(f"{error_msg} - category={category}, page={page_counter}")
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if show_progress and iterator is not None:
+            iterator.close()
+
+def _iter_api_datasets(category, limit=math.inf, show_progress=True, log_errors=False, start_page=1, rows=100, end_page=None):
+    start = (start_page - 1) * rows
+    stop = end_page * rows if end_page is not None else math.inf
+    dataset_counter = 0
+    iterator = None
+
+    try:
+        while dataset_counter < limit and start < stop:
+            try:
+                result = api_action('package_search', fq=API_CATEGORY_FILTER.format(category=category),
+                                    sort='metadata_modified desc', rows=rows, start=start)
+            except Exception as e:
+                error_msg = f"Error fetching package_search: {e}"
+                print(error_msg)
+                if log_errors:
+                    log_error(f"{error_msg} - category={category}, start={start}")
+                break
+
+            if show_progress and iterator is None:
+                total = max(0, min(limit, min(result.get('count', 0), stop) - start))
+                iterator = tqdm(total=total, desc="Fetching datasets", unit=" dataset")
+
+            packages = result.get('results', [])
+            for package in packages:
                 if dataset_counter >= limit:
                     break
-                    
-                dataset = Dataset(
-                    id=item.get('id', ''),
-                    title=item.get('title', ''),
-                    description=item.get('description', ''),
-                    categories=[category],
-                    url=item.get('url', ''),
-                    modified_date='',
-                    release_date='',
-                    publisher=item.get('organization', ''),
-                    metadata={}
-                )
-
-                dataset = expand_dataset(dataset, log_errors=log_errors)
+                dataset = _item_to_dataset({}, category)
+                _apply_metadata(dataset, _package_document(package), _package_category_ids(package, category))
                 dataset_counter += 1
-                
-                if show_progress and iterator is not None:
+
+                if iterator is not None:
                     iterator.update(1)
-                    
-                if as_iterator:
-                    yield dataset
-                else:
-                    datasets.append(dataset)
-            
-            page_url = get_next_page_url(results)
-            page_counter += 1
-        except Exception as e:
-            error_msg = f"Error fetching page: {e}"
-            print(error_msg)
-            if log_errors:
-                log_error(f"{error_msg} - category={category}, page={page_counter}")
-            break
 
-    if show_progress and iterator is not None:
-        iterator.close()
-    
-    if not as_iterator:
-        return datasets
+                yield dataset
+
+            start += len(packages)
+            if len(packages) < rows:
+                break
+    finally:
+        if iterator is not None:
+            iterator.close()
+
+def api_action(action, **params):
+    """
+    Call a CKAN Action API endpoint of the portal.
+
+    Args:
+        action (str): Action name, e.g. 'package_search'
+        **params: Query string parameters
+
+    Returns:
+        The 'result' member of the response
+
+    Raises:
+        ValueError: If the request fails or the API reports an error
+    """
+    url = f'{BASE_URL}{API_PATH}/{action}'
+    if params:
+        url = f'{url}?{urllib.parse.urlencode(params)}'
+    response = scraper.get_response(url)
+    if response is None:
+        raise ValueError(f"Failed to get response for URL: {url}")
+    if response.status_code != 200:
+        raise ValueError(f"API call {action} failed. Status code: {response.status_code}")
+    document = response.json()
+    if not document.get('success', False):
+        raise ValueError(f"API call {action} failed: {document.get('error')}")
+    return document['result']
+
+def _package_document(package):
+    """Wrap a package_search result like the package_show document linked from dataset pages."""
+    return {
+        'help': f'{BASE_URL}{API_PATH}/help_show?name=package_show',
+        'success': True,
+        'result': [package],
+    }
+
+def _package_category_ids(package, category):
+    """
+    Category IDs of a package_search result.
+
+    The API has no topic links, so the group names that are known categories
+    stand in for them. The category that was searched is always included.
+    """
+    category_ids = []
+    for group in package.get('groups') or []:
+        name = group.get('name', '') if isinstance(group, dict) else ''
+        if name not in category_ids and Categories.is_valid_category(name):
+            category_ids.append(name)
+    if category not in category_ids:
+        category_ids.append(category)
+    return category_ids
+
+def _item_to_dataset(item, category):
+    return Dataset(
+        id=item.get('id', ''),
+        title=item.get('title', ''),
+        description=item.get('description', ''),
+        categories=[category],
+        url=item.get('url', ''),
+        modified_date='',
+        release_date='',
+        publisher=item.get('organization', ''),
+        metadata={}
+    )
+
+def _expand_items(items, category, log_errors=False, executor=None, ordered=True):
+    """
+    Expand the listing items of one page, optionally through a thread pool.
+
+    Without an executor the items are expanded one at a time. With one, every
+    item is submitted at once and the results are yielded in listing order or
+    in completion order depending on ``ordered``.
+    """
+    datasets = [_item_to_dataset(item, category) for item in items]
+    if executor is None:
+        for dataset in datasets:
+            yield expand_dataset(dataset, log_errors=log_errors)
+        return
+
+    futures = [executor.submit(expand_dataset, dataset, log_errors=log_errors) for dataset in datasets]
+    for future in (futures if ordered else as_completed(futures)):
+        yield future.result()
 
 def expand_dataset(dataset, include_data_dictionary=False, log_errors=False):
     details = {}
@@ -192,23 +573,10 @@ def expand_dataset(dataset, include_data_dictionary=False, log_errors=False):
                 log_error(f"{error_msg} - {dataset_identifier}")
             return dataset
             
-        page = parse_html(response.content)
-
-        # Extract categories from HTML
-        category_ids = []
-        topic_container = page.find('div', class_='field-name-field-topic')
-        if topic_container:
-            category_links = topic_container.find_all('a', class_='name')
-            for link in category_links:
-                href = link.get('href', '')
-                # Extract the category ID from the href
-                category_id = href.split('/')[-1] if '/' in href else href
-                if category_id:
-                    category_ids.append(category_id)
+        category_ids, link = _parse_dataset_page(response.content)
 
         # Check if the link element exists before accessing 'href'
-        link_element = page.find('a', {'title': 'json view of content'})
-        if link_element is None:
+        if link is None:
             error_msg = "JSON link not found in page"
             print(error_msg)
             if log_errors:
@@ -216,47 +584,20 @@ def expand_dataset(dataset, include_data_dictionary=False, log_errors=False):
                 log_error(f"{error_msg} - {dataset_identifier}")
             return dataset
             
-        link = link_element['href']
         details['format_json_url'] = link
 
         metadata = scraper.get_response(link)
 
         details['format_json'] = metadata.json()
-        dataset.metadata = metadata.json()
-        
-        # Safely extract fields with defaults for missing values
-        result = metadata.json().get('result', [{}])[0] if metadata.json().get('result') else {}
-        
-        dataset.title = result.get('title', '')
-        dataset.description = result.get('notes', '')  # Using get() with default empty string
-        dataset.url = result.get('url', '')
-        dataset.id = result.get('id', '')
-        dataset.modified_date = result.get('metadata_modified', '')
-        dataset.release_date = result.get('metadata_created', '')
-        
-        # Handle nested groups data safely
-        try:
-            if result.get('groups') and len(result['groups']) > 0:
-                dataset.publisher = result['groups'][0].get('title', '')
-                dataset.categories = result['groups']
-            else:
-                dataset.publisher = ''
-                dataset.categories = []
-        except (KeyError, IndexError, TypeError):
-            dataset.publisher = ''
-            dataset.categories = []
-        
-        # Add the extracted category IDs to the dataset
-        if category_ids:
-            dataset.categories = category_ids
+        _apply_metadata(dataset, metadata.json(), category_ids)
 
         if include_data_dictionary:
-            data_dictionary_url = get_data_dictionary_url(metadata.json())
+            resource = find_dictionary_resource(metadata.json())
 
-            if data_dictionary_url:
-                dataset.data_dictionary = get_data_dictionary(data_dictionary_url, log_errors=log_errors)
+            if resource:
+                dataset.data_dictionary = _fetch_data_dictionary(resource, log_errors=log_errors)
             else:
-                dataset.data_dictionary = 'Diccionario de datos no disponible'
+                dataset.data_dictionary = UNAVAILABLE
     except AttributeError:
         # Handle case where find() returns None or href doesn't exist
         details['format_json_url'] = None
@@ -277,51 +618,65 @@ def expand_dataset(dataset, include_data_dictionary=False, log_errors=False):
             log_error(f"{error_msg} - {dataset_identifier}")
     return dataset
 
-def get_data_dictionary_url(item):
-    diccionario_url = None
+def _parse_dataset_page(page_content):
+    """
+    Extract the topic category IDs and the CKAN JSON link from a dataset page.
+
+    Returns:
+        tuple: (list of category IDs, JSON link or None)
+    """
+    page = DatasetPage(page_content)
+    return page.category_ids, page.json_url
+
+def _apply_metadata(dataset, metadata, category_ids=None):
+    """Fill the dataset fields from a CKAN package document."""
+    dataset.metadata = metadata
+    
+    # Safely extract fields with defaults for missing values
+    result = metadata.get('result', [{}])[0] if metadata.get('result') else {}
+    
+    dataset.title = result.get('title', '')
+    dataset.description = result.get('notes', '')  # Using get() with default empty string
+    dataset.url = result.get('url', '')
+    dataset.id = result.get('id', '')
+    dataset.modified_date = result.get('metadata_modified', '')
+    dataset.release_date = result.get('metadata_created', '')
+    
+    # Handle nested groups data safely
     try:
-        for resource in item['result'][0]['resources']:
-            if "Diccionario" in resource['name']:
-                diccionario_url = resource['url']
-    except KeyError as e:
-        # If 'resources' is missing, silently ignore and return None
-        pass
-    except Exception as e:
-        print(f"Error processing item: {str(e)}")
-    return diccionario_url
+        if result.get('groups') and len(result['groups']) > 0:
+            dataset.publisher = result['groups'][0].get('title', '')
+            dataset.categories = result['groups']
+        else:
+            dataset.publisher = ''
+            dataset.categories = []
+    except (KeyError, IndexError, TypeError):
+        dataset.publisher = ''
+        dataset.categories = []
+    
+    # Add the extracted category IDs to the dataset
+    if category_ids:
+        dataset.categories = category_ids
+    return dataset
+
+def get_data_dictionary_url(item):
+    resource = find_dictionary_resource(item)
+    return resource['url'] if resource else None
             
 def get_data_dictionary(url, headers=None, log_errors=False):
-    scraper_with_headers = WebScraper(BASE_URL, headers=headers)
+    return _fetch_data_dictionary({'url': url}, WebScraper(BASE_URL, headers=headers), log_errors)
+
+def _fetch_data_dictionary(resource, scraper=None, log_errors=False, refresh=False):
+    """fetch_dictionary() that reports errors and returns None instead of raising."""
+    url = resource['url']
     try:
-        # Fetch the response from the URL
-        response = scraper_with_headers.get_response(url)
-        
-        # Check if the request was successful
-        if response.status_code == 200:
-            # Store the content in an in-memory file
-            in_memory_file = io.BytesIO(response.content)
-            
-            # Load the Excel file into a DataFrame
-            df = pd.read_excel(in_memory_file)
-            
-            # Select only the first two columns, drop NaN values, and clean the data
-            df_filtered = df.iloc[:, :2].dropna()  # First two columns and remove NaNs
-            df_filtered = df_filtered.apply(lambda x: x.str.strip())  # Strip whitespace
-            
-            # Convert to string without index or header
-            df_text = df_filtered.to_string(index=False, header=False, justify='left')
-            
-            # Clean up excessive spaces and format with tabs
-            df_text_cleaned = re.sub(r' {3,}', '\t', df_text)
-            df_text_cleaned = '\n'.join(line.lstrip() for line in df_text_cleaned.split('\n'))
-            
-            return df_text_cleaned
-        else:
-            error_msg = f"Failed to download. Status code: {response.status_code}"
+        data_dictionary = fetch_dictionary(resource, scraper, refresh)
+        if data_dictionary is None:
+            error_msg = "Failed to download the data dictionary"
             print(error_msg)
             if log_errors:
                 log_error(f"{error_msg} - {url}")
-            return None
+        return data_dictionary
     
     except requests.exceptions.RequestException as e:
         error_msg = f"Error fetching the URL: {e}"
@@ -348,51 +703,163 @@ def get_data_dictionary(url, headers=None, log_errors=False):
             log_error(f"{error_msg} - {url}")
         return None
 
+def fetch_data_dictionaries(datasets, workers=8, refresh=False, show_progress=True, log_errors=False):
+    """
+    Download and parse the data dictionaries of many datasets concurrently.
+
+    Datasets sharing a dictionary file (same URL) are served by a single
+    download, and dictionaries parsed earlier in the process are reused. Each
+    dictionary is stored on its datasets, and saved in their <id>.json for
+    datasets saved on disk.
+
+    Args:
+        datasets (list): Expanded datasets (their metadata lists the resources)
+        workers (int): Number of dictionaries downloaded at the same time
+        refresh (bool): Also fetch the datasets that already have a dictionary
+        show_progress (bool): Show a progress bar
+        log_errors (bool): Log failed downloads
+
+    Returns:
+        list: The same datasets
+    """
+    datasets = [datasets] if isinstance(datasets, Dataset) else list(datasets)
+    by_url = {}
+    for dataset in datasets:
+        if dataset.data_dictionary and not refresh:
+            continue
+        resource = find_dictionary_resource(dataset.metadata)
+        if resource is not None:
+            by_url.setdefault(resource['url'], (resource, []))[1].append(dataset)
+    if not by_url:
+        return datasets
+
+    progress = tqdm(total=len(by_url), desc="Fetching data dictionaries", unit="dictionary") if show_progress else None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(_fetch_data_dictionary, resource, log_errors=log_errors, refresh=refresh): url
+                   for url, (resource, _) in by_url.items()}
+        for future in as_completed(futures):
+            data_dictionary = future.result()
+            if data_dictionary is not None:
+                for dataset in by_url[futures[future]][1]:
+                    dataset.data_dictionary = data_dictionary
+                    dataset._save_json("data dictionary")
+            if progress is not None:
+                progress.update(1)
+    if progress is not None:
+        progress.close()
+    return datasets
+
 def expand_datasets(datasets, filename=None, show_progress=True, log_errors=False):
     expanded_datasets = []
     iterator = tqdm(datasets, desc="Expanding datasets", unit="dataset") if show_progress else datasets
 
     for dataset in iterator:
         expanded_datasets.append(expand_dataset(dataset, log_errors=log_errors))
-        time.sleep(1)  # Add a 5 seconds wait
 
     if filename:
         to_json([dataset.__dict__ for dataset in expanded_datasets], filename)
     return datasets
 
-def save(datasets):
+def save(datasets, format='json', path=None):
     """
     Save a dataset or list of datasets in JSON format inside the 'datasets' folder.
-    Each dataset is saved in its own subfolder named after its ID.
+    Each dataset is saved in its own subfolder named after its ID and added to
+    the catalog index.
+    
+    With format='jsonl' the datasets are instead written in one streaming pass to
+    a single gzip-compressed JSON Lines snapshot (datasets/catalog.jsonl.gz by
+    default), replacing the previous one. It is much faster for whole catalogs,
+    but the snapshot isn't indexed: load() reads it sequentially.
     
     Args:
-        datasets: A single Dataset object or a list of Dataset objects.
+        datasets: A single Dataset object or a list of Dataset objects. With
+            format='jsonl' any iterable works, e.g. get_datasets(as_iterator=True).
+        format (str): 'json' (a folder per dataset) or 'jsonl' (one snapshot file)
+        path (str, optional): Snapshot file for format='jsonl'
     
     Returns:
         None
     """
+    if format == 'jsonl':
+        write_snapshot([datasets] if isinstance(datasets, Dataset) else datasets,
+                       path or os.path.join(DATASETS_DIR, SNAPSHOT_FILENAME))
+        return
+    if format != 'json':
+        raise ValueError(f"Unsupported format: {format}. Use 'json' or 'jsonl'")
+
     # Convert single dataset to list for uniform handling
     if not isinstance(datasets, list):
         datasets = [datasets]
     
     # Create datasets directory if it doesn't exist
-    os.makedirs('datasets', exist_ok=True)
+    os.makedirs(DATASETS_DIR, exist_ok=True)
     
+    records = []
     for dataset in datasets:
         # Create a directory for this dataset
-        dataset_dir = os.path.join('datasets', dataset.id)
+        dataset_dir = os.path.join(DATASETS_DIR, dataset.id)
         os.makedirs(dataset_dir, exist_ok=True)
         
         # Convert dataset to a serializable dictionary
         # This assumes that dataset can be serialized to JSON
         dataset_dict = dataset.to_dict() if hasattr(dataset, 'to_dict') else dataset.__dict__
+        records.append(dataset_dict)
         
         # Save dataset as JSON
         json_path = os.path.join(dataset_dir, f"{dataset.id}.json")
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(dataset_dict, f, indent=4, ensure_ascii=False)
 
-def load(dataset_name=None):
+    CatalogIndex(DATASETS_DIR).upsert(records)
+
+def rebuild_index():
+    """
+    Rebuild the catalog index from the dataset folders inside 'datasets'.
+    Only needed for folders written without save() or download_files().
+    
+    Returns:
+        int: Number of datasets indexed
+    """
+    return CatalogIndex(DATASETS_DIR).rebuild()
+
+def _load_dataset(dataset_id):
+    """Load datasets/<id>/<id>.json as a Dataset, or return None if it doesn't exist."""
+    json_path = os.path.join(DATASETS_DIR, dataset_id, f"{dataset_id}.json")
+    if not os.path.isfile(json_path):
+        return None
+    with open(json_path, 'r', encoding='utf-8') as f:
+        dataset_dict = json.load(f)
+    return Dataset(**dataset_dict)
+
+def _load_datasets(records, lazy=True):
+    """Build Dataset (or LazyDataset) objects for catalog index records."""
+    datasets = []
+    for record in records:
+        try:
+            if lazy:
+                json_path = os.path.join(DATASETS_DIR, record['id'], f"{record['id']}.json")
+                dataset = LazyDataset(json_path, **record) if os.path.isfile(json_path) else None
+            else:
+                dataset = _load_dataset(record['id'])
+        except Exception as e:
+            print(f"Error loading dataset {record['id']}: {e}")
+            continue
+        if dataset is not None:
+            datasets.append(dataset)
+    return datasets
+
+def _catalog_snapshot():
+    """
+    The default snapshot when it is what load(), load_by_category() and stats()
+    read: it exists and no dataset folder is indexed. The index isn't opened
+    (and so not created) if it doesn't exist yet.
+    """
+    snapshot = os.path.join(DATASETS_DIR, SNAPSHOT_FILENAME)
+    if os.path.isfile(snapshot) and not CatalogIndex(DATASETS_DIR).count():
+        return snapshot
+    return None
+
+def load(dataset_name=None, lazy=True, path=None):
     """
     Load datasets from the 'datasets' folder.
     
@@ -400,85 +867,63 @@ def load(dataset_name=None):
         dataset_name (str, optional): Name of a specific dataset to load.
             If not provided, all datasets will be loaded.
             This can be either the dataset ID (folder name) or the dataset's display name.
+        lazy (bool): If True, return LazyDataset objects that read metadata and
+            data_dictionary from disk only when they are accessed. Default is True.
+        path (str, optional): Read a snapshot written by save(format='jsonl')
+            instead. The default snapshot is also read when no dataset folder
+            is indexed. Snapshot datasets are always fully loaded.
     
     Returns:
         Dataset or list[Dataset]: A single Dataset object if dataset_name is provided,
             or a list of Dataset objects if no dataset_name is provided.
     """
-    datasets_dir = 'datasets'
-    
+    snapshot = path or _catalog_snapshot()
+    if snapshot is not None:
+        if not dataset_name:
+            return list(iter_snapshot(snapshot))
+        dataset = find_dataset(snapshot, dataset_name)
+        if dataset is None:
+            raise FileNotFoundError(f"No dataset found with name: {dataset_name}")
+        return dataset
+
     # Check if datasets directory exists
-    if not os.path.isdir(datasets_dir):
+    if not os.path.isdir(DATASETS_DIR):
         if dataset_name:
-            raise FileNotFoundError(f"Dataset directory not found: {datasets_dir}")
+            raise FileNotFoundError(f"Dataset directory not found: {DATASETS_DIR}")
         return []
     
-    # Direct match - check if dataset_name is actually an ID (folder name)
-    if dataset_name and os.path.isdir(os.path.join(datasets_dir, dataset_name)):
-        dataset_dir = os.path.join(datasets_dir, dataset_name)
-        json_path = os.path.join(dataset_dir, f"{dataset_name}.json")
-        
-        if os.path.isfile(json_path):
-            with open(json_path, 'r', encoding='utf-8') as f:
-                dataset_dict = json.load(f)
-            return Dataset(**dataset_dict)
-    
-    # If no direct match or no specific dataset requested, load all datasets
-    datasets = []
-    for item in os.listdir(datasets_dir):
-        item_path = os.path.join(datasets_dir, item)
-        # Check if it's a directory
-        if os.path.isdir(item_path):
-            json_path = os.path.join(item_path, f"{item}.json")
-            # Check if the JSON file exists
-            if os.path.isfile(json_path):
-                try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        dataset_dict = json.load(f)
-                    
-                    # Create dataset object
-                    dataset = Dataset(**dataset_dict)
-                    
-                    # If looking for a specific dataset by name
-                    if dataset_name:
-                        # Check if the dataset name matches in metadata
-                        try:
-                            if (dataset.metadata and 
-                                'result' in dataset.metadata and 
-                                dataset.metadata['result'] and 
-                                dataset.metadata['result'][0].get('name') == dataset_name):
-                                return dataset
-                        except (KeyError, IndexError, AttributeError):
-                            # Skip this dataset if there's an issue with the metadata structure
-                            pass
-                    else:
-                        datasets.append(dataset)
-                except Exception as e:
-                    print(f"Error loading dataset {item}: {e}")
-    
-    # If we're looking for a specific dataset but didn't find it
-    if dataset_name:
+    index = CatalogIndex(DATASETS_DIR)
+    if not dataset_name:
+        return _load_datasets(index.records(), lazy)
+
+    # Look the name up as an ID first, then as a CKAN name or title
+    datasets = _load_datasets(index.records(ids=[dataset_name]) or index.records(name=dataset_name), lazy)
+    if datasets:
+        return datasets[0]
+
+    # Folders that aren't in the index yet can still be loaded by ID
+    dataset = _load_dataset(dataset_name)
+    if dataset is None:
         raise FileNotFoundError(f"No dataset found with name: {dataset_name}")
-    
-    return datasets
+    return dataset
 
-def load_by_category(category):
+def load_by_category(category, lazy=True):
     """
     Load all datasets that belong to a specific category.
     
     Args:
         category (str): The category to filter datasets by.
+        lazy (bool): If True, return LazyDataset objects (see load()). Default is True.
         
     Returns:
         list[Dataset]: A list of Dataset objects that belong to the specified category.
     """
-    # Load all datasets
-    all_datasets = load()
-    
-    # Filter datasets by category
-    filtered_datasets = [dataset for dataset in all_datasets if category in dataset.categories]
-    
-    return filtered_datasets
+    if not os.path.isdir(DATASETS_DIR):
+        return []
+    snapshot = _catalog_snapshot()
+    if snapshot is not None:
+        return list(iter_snapshot(snapshot, category=category))
+    return _load_datasets(CatalogIndex(DATASETS_DIR).records(category=category), lazy)
 
 def stats(as_dict=False):
     """
@@ -488,25 +933,62 @@ def stats(as_dict=False):
         as_dict (bool): If True, return the results as a dictionary.
                         If False, print the results. Default is False.
     """
-    datasets = load()
-    total_datasets = len(datasets)
-    
-    # Count datasets by category
-    category_counts = {}
-    for dataset in datasets:
-        for category in dataset.categories:
-            category_counts[category] = category_counts.get(category, 0) + 1
-    
-    # Sort categories by count in descending order
-    sorted_categories = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
+    snapshot = _catalog_snapshot() if os.path.isdir(DATASETS_DIR) else None
+    if snapshot is not None:
+        result = snapshot_stats(snapshot)
+    elif os.path.isdir(DATASETS_DIR):
+        result = CatalogIndex(DATASETS_DIR).stats()
+    else:
+        result = {"total": 0, "categories": {}}
     
     if as_dict:
-        return {
-            "total": total_datasets,
-            "categories": {category: count for category, count in sorted_categories}
-        }
+        return result
     else:
-        print(f"Total datasets: {total_datasets}")
+        print(f"Total datasets: {result['total']}")
         print("\nCategorias:")
-        for category, count in sorted_categories:
-            print(f"{category}: {count}")
\ No newline at end of file
+        for category, count in result['categories'].items():
+            print(f"{category}: {count}")
+
+def prewarm_cache(category, workers=1, show_progress=True, log_errors=False):
+    """
+    Parse the local data files of every saved dataset in a category and store
+    their columnar copies, so later Dataset.data() calls read the cache.
+    
+    Args:
+        category (str): Category of the datasets to prewarm
+        workers (int): Number of files parsed at the same time
+        show_progress (bool): Whether to show a progress bar
+        log_errors (bool): Whether to log errors
+    
+    Returns:
+        dict: Number of files 'cached', already 'up_to_date' and 'failed'
+    """
+    jobs = [(dataset, file_path) for dataset in load_by_category(category)
+            for file_path in dataset._local_data_files() if not file_path.lower().endswith('.parquet')]
+    result = {'cached': 0, 'up_to_date': 0, 'failed': 0}
+
+    def warm(job):
+        dataset, file_path = job
+        frames = FrameCache(os.path.dirname(file_path))
+        if frames.fresh(file_path):
+            return 'up_to_date'
+        try:
+            df = dataset._load_file_as_dataframe(file_path)
+        except Exception as e:
+            message = f"Error loading {file_path}: {e}"
+            if log_errors:
+                log_error(message)
+            else:
+                print(message)
+            return 'failed'
+        return 'cached' if frames.put(file_path, df) else 'failed'
+
+    progress = tqdm(total=len(jobs), desc=f"Caching {category}", unit=" file") if show_progress else None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for outcome in executor.map(warm, jobs):
+            result[outcome] += 1
+            if progress is not None:
+                progress.update(1)
+    if progress is not None:
+        progress.close()
+    return result
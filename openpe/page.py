@@ -0,0 +1,223 @@
+"""
+Parsed representations of the portal pages the package scrapes.
+
+Each page is parsed exactly once and every field the crawler needs is
+extracted in that pass. When lxml is installed it is used through XPath,
+otherwise BeautifulSoup's html.parser is restricted with a SoupStrainer to
+the parts of the page that matter.
+"""
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+DEFAULT_BACKEND = 'lxml' if lxml is not None else 'html.parser'
+
+# html.parser only builds the results container and the pager of listing pages
+_LISTING_STRAINER = SoupStrainer(['div', 'ul'], class_=re.compile(r'(^|\s)(view-content|pager)(\s|$)'))
+
+class _DatasetPageStrainer(SoupStrainer):
+    """Only builds the topic field and the CKAN JSON link of a dataset page."""
+
+    def __init__(self):
+        super().__init__(['div', 'a'])
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        if name == 'a':
+            return attrs.get('title') == 'json view of content'
+        classes = attrs.get('class') or ''
+        return name == 'div' and 'field-name-field-topic' in (classes.split() if isinstance(classes, str) else classes)
+
+    def search_tag(self, markup_name=None, markup_attrs=None):
+        # Called instead of allow_tag_creation by beautifulsoup4 < 4.13
+        return self.allow_tag_creation(None, markup_name, markup_attrs)
+
+def page_number(url):
+    """1-based page number of a listing URL, from its 0-based 'page' parameter."""
+    pages = parse_qs(urlsplit(url).query).get('page')
+    return int(pages[0]) + 1 if pages and pages[0].isdigit() else 1
+
+def _class(name):
+    """XPath predicate matching elements whose class list contains name."""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+# Text nodes as returned by BeautifulSoup's get_text(): comments and the
+# content of script/style elements are skipped.
+_TEXT = './/text()[not(ancestor::script) and not(ancestor::style)]'
+
+def _text(element, separator=''):
+    return separator.join(s.strip() for s in element.xpath(_TEXT) if s.strip())
+
+def _first(element, xpath):
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+def _lxml_tree(content):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    if not content.strip():
+        return None
+    return lxml.html.fromstring(content)
+
+def _backend(backend, content):
+    """
+    Pick the parser backend and, for lxml, parse the page.
+
+    Pages that are not valid UTF-8 fall back to html.parser, which detects
+    the encoding itself.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'lxml':
+        try:
+            return 'lxml', _lxml_tree(content)
+        except UnicodeDecodeError:
+            pass
+    return 'html.parser', None
+
+class ListingPage:
+    """
+    A search results page: the listed datasets, the link to the next page and
+    the number of the last page (last_page, None when the pager doesn't link
+    to it, e.g. on the last page itself).
+
+    Args:
+        content (bytes or str): Page HTML
+        backend (str, optional): 'lxml' or 'html.parser' (default: lxml when installed)
+    """
+
+    def __init__(self, content, backend=None):
+        self.items = []
+        self.next_page_url = None
+        self.last_page = None
+        backend, tree = _backend(backend, content)
+        if backend == 'lxml':
+            if tree is not None:
+                self._parse_lxml(tree)
+        else:
+            self._parse_soup(content)
+
+    def _parse_lxml(self, tree):
+        container = _first(tree, f'//div[{_class("view-content")}]')
+        articles = container.xpath(f'.//article[{_class("node-search-result")}]') if container is not None else []
+        for article in articles:
+            title = _first(article, f'.//h2[{_class("node-title")}]')
+            link = _first(title, './/a')
+            organization = _first(article, f'.//div[{_class("group-membership")}]')
+            topic = _first(article, f'.//a[{_class("name")}]')
+            description = _first(article, f'.//div[{_class("node-description")}]')
+
+            resources = []
+            # Extracting all resource links (xlsx, docx, csv)
+            for item in article.xpath('.//li'):
+                resource_link = _first(item, './/a')
+                resources.append({'format': resource_link.get('href') if resource_link is not None else None})
+
+            self.items.append({
+                'title': _text(title),
+                'url': link.attrib['href'],
+                'organization': _text(organization) if organization is not None else '',
+                'topic': _text(topic) if topic is not None else "No topic",
+                'description': _text(description, ' ') if description is not None else "No description available",
+                'resources': resources,
+            })
+
+        pagination = _first(tree, f'//ul[{_class("pagination")} and {_class("pager")}]')
+        if pagination is not None:
+            next_link = _first(pagination, f'.//li[{_class("pager-next")}]//a')
+            if next_link is not None and next_link.get('href'):
+                self.next_page_url = next_link.get('href')
+            last_link = _first(pagination, f'.//li[{_class("pager-last")}]//a')
+            if last_link is not None and last_link.get('href'):
+                self.last_page = page_number(last_link.get('href'))
+
+    def _parse_soup(self, content):
+        page = BeautifulSoup(content, 'html.parser', parse_only=_LISTING_STRAINER)
+        # Like the lxml backend, only list the results inside the first view-content container
+        container = page.find('div', class_='view-content')
+        articles = container.find_all('article', class_='node-search-result') if container is not None else []
+        for dataset_element in articles:
+            dataset = {}
+            dataset['title'] = dataset_element.find('h2', class_='node-title').get_text(strip=True)
+            dataset['url'] = dataset_element.find('h2', class_='node-title').a['href']
+            organization = dataset_element.find('div', class_='group-membership')
+            dataset['organization'] = organization.get_text(strip=True) if organization else ''
+
+            # Check for topic (it might be nested in different divs)
+            topic_div = dataset_element.find('a', class_='name')
+            dataset['topic'] = topic_div.get_text(strip=True) if topic_div else "No topic"
+
+            description_div = dataset_element.find('div', class_='node-description')
+            if description_div:
+                dataset['description'] = description_div.get_text(separator=' ', strip=True)
+            else:
+                dataset['description'] = "No description available"
+
+            # Extracting all resource links (xlsx, docx, csv)
+            dataset['resources'] = []
+            for item in dataset_element.find_all('li'):
+                if item.a is not None and 'href' in item.a.attrs:
+                    dataset['resources'].append({'format': item.a['href']})
+                else:
+                    dataset['resources'].append({'format': None})
+            self.items.append(dataset)
+
+        pagination = page.find('ul', class_='pagination pager')
+        if pagination is not None:
+            next_page = pagination.find('li', class_='pager-next')
+            next_link = next_page.find('a') if next_page else None
+            if next_link and next_link.get('href'):
+                self.next_page_url = next_link['href']
+            last_page = pagination.find('li', class_='pager-last')
+            last_link = last_page.find('a') if last_page else None
+            if last_link and last_link.get('href'):
+                self.last_page = page_number(last_link['href'])
+
+class DatasetPage:
+    """
+    A dataset detail page: its topic category IDs and the CKAN JSON link.
+
+    Args:
+        content (bytes or str): Page HTML
+        backend (str, optional): 'lxml' or 'html.parser' (default: lxml when installed)
+    """
+
+    def __init__(self, content, backend=None):
+        self.category_ids = []
+        self.json_url = None
+        backend, tree = _backend(backend, content)
+        if backend == 'lxml':
+            if tree is not None:
+                self._parse_lxml(tree)
+        else:
+            self._parse_soup(content)
+
+    def _add_category(self, href):
+        # Extract the category ID from the href
+        category_id = href.split('/')[-1] if '/' in href else href
+        if category_id:
+            self.category_ids.append(category_id)
+
+    def _parse_lxml(self, tree):
+        topic_container = _first(tree, f'//div[{_class("field-name-field-topic")}]')
+        if topic_container is not None:
+            for link in topic_container.xpath(f'.//a[{_class("name")}]'):
+                self._add_category(link.get('href', ''))
+        json_link = _first(tree, '//a[@title="json view of content"]')
+        if json_link is not None:
+            self.json_url = json_link.get('href')
+
+    def _parse_soup(self, content):
+        page = BeautifulSoup(content, 'html.parser', parse_only=_DatasetPageStrainer())
+        topic_container = page.find('div', class_='field-name-field-topic')
+        if topic_container:
+            for link in topic_container.find_all('a', class_='name'):
+                self._add_category(link.get('href', ''))
+        json_link = page.find('a', {'title': 'json view of content'})
+        if json_link is not None:
+            self.json_url = json_link.get('href')
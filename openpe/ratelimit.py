@@ -0,0 +1,126 @@
+import email.utils
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate (float): Tokens added per second
+        capacity (float, optional): Maximum tokens stored (default: rate)
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """Take tokens from the bucket without waiting; return the seconds until they are available."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def consume(self, amount=1):
+        """Take tokens from the bucket, sleeping until they are available."""
+        wait = self.reserve(amount)
+        if wait:
+            time.sleep(wait)
+
+def parse_retry_after(value):
+    """Return the seconds requested by a Retry-After header, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+class RateLimiter:
+    """
+    Adaptive request rate limiter shared by WebScraper instances.
+
+    Requests take a token from a bucket refilled at the current rate. A 429 or
+    503 answer multiplies the rate by ``backoff`` and pauses every request for
+    the Retry-After delay (or one interval at the new rate). Each healthy
+    answer raises the rate again by ``recovery * max_rate`` up to ``max_rate``.
+
+    Args:
+        rate (float): Requests per second when the portal is healthy
+        burst (int, optional): Requests that can be made at once (default: rate)
+        min_rate (float): Lowest rate reached by backing off
+        backoff (float): Rate multiplier applied on each throttled answer
+        recovery (float): Fraction of the healthy rate recovered per healthy answer
+        max_retries (int): Times a throttled request is retried
+        max_wait (float): Upper bound in seconds for a single Retry-After pause
+    """
+
+    THROTTLE_STATUS = (429, 503)
+
+    def __init__(self, rate=10.0, burst=None, min_rate=0.2, backoff=0.5, recovery=0.1, max_retries=3, max_wait=300):
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.backoff = backoff
+        self.recovery = recovery
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.throttled = 0
+        self.bucket = TokenBucket(rate, burst if burst is not None else max(1, rate))
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def pause(self):
+        """Seconds left before requests may be sent again after a throttling answer."""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        pause = self.pause()
+        if pause > 0:
+            time.sleep(pause)
+        self.bucket.consume(1)
+
+    def update(self, response):
+        """
+        Adapt the rate to a response.
+
+        Returns:
+            bool: True if the response was a throttling answer worth retrying
+        """
+        return self.report(response.status_code, response.headers.get('Retry-After'))
+
+    def report(self, status, retry_after=None):
+        """
+        Adapt the rate to the status code and Retry-After header of an answer,
+        for clients whose responses aren't requests.Response objects.
+
+        Returns:
+            bool: True if the answer was a throttling one worth retrying
+        """
+        with self._lock:
+            if status in self.THROTTLE_STATUS:
+                self.throttled += 1
+                self.bucket.rate = max(self.min_rate, self.bucket.rate * self.backoff)
+                retry_after = parse_retry_after(retry_after)
+                wait = min(self.max_wait, retry_after if retry_after is not None else 1 / self.bucket.rate)
+                self._paused_until = max(self._paused_until, time.monotonic() + wait)
+                return True
+            if status < 500:
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate * self.recovery)
+            return False
@@ -0,0 +1,208 @@
+"""
+File readers behind Dataset.data() and Dataset.iter_data().
+
+read_frame() parses a whole file, detecting the dialect of CSV files. Excel
+files are read with the calamine engine (a Rust reader, ``pip install
+openpe[excel]``) when it is installed, which is several times faster than
+openpyxl, pandas' default.
+
+iter_frames() reads CSV, Parquet and XLSX files incrementally, so only one
+chunk is in memory at a time. JSON and XLS files can't be streamed and are
+loaded whole, then yielded in slices. Chunks keep a continuous RangeIndex, so
+concatenating them gives the same frame as reading the file at once.
+"""
+import os
+
+import pandas as pd
+
+from .framecache import backend_options, read_parquet
+from .sniff import ENCODINGS, SEPARATORS, sniff_csv
+
+try:
+    import python_calamine
+except ImportError:  # pragma: no cover - exercised only without the extra
+    python_calamine = None
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# pandas supports engine='calamine' since 2.2
+_PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split('.')[:2])
+EXCEL_ENGINE = 'calamine' if python_calamine is not None and _PANDAS_VERSION >= (2, 2) else None
+
+def read_frame(file_path, dialect=None, dtype_backend=None, sheet_name=0, nrows=None):
+    """
+    Load a file as a pandas DataFrame based on its extension.
+
+    Args:
+        file_path (str): Path to a CSV, XLSX, XLS, JSON or Parquet file
+        dialect (dict, optional): CSV encoding and sep known for the file
+        dtype_backend (str, optional): pandas dtype backend of the result
+        sheet_name (str or int, optional): Sheet of Excel files (default: the first one)
+        nrows (int, optional): Only return the first nrows rows
+
+    Returns:
+        tuple: (DataFrame, CSV dialect that parsed the file or None)
+
+    Raises:
+        ValueError: If the file format is not supported
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        return read_csv(file_path, dialect, dtype_backend, nrows)
+    elif file_ext in ['.xlsx', '.xls']:
+        return read_excel(file_path, sheet_name, nrows, dtype_backend), None
+    elif file_ext == '.json':
+        df = pd.read_json(file_path, **backend_options(dtype_backend))
+    elif file_ext == '.parquet':
+        df = read_parquet(file_path, dtype_backend)
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+    return (df.head(nrows) if nrows is not None else df), None
+
+def read_excel(io, sheet_name=0, nrows=None, dtype_backend=None):
+    """
+    Read a sheet of an Excel file with the fastest available engine.
+
+    Args:
+        io: Path or file-like object of an XLSX or XLS workbook
+        sheet_name (str or int, optional): Sheet to read (default: the first one)
+        nrows (int, optional): Only read the first nrows rows
+        dtype_backend (str, optional): pandas dtype backend of the result
+    """
+    options = backend_options(dtype_backend)
+    if EXCEL_ENGINE:
+        options['engine'] = EXCEL_ENGINE
+    return pd.read_excel(io, sheet_name=sheet_name, nrows=nrows, **options)
+
+def read_csv(file_path, dialect=None, dtype_backend=None, nrows=None):
+    """
+    Read a CSV file with a known dialect, or sniff it from a sample.
+
+    Returns:
+        tuple: (DataFrame, dialect that parsed the file, or None if only the
+            permissive python-engine fallback could)
+    """
+    df = _try_read_csv(file_path, dialect, dtype_backend, nrows) if dialect else None
+    sniffed = None
+    if df is None:
+        # No known dialect, or the file changed since it was detected
+        sniffed = sniff_csv(file_path)
+        if sniffed != dialect:
+            dialect = sniffed
+            df = _try_read_csv(file_path, dialect, dtype_backend, nrows)
+
+    if df is None:
+        # The sample was misleading; try every encoding, starting with the sniffed separator
+        separators = sorted(SEPARATORS, key=lambda sep: sep != sniffed['sep'])
+        for encoding in ENCODINGS:
+            for sep in separators:
+                dialect = {'encoding': encoding, 'sep': sep}
+                df = _try_read_csv(file_path, dialect, dtype_backend, nrows)
+                if df is not None:
+                    return df, dialect
+        # Final fallback - try to read with the most permissive settings
+        return pd.read_csv(file_path, encoding='latin1', sep=None, engine='python', nrows=nrows,
+                           **backend_options(dtype_backend)), None
+    return df, dialect
+
+def _try_read_csv(file_path, dialect, dtype_backend=None, nrows=None):
+    options = dict(dialect, nrows=nrows, **backend_options(dtype_backend))
+    # The pyarrow engine is faster but can't stop after nrows
+    pyarrow_engine = dtype_backend == 'pyarrow' and nrows is None
+    if pyarrow_engine:
+        options['engine'] = 'pyarrow'
+        del options['nrows']
+    try:
+        df = pd.read_csv(file_path, **options)
+    except (UnicodeDecodeError, pd.errors.ParserError):
+        return None
+    except ValueError:
+        # The pyarrow engine reports decoding and parsing errors as ArrowInvalid
+        if not pyarrow_engine:
+            raise
+        return None
+    # ... and keeps text it can't decode as binary columns instead of failing
+    if pyarrow_engine and any('binary' in str(dtype) for dtype in df.dtypes):
+        return None
+    return df
+
+def iter_frames(file_path, chunksize=DEFAULT_CHUNKSIZE, csv_options=None):
+    """
+    Yield the rows of a data file as DataFrames of at most chunksize rows.
+
+    Args:
+        file_path (str): Path to a CSV, XLSX, XLS, JSON or Parquet file
+        chunksize (int): Maximum rows per chunk
+        csv_options (dict, optional): Extra pandas.read_csv arguments, such as
+            the encoding and sep detected for the file
+
+    Raises:
+        ValueError: If the file format is not supported
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        with pd.read_csv(file_path, chunksize=chunksize, **(csv_options or {})) as reader:
+            yield from reader
+    elif file_ext == '.parquet':
+        yield from _iter_parquet(file_path, chunksize)
+    elif file_ext == '.xlsx':
+        yield from _iter_xlsx(file_path, chunksize)
+    elif file_ext == '.xls':
+        yield from _slices(read_excel(file_path), chunksize)
+    elif file_ext == '.json':
+        yield from _slices(pd.read_json(file_path), chunksize)
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
+def _slices(df, chunksize):
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+def _iter_parquet(file_path, chunksize):
+    try:
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover - exercised only without pyarrow
+        yield from _slices(pd.read_parquet(file_path), chunksize)
+        return
+    offset = 0
+    for batch in pyarrow.parquet.ParquetFile(file_path).iter_batches(batch_size=chunksize):
+        df = batch.to_pandas()
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        offset += len(df)
+        yield df
+
+def _column_names(header):
+    """Name the header cells like pandas.read_excel: 'Unnamed: i' for blanks, 'x.1' for repeats."""
+    names = []
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else name
+        base, count = name, 0
+        while name in names:
+            count += 1
+            name = f"{base}.{count}"
+        names.append(name)
+    return names
+
+def _iter_xlsx(file_path, chunksize):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _column_names(header)
+        offset, chunk = 0, []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append(row[:len(columns)])
+            if len(chunk) == chunksize:
+                yield pd.DataFrame(chunk, columns=columns, index=pd.RangeIndex(offset, offset + len(chunk)))
+                offset += len(chunk)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns, index=pd.RangeIndex(offset, offset + len(chunk)))
+    finally:
+        workbook.close()
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from tqdm import tqdm
+
+from .errors import log_error
+from .ratelimit import TokenBucket
+from .webscraper import WebScraper
+
+class DownloadScheduler:
+    """
+    Download the resources of many datasets through a bounded worker pool.
+
+    Args:
+        workers (int): Number of files downloaded at the same time
+        per_host (int): Maximum concurrent downloads from a single host
+        bandwidth (int, optional): Global budget in bytes per second shared by
+            all workers (default: unlimited)
+        base_folder (str): Base folder to store downloaded files (default: "datasets")
+        skip_existing (bool): Whether to skip files that already exist locally
+        verify_ssl (bool): Whether to verify SSL certificates
+        request_timeout (int): Timeout in seconds for HTTP requests
+        log_errors (bool): Whether to log errors
+        show_progress (bool): Whether to show a progress bar
+    """
+
+    def __init__(self, workers=8, per_host=2, bandwidth=None, base_folder="datasets", skip_existing=False,
+                 verify_ssl=True, request_timeout=30, log_errors=False, show_progress=True):
+        self.workers = workers
+        self.per_host = per_host
+        self.bandwidth = TokenBucket(bandwidth) if bandwidth else None
+        self.base_folder = base_folder
+        self.skip_existing = skip_existing
+        self.verify_ssl = verify_ssl
+        self.request_timeout = request_timeout
+        self.log_errors = log_errors
+        self.show_progress = show_progress
+        self.scraper = WebScraper()
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.per_host)
+            return self._hosts[host]
+
+    def _jobs(self, datasets):
+        jobs = []
+        for dataset in datasets:
+            folder_name = os.path.join(self.base_folder, dataset.id)
+            os.makedirs(folder_name, exist_ok=True)
+            dataset._write_metadata_json(folder_name)
+            for resource_url, filename, file_path in dataset._resource_targets(folder_name):
+                if self.skip_existing and os.path.exists(file_path):
+                    continue
+                jobs.append((dataset, resource_url, filename, file_path))
+        return jobs
+
+    def _download(self, dataset, resource_url, filename, file_path):
+        stats = {'dataset': dataset.id, 'file': filename, 'url': resource_url, 'path': file_path, 'bytes': 0,
+                 'size': 0}
+
+        def on_chunk(size):
+            # Only the bytes received now: a resumed download already had the rest
+            stats['bytes'] += size
+            if self.bandwidth:
+                self.bandwidth.consume(size)
+
+        with self._host_slot(resource_url):
+            start = time.monotonic()
+            response = self.scraper.download(resource_url, file_path, verify=self.verify_ssl,
+                                             timeout=self.request_timeout, on_chunk=on_chunk)
+            stats['seconds'] = time.monotonic() - start
+
+        stats['ok'] = response is not None and response.status_code in (200, 206, 416) and os.path.exists(file_path)
+        stats['status'] = response.status_code if response is not None else None
+        if stats['ok']:
+            stats['size'] = os.path.getsize(file_path)
+        else:
+            message = f"Failed to download {filename}. Status code: {stats['status']}"
+            if self.log_errors:
+                log_error(message)
+            else:
+                print(message)
+        stats['throughput'] = stats['bytes'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        return stats
+
+    def run(self, datasets):
+        """
+        Download every resource of the given datasets.
+
+        Args:
+            datasets: A Dataset object or a list of Dataset objects
+
+        Returns:
+            dict: 'files' with per-file stats (bytes transferred, size of the
+                downloaded file, seconds, throughput in bytes/s, ok), and the
+                aggregate 'bytes', 'seconds', 'throughput', 'completed' and 'failed'
+        """
+        if not isinstance(datasets, list):
+            datasets = [datasets]
+        jobs = self._jobs(datasets)
+        files = []
+        progress = tqdm(total=len(jobs), desc="Downloading files", unit=" file") if self.show_progress else None
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._download, *job) for job in jobs]
+            for future in as_completed(futures):
+                files.append(future.result())
+                if progress is not None:
+                    progress.update(1)
+        elapsed = time.monotonic() - start
+
+        if progress is not None:
+            progress.close()
+
+        total_bytes = sum(f['bytes'] for f in files)
+        return {
+            'files': files,
+            'completed': sum(1 for f in files if f['ok']),
+            'failed': sum(1 for f in files if not f['ok']),
+            'bytes': total_bytes,
+            'seconds': elapsed,
+            'throughput': total_bytes / elapsed if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,73 @@
+import codecs
+import csv
+import os
+
+# Bytes read from the start, middle and end of a file to detect its dialect
+SAMPLE_SIZE = 64 * 1024
+ENCODINGS = ['utf-8', 'cp1252', 'latin1']
+SEPARATORS = [',', ';', '\t', '|']
+
+def _samples(file_path, sample_size=SAMPLE_SIZE):
+    """Return byte chunks from the start, middle and end of a file."""
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        head = f.read(sample_size)
+        if size <= sample_size:
+            return head, []
+        chunks = []
+        for offset in (size // 2, max(sample_size, size - sample_size)):
+            f.seek(offset)
+            chunks.append(f.read(sample_size))
+        return head, chunks
+
+def _decodes(chunk, encoding, middle=False):
+    """Whether a chunk decodes, ignoring characters cut at its edges."""
+    if middle and encoding == 'utf-8':
+        # Skip continuation bytes of a character that started before the chunk
+        chunk = chunk.lstrip(bytes(range(0x80, 0xC0)))
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(chunk, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def detect_encoding(head, chunks=()):
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ENCODINGS:
+        if _decodes(head, encoding) and all(_decodes(chunk, encoding, middle=True) for chunk in chunks):
+            return encoding
+    return 'latin1'
+
+def detect_separator(text):
+    """Guess the field separator from the complete lines of a text sample."""
+    lines = text.splitlines()
+    if len(lines) > 1 and not text.endswith(('\n', '\r')):
+        lines = lines[:-1]  # The last line may be cut by the sample size
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return ','
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines), delimiters=''.join(SEPARATORS)).delimiter
+    except csv.Error:
+        pass
+    # Fall back to the separator that appears most often in the header line
+    counts = {sep: lines[0].count(sep) for sep in SEPARATORS}
+    best = max(counts, key=counts.get)
+    return best if counts[best] else ','
+
+def sniff_csv(file_path, sample_size=SAMPLE_SIZE):
+    """
+    Detect the encoding and field separator of a CSV file from a bounded sample.
+
+    Args:
+        file_path (str): Path to the CSV file
+        sample_size (int): Bytes read from the start, middle and end of the file
+
+    Returns:
+        dict: {'encoding': ..., 'sep': ...} ready to be passed to pandas.read_csv
+    """
+    head, chunks = _samples(file_path, sample_size)
+    encoding = detect_encoding(head, chunks)
+    text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(head, final=False)
+    return {'encoding': encoding, 'sep': detect_separator(text)}
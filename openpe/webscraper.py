@@ -2,16 +2,158 @@ import requests
 from bs4 import BeautifulSoup
 import logging
 import os
+import threading
+import weakref
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from openpe.errors import log_error
+from openpe.ratelimit import RateLimiter
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+}
+
+# Rate limiter shared by every WebScraper that doesn't get its own
+_rate_limiter = RateLimiter()
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the rate limiter shared by WebScraper instances."""
+    return _rate_limiter
+
+def configure_rate_limiter(**kwargs) -> RateLimiter:
+    """
+    Replace the shared rate limiter.
+    
+    Args:
+        **kwargs: RateLimiter options (rate, burst, min_rate, backoff, recovery,
+            max_retries, max_wait)
+    
+    Returns:
+        RateLimiter: The new shared limiter
+    """
+    global _rate_limiter
+    _rate_limiter = RateLimiter(**kwargs)
+    return _rate_limiter
+
+# Session (connection pool) shared by every WebScraper that doesn't get its own,
+# created on first use
+_session = None
+_session_lock = threading.Lock()
+
+def create_session(pool_connections=10, pool_maxsize=32, retries=3, backoff_factor=0.5, keep_alive=True) -> requests.Session:
+    """
+    Build a requests.Session with a sized connection pool and connection retries.
+    
+    Args:
+        pool_connections (int): Number of hosts whose connections are pooled
+        pool_maxsize (int): Connections kept open per host; set it to at least
+            the number of threads making requests
+        retries (int): Retries of GET/HEAD requests after connection and read
+            errors, with exponential backoff. Throttling answers (429/503) are
+            retried by the rate limiter instead.
+        backoff_factor (float): Base of the backoff between retries, in seconds
+        keep_alive (bool): Reuse connections between requests
+    """
+    retry = Retry(total=retries, connect=retries, read=retries, status=0, backoff_factor=backoff_factor,
+                  allowed_methods=frozenset(['GET', 'HEAD']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+def get_session() -> requests.Session:
+    """Return the session shared by WebScraper instances."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def configure_session(session: requests.Session = None, **kwargs) -> requests.Session:
+    """
+    Replace the shared session.
+    
+    Args:
+        session (requests.Session, optional): Session to use, e.g. a mock in tests
+        **kwargs: create_session() options used when no session is given
+            (pool_connections, pool_maxsize, retries, backoff_factor, keep_alive)
+    
+    Returns:
+        requests.Session: The new shared session. The previous one is not
+            closed, as requests in flight may still use it.
+    """
+    global _session
+    session = session if session is not None else create_session(**kwargs)
+    with _session_lock:
+        _session = session
+    return session
+
+# Lock per destination file, so concurrent downloads of the same resource
+# don't write to (and rename) the same .part file
+_download_locks = weakref.WeakValueDictionary()
+_download_locks_lock = threading.Lock()
+
+def _download_lock(file_path):
+    with _download_locks_lock:
+        return _download_locks.setdefault(os.path.abspath(file_path), threading.Lock())
+
+def partial_offset(part_path):
+    """Size of a partial download, the offset a Range request resumes it from (0 if there is none)."""
+    return os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+def settle_partial(part_path, file_path, offset, content_range):
+    """
+    Handle a 416 (Range Not Satisfiable) answer to a download resumed from offset.
+    
+    If Content-Range reports a resource of offset bytes, the partial file is
+    complete and is moved to file_path. Otherwise it doesn't match the resource
+    any more and is deleted, so the next request starts from zero.
+    
+    Returns:
+        bool: Whether file_path is now complete
+    """
+    if (content_range or '').endswith(f'/{offset}'):
+        os.replace(part_path, file_path)
+        return True
+    os.remove(part_path)
+    return False
 
 class WebScraper:
-    def __init__(self, base_url: str = '', headers: dict = None):
+    def __init__(self, base_url: str = '', headers: dict = None, cache=None, rate_limiter=None, session=None):
         self.base_url = base_url
-        self.headers = headers or {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        }
-        self.session = requests.Session()
+        self.headers = headers or DEFAULT_HEADERS.copy()
+        self._session = session
+        self.cache = cache  # Optional openpe.cache.ResponseCache
+        self._rate_limiter = rate_limiter
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self._rate_limiter or get_rate_limiter()
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or get_session()
+
+    @session.setter
+    def session(self, value):
+        self._session = value
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the rate limiter, retrying throttled answers
+        (429/503) after the delay the limiter derives from Retry-After.
+        """
+        limiter = self.rate_limiter
+        for attempt in range(limiter.max_retries + 1):
+            limiter.acquire()
+            response = self.session.request(method, url, **kwargs)
+            if not limiter.update(response) or attempt == limiter.max_retries:
+                return response
+            response.close()
 
     def get_response(self, url: str, headers=None, verify=True, timeout=600):
         """
@@ -24,20 +166,104 @@ class WebScraper:
             timeout (int): Request timeout in seconds
             
         Returns:
-            requests.Response: The response object
+            requests.Response: The response object. With a cache, it may be
+                served from disk (response.from_cache is then True).
         """
         try:
             # Merge headers if provided
             request_headers = self.headers.copy()
             if headers:
                 request_headers.update(headers)
-                
-            response = self.session.get(url, headers=request_headers, verify=verify, timeout=timeout)
+
+            if self.cache is None:
+                return self._request('GET', url, headers=request_headers, verify=verify, timeout=timeout)
+
+            cached, validators = self.cache.get(url)
+            if cached is not None:
+                return cached
+            response = self._request('GET', url, headers={**request_headers, **validators}, verify=verify, timeout=timeout)
+            response = self.cache.update(url, response)
+            if response is None:
+                # The entry was evicted before its 304 arrived: fetch the body unconditionally
+                response = self._request('GET', url, headers=request_headers, verify=verify, timeout=timeout)
+                response = self.cache.update(url, response)
             return response
         except Exception as e:
             log_error(f"Error fetching URL: {url}, Error: {str(e)}")
             return None
 
+    def download(self, url: str, file_path: str, headers=None, verify=True, timeout=600, chunk_size=1024 * 1024, resume=True, retries=3, on_chunk=None):
+        """
+        Stream a URL to a file without holding it in memory.
+        
+        The data is written in chunks to ``file_path + '.part'`` and renamed to
+        ``file_path`` once complete. If a partial file exists, or the connection
+        drops, the transfer continues from where it stopped with an HTTP Range
+        request. A partial file the server can't resume (416 with a different
+        size) is discarded and downloaded again. Concurrent downloads to the
+        same file_path wait for each other.
+        
+        Args:
+            url (str): The URL to download
+            file_path (str): Destination path
+            headers (dict, optional): Custom headers for the request
+            verify (bool): Whether to verify SSL certificates
+            timeout (int): Request timeout in seconds
+            chunk_size (int): Bytes read and written at a time
+            resume (bool): Whether to resume an existing partial file
+            retries (int): Extra attempts after a dropped connection
+            on_chunk (callable, optional): Called with the size of every chunk
+                written, e.g. to throttle bandwidth
+            
+        Returns:
+            requests.Response: The last response (its body already consumed), or
+                None if the download could not be completed
+        """
+        part_path = file_path + '.part'
+        with _download_lock(file_path):
+            if not resume and os.path.exists(part_path):
+                os.remove(part_path)
+
+            for attempt in range(retries + 1):
+                request_headers = self.headers.copy()
+                if headers:
+                    request_headers.update(headers)
+                offset = partial_offset(part_path)
+                if offset:
+                    request_headers['Range'] = f'bytes={offset}-'
+
+                try:
+                    with self._request('GET', url, headers=request_headers, verify=verify, timeout=timeout, stream=True) as response:
+                        if response.status_code == 416 and offset:
+                            if settle_partial(part_path, file_path, offset, response.headers.get('Content-Range')):
+                                return response
+                            # The partial file was stale: the next attempt starts from zero
+                            continue
+                        if response.status_code not in (200, 206):
+                            return response
+
+                        # A 200 answer to a Range request restarts from zero
+                        mode = 'ab' if response.status_code == 206 else 'wb'
+                        with open(part_path, mode) as file:
+                            for chunk in response.iter_content(chunk_size=chunk_size):
+                                file.write(chunk)
+                                if on_chunk is not None:
+                                    on_chunk(len(chunk))
+                    os.replace(part_path, file_path)
+                    return response
+                except Exception as e:
+                    log_error(f"Error downloading URL: {url} (attempt {attempt + 1}), Error: {str(e)}")
+        return None
+
+    def head(self, url: str, verify=True, timeout=10, allow_redirects=True):
+        """
+        Send a HEAD request through the rate limiter.
+        
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        return self._request('HEAD', url, headers=self.headers, verify=verify, timeout=timeout, allow_redirects=allow_redirects)
+
     def fetch_page(self, endpoint: str) -> str:
         response = self.get_response(f"{self.base_url}/{endpoint}")
         return response.content
@@ -0,0 +1,343 @@
+"""
+Local stand-in for datosabiertos.gob.pe used by the offline tests.
+
+Listing pages, dataset pages and CKAN package documents are rendered from the
+recorded templates in ``tests/fixtures`` and served by a threaded HTTP server
+bound to localhost, so the crawler can run end to end without the network.
+"""
+import hashlib
+import html
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit, unquote
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+PORTAL_URL = 'https://www.datosabiertos.gob.pe'
+
+
+def _template(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+LISTING_PAGE = _template('listing_page.html')
+LISTING_ITEM = _template('listing_item.html')
+DATASET_PAGE = _template('dataset_page.html')
+
+
+def make_dataset(slug, categories, index=0, organization='Ministerio de Salud', resources=None):
+    """Build the description of one portal dataset."""
+    if resources is None:
+        rows = '\n'.join(f'{i},{slug},{i * 10}' for i in range(1, 6))
+        resources = [{
+            'name': f'{slug}.csv',
+            'format': 'CSV',
+            'content': f'id,nombre,valor\n{rows}\n'.encode('utf-8'),
+        }]
+    return {
+        'slug': slug,
+        'id': str(uuid.uuid5(uuid.NAMESPACE_URL, slug)),
+        'title': slug.replace('-', ' ').title(),
+        'description': f'Descripción del dataset {slug}.',
+        'organization': organization,
+        'categories': list(categories),
+        'modified': (datetime(2024, 6, 1) - timedelta(minutes=index)).isoformat(),
+        'created': '2020-01-01T00:00:00',
+        'resources': resources,
+    }
+
+
+class Portal:
+    """Threaded HTTP server that mimics the portal pages the package scrapes."""
+
+    def __init__(self, datasets, page_size=10):
+        self.datasets = list(datasets)
+        self.page_size = page_size
+        self.hits = Counter()
+        self.request_headers = {}
+        self.delay = 0
+        self.active = 0
+        self.max_active = 0
+        self.responses = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @classmethod
+    def generate(cls, count=25, categories=('salud-27',), page_size=10):
+        """Create a portal with ``count`` datasets spread over ``categories``."""
+        datasets = []
+        for index in range(count):
+            category = categories[index % len(categories)]
+            datasets.append(make_dataset(f'dataset-{index:05d}', [category], index=index))
+        return cls(datasets, page_size=page_size)
+
+    @property
+    def url(self):
+        if self._server is None:
+            return PORTAL_URL
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def patch_module(self):
+        """Point ``openpe.module`` at this portal instead of the real site."""
+        import openpe.module as module
+        import openpe.webscraper as webscraper
+        stack = ExitStack()
+        stack.enter_context(patch.object(module, 'BASE_URL', self.url))
+        stack.enter_context(patch.object(module.scraper, 'base_url', self.url))
+        # Local requests don't need the politeness budget of the real portal
+        stack.enter_context(patch.object(webscraper, '_rate_limiter', webscraper.RateLimiter(rate=1000)))
+        return stack
+
+    def fail_next(self, path, *statuses, headers=None):
+        """Answer the next requests to ``path`` with the given status codes."""
+        self.responses[path] = [(status, headers or {}) for status in statuses]
+
+    # Rendering -------------------------------------------------------------
+
+    def in_category(self, category):
+        found = [d for d in self.datasets if category in d['categories']]
+        return sorted(found, key=lambda d: d['modified'], reverse=True)
+
+    def listing_url(self, category, page=0):
+        url = f'/search/field_topic/{category}/type/dataset?sort_by=changed'
+        return f'{url}&page={page}' if page else url
+
+    def render_listing(self, category, page=0):
+        datasets = self.in_category(category)
+        pages = max(1, -(-len(datasets) // self.page_size))
+        chunk = datasets[page * self.page_size:(page + 1) * self.page_size]
+        items = ''.join(self._render_item(d, category) for d in chunk)
+        pager = ''
+        if pages > 1:
+            links = [f'<li class="pager-current">{page + 1}</li>']
+            if page + 1 < pages:
+                next_url = html.escape(self.listing_url(category, page + 1))
+                last_url = html.escape(self.listing_url(category, pages - 1))
+                links.append(f'<li class="pager-next"><a href="{next_url}">siguiente ›</a></li>')
+                links.append(f'<li class="pager-last"><a href="{last_url}">última »</a></li>')
+            pager = '<ul class="pagination pager">' + ''.join(links) + '</ul>'
+        return LISTING_PAGE.substitute(
+            items=items,
+            pager=pager,
+            first=page * self.page_size + 1,
+            last=page * self.page_size + len(chunk),
+            total=len(datasets),
+        )
+
+    def _render_item(self, dataset, category):
+        resources = ''.join(
+            f'<li><a href="/dataset/{dataset["slug"]}/resource/{i}" class="label" '
+            f'data-format="{r["format"].lower()}">{r["format"].lower()}</a></li>'
+            for i, r in enumerate(dataset['resources'])
+        )
+        return LISTING_ITEM.substitute(
+            nid=dataset['id'][:8],
+            slug=dataset['slug'],
+            title=html.escape(dataset['title']),
+            organization=html.escape(dataset['organization']),
+            category=category,
+            topic=category.rsplit('-', 1)[0].title(),
+            description=html.escape(dataset['description']),
+            modified=dataset['modified'],
+            resources=resources,
+        )
+
+    def render_dataset(self, dataset):
+        topics = ''.join(
+            f'<div class="field-item"><a href="/search/field_topic/{c}" class="name">{c.rsplit("-", 1)[0].title()}</a></div>'
+            for c in dataset['categories']
+        )
+        resources = ''.join(
+            f'<li><a href="/dataset/{dataset["slug"]}/resource/{i}">{html.escape(r["name"])}</a></li>'
+            for i, r in enumerate(dataset['resources'])
+        )
+        return DATASET_PAGE.substitute(
+            title=html.escape(dataset['title']),
+            description=html.escape(dataset['description']),
+            slug=dataset['slug'],
+            topics=topics,
+            resources=resources,
+            json_url=f'{self.url}/api/3/action/package_show?id={dataset["id"]}',
+        )
+
+    def package(self, dataset):
+        return {
+            'help': 'Return the metadata of a dataset (package) and its resources.',
+            'success': True,
+            'result': [self.package_result(dataset)],
+        }
+
+    def package_result(self, dataset):
+        return {
+            'id': dataset['id'],
+            'name': dataset['slug'],
+            'title': dataset['title'],
+            'notes': dataset['description'],
+            'url': f'{PORTAL_URL}/dataset/{dataset["slug"]}',
+            'metadata_modified': dataset['modified'],
+            'metadata_created': dataset['created'],
+            'groups': [{'title': dataset['organization'], 'name': 'minsa'}] + [
+                {'title': c.rsplit('-', 1)[0].title(), 'name': c} for c in dataset['categories']
+            ],
+            'resources': [
+                {
+                    'id': str(uuid.uuid5(uuid.NAMESPACE_URL, f'{dataset["slug"]}/{i}')),
+                    'name': r['name'],
+                    'format': r['format'],
+                    'url': f'{self.url}/resources/{dataset["slug"]}/{r["name"]}',
+                    'last_modified': r.get('last_modified', dataset['modified']),
+                }
+                for i, r in enumerate(dataset['resources'])
+            ],
+        }
+
+    def package_search(self, query):
+        match = re.fullmatch(r'groups:"(.+)"', query.get('fq', [''])[0])
+        found = self.in_category(match.group(1)) if match else []
+        start = int(query.get('start', ['0'])[0])
+        rows = int(query.get('rows', ['10'])[0])
+        return {
+            'help': 'Searches for packages satisfying a given search criteria.',
+            'success': True,
+            'result': {
+                'count': len(found),
+                'results': [self.package_result(d) for d in found[start:start + rows]],
+            },
+        }
+
+    def find(self, key):
+        for dataset in self.datasets:
+            if key in (dataset['slug'], dataset['id']):
+                return dataset
+        return None
+
+    # Routing ---------------------------------------------------------------
+
+    def route(self, path, query):
+        """Return ``(status, content_type, body)`` for a GET request."""
+        match = re.fullmatch(r'/search/field_topic/([^/]+)/type/dataset', path)
+        if match:
+            page = int(query.get('page', ['0'])[0])
+            return 200, 'text/html; charset=utf-8', self.render_listing(match.group(1), page).encode('utf-8')
+        match = re.fullmatch(r'/dataset/([^/]+)', path)
+        if match and self.find(match.group(1)):
+            return 200, 'text/html; charset=utf-8', self.render_dataset(self.find(match.group(1))).encode('utf-8')
+        if path == '/api/3/action/package_show':
+            dataset = self.find(query.get('id', [''])[0])
+            if dataset:
+                return 200, 'application/json', json.dumps(self.package(dataset)).encode('utf-8')
+        if path == '/api/3/action/package_search':
+            return 200, 'application/json', json.dumps(self.package_search(query)).encode('utf-8')
+        match = re.fullmatch(r'/resources/([^/]+)/(.+)', path)
+        if match and self.find(match.group(1)):
+            for resource in self.find(match.group(1))['resources']:
+                if resource['name'] == match.group(2):
+                    return 200, 'application/octet-stream', resource['content']
+        return 404, 'text/plain', b'Not found'
+
+
+def _handler_for(portal):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_HEAD(self):
+            self._respond(send_body=False)
+
+        def do_GET(self):
+            self._respond(send_body=True)
+
+        def _respond(self, send_body):
+            parts = urlsplit('/' + self.path.lstrip('/'))
+            path = unquote(parts.path)
+            with portal._lock:
+                portal.hits[path] += 1
+                portal.request_headers[path] = dict(self.headers)
+                queued = portal.responses.get(path)
+                override = queued.pop(0) if queued else None
+            if override:
+                status, headers = override
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            with portal._lock:
+                portal.active += 1
+                portal.max_active = max(portal.max_active, portal.active)
+            try:
+                if portal.delay:
+                    time.sleep(portal.delay)
+                self._send(path, parts.query, send_body)
+            finally:
+                with portal._lock:
+                    portal.active -= 1
+
+        def _send(self, path, query, send_body):
+            status, content_type, body = portal.route(path, parse_qs(query))
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            headers = {'Content-Type': content_type, 'ETag': etag, 'Accept-Ranges': 'bytes'}
+            byte_range = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+            if status == 200 and byte_range and int(byte_range.group(1)) < len(body):
+                start = int(byte_range.group(1))
+                headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+                status, body = 206, body[start:]
+            elif status == 200 and byte_range:
+                # Range Not Satisfiable: the client already has every byte, or more
+                headers['Content-Range'] = f'bytes */{len(body)}'
+                status, body = 416, b''
+
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+    return Handler
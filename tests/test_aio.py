@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+
+from openpe import AsyncClient, Dataset, RateLimiter
+from openpe.aio import aiohttp
+
+from portal import Portal
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.portal = Portal.generate(count=15, categories=('salud-27',)).start()
+
+    def tearDown(self):
+        self.portal.stop()
+
+    async def test_get_dataset(self):
+        async with AsyncClient(base_url=self.portal.url) as client:
+            dataset = await client.get_dataset('dataset-00003')
+        self.assertIsInstance(dataset, Dataset)
+        self.assertEqual(dataset.id, self.portal.find('dataset-00003')['id'])
+        self.assertEqual(dataset.categories, ['salud-27'])
+
+    async def test_get_datasets_matches_listing_order(self):
+        async with AsyncClient(base_url=self.portal.url) as client:
+            datasets = [d async for d in client.get_datasets('salud-27')]
+        expected = [d['id'] for d in self.portal.in_category('salud-27')]
+        self.assertEqual([d.id for d in datasets], expected)
+
+    async def test_get_datasets_limit_and_start_page(self):
+        async with AsyncClient(base_url=self.portal.url) as client:
+            datasets = [d async for d in client.get_datasets('salud-27', limit=3, start_page=2)]
+        expected = [d['id'] for d in self.portal.in_category('salud-27')[10:13]]
+        self.assertEqual([d.id for d in datasets], expected)
+        self.assertEqual(self.portal.hits['/search/field_topic/salud-27/type/dataset'], 1)
+
+    async def test_get_datasets_end_page(self):
+        async with AsyncClient(base_url=self.portal.url) as client:
+            datasets = [d async for d in client.get_datasets('salud-27', start_page=1, end_page=1)]
+        expected = [d['id'] for d in self.portal.in_category('salud-27')[:10]]
+        self.assertEqual([d.id for d in datasets], expected)
+
+    async def test_download_files(self):
+        with tempfile.TemporaryDirectory() as base_folder:
+            async with AsyncClient(base_url=self.portal.url) as client:
+                dataset = await client.get_dataset('dataset-00001')
+                await client.download_files(dataset, base_folder=base_folder)
+            folder = os.path.join(base_folder, dataset.id)
+            with open(os.path.join(folder, 'dataset-00001.csv'), 'rb') as f:
+                self.assertEqual(f.read(), self.portal.find('dataset-00001')['resources'][0]['content'])
+            self.assertTrue(os.path.isfile(os.path.join(folder, f'{dataset.id}.json')))
+
+    async def test_download_files_settles_partial_files(self):
+        with tempfile.TemporaryDirectory() as base_folder:
+            async with AsyncClient(base_url=self.portal.url) as client:
+                datasets = [await client.get_dataset(f'dataset-0000{i}') for i in (1, 2)]
+                contents = [self.portal.find(f'dataset-0000{i}')['resources'][0]['content'] for i in (1, 2)]
+                paths = [os.path.join(base_folder, d.id, f'dataset-0000{i}.csv') for d, i in zip(datasets, (1, 2))]
+                # A complete partial file and a stale one, longer than the resource
+                for path, content in zip(paths, (contents[0], contents[1] + b'9,sobrante,90\n')):
+                    os.makedirs(os.path.dirname(path))
+                    with open(path + '.part', 'wb') as f:
+                        f.write(content)
+                for dataset in datasets:
+                    await client.download_files(dataset, base_folder=base_folder)
+            for path, content in zip(paths, contents):
+                with open(path, 'rb') as f:
+                    self.assertEqual(f.read(), content)
+                self.assertFalse(os.path.exists(path + '.part'))
+
+    async def test_download_files_honors_retry_after(self):
+        limiter = RateLimiter(rate=100)
+        path = '/resources/dataset-00001/dataset-00001.csv'
+        with tempfile.TemporaryDirectory() as base_folder:
+            async with AsyncClient(base_url=self.portal.url, rate_limiter=limiter) as client:
+                dataset = await client.get_dataset('dataset-00001')
+                self.portal.fail_next(path, 429, headers={'Retry-After': '1'})
+                start = time.monotonic()
+                await client.download_files(dataset, base_folder=base_folder)
+                self.assertGreaterEqual(time.monotonic() - start, 0.9)
+            with open(os.path.join(base_folder, dataset.id, 'dataset-00001.csv'), 'rb') as f:
+                self.assertEqual(f.read(), self.portal.find('dataset-00001')['resources'][0]['content'])
+        self.assertEqual(self.portal.hits[path], 2)
+        self.assertEqual(limiter.throttled, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
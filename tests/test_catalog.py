@@ -0,0 +1,218 @@
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import openpe as pe
+from openpe import CatalogIndex, Dataset, LazyDataset, module, snapshot
+from openpe.catalog import main
+
+
+def make_local_dataset(index, categories):
+    return Dataset(
+        id=f'id-{index:03d}', title=f'Dataset {index}', description='', categories=categories,
+        url=f'https://example.org/dataset/dataset-{index:03d}', modified_date='2024-06-01',
+        release_date='2024-01-01', publisher='Ministerio de Salud',
+        metadata={'result': [{'name': f'dataset-{index:03d}', 'resources': []}]},
+    )
+
+
+class TestCatalogIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'datasets')
+        self.patch = mock.patch.object(module, 'DATASETS_DIR', self.folder)
+        self.patch.start()
+        self.datasets = [make_local_dataset(i, ['salud-27'] if i % 3 else ['salud-27', 'educacion-15'])
+                         for i in range(9)]
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_save_indexes_datasets(self):
+        pe.save(self.datasets)
+        index = CatalogIndex(self.folder)
+        self.assertEqual(len(index.ids()), 9)
+        self.assertEqual(index.records(name='dataset-004')[0]['id'], 'id-004')
+        self.assertEqual(index.records(name='Dataset 5')[0]['id'], 'id-005')
+        self.assertEqual(index.ids_by_category('educacion-15'), ['id-000', 'id-003', 'id-006'])
+
+    def test_load_uses_index(self):
+        pe.save(self.datasets)
+        with mock.patch('os.listdir', side_effect=AssertionError('folder scanned')):
+            self.assertEqual(pe.load('dataset-007').id, 'id-007')
+            self.assertEqual(pe.load('id-002').title, 'Dataset 2')
+            self.assertEqual(len(pe.load()), 9)
+            self.assertEqual([d.id for d in pe.load_by_category('educacion-15')], ['id-000', 'id-003', 'id-006'])
+        with self.assertRaises(FileNotFoundError):
+            pe.load('missing')
+
+    def test_stats(self):
+        pe.save(self.datasets)
+        self.assertEqual(pe.stats(as_dict=True), {'total': 9, 'categories': {'salud-27': 9, 'educacion-15': 3}})
+
+    def test_resave_replaces_categories(self):
+        pe.save(self.datasets)
+        self.datasets[0].categories = ['salud-27']
+        pe.save(self.datasets[0])
+        self.assertEqual(pe.stats(as_dict=True)['categories']['educacion-15'], 2)
+
+    def test_missing_index_is_rebuilt(self):
+        pe.save(self.datasets)
+        os.remove(os.path.join(self.folder, 'catalog.db'))
+        self.assertEqual(pe.load('dataset-001').id, 'id-001')
+        self.assertEqual(pe.stats(as_dict=True)['total'], 9)
+
+    def test_rebuild_picks_up_unindexed_folders(self):
+        pe.save(self.datasets[:2])
+        folder = os.path.join(self.folder, 'id-100')
+        os.makedirs(folder)
+        record = make_local_dataset(100, [{'name': 'vivienda-4'}]).to_dict()
+        with open(os.path.join(folder, 'id-100.json'), 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+        self.assertEqual(pe.rebuild_index(), 3)
+        self.assertEqual(pe.load_by_category('vivienda-4')[0].id, 'id-100')
+
+    def test_old_schema_is_rebuilt(self):
+        pe.save(self.datasets)
+        with sqlite3.connect(os.path.join(self.folder, 'catalog.db')) as connection:
+            connection.execute('PRAGMA user_version = 1')
+        self.assertEqual(pe.stats(as_dict=True)['total'], 9)
+
+    def test_cli_rebuild(self):
+        pe.save(self.datasets)
+        os.remove(os.path.join(self.folder, 'catalog.db'))
+        with mock.patch('builtins.print') as printed:
+            main(['rebuild', '--base-folder', self.folder])
+        printed.assert_called_once()
+        self.assertEqual(CatalogIndex(self.folder).stats()['total'], 9)
+
+
+class TestLazyDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'datasets')
+        self.patch = mock.patch.object(module, 'DATASETS_DIR', self.folder)
+        self.patch.start()
+        self.dataset = make_local_dataset(1, ['salud-27', {'name': 'vivienda-4'}])
+        self.dataset.metadata['result'][0]['resources'] = [
+            {'name': 'datos', 'format': 'CSV', 'url': 'https://example.org/datos.csv'}]
+        self.dataset.data_dictionary = 'id\tIdentificador'
+        pe.save(self.dataset)
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_load_returns_lazy_datasets(self):
+        dataset = pe.load()[0]
+        self.assertIsInstance(dataset, LazyDataset)
+        self.assertFalse(dataset.loaded)
+        self.assertEqual(dataset.title, 'Dataset 1')
+        self.assertEqual(dataset.categories, ['salud-27', {'name': 'vivienda-4'}])
+        self.assertNotIn('metadata', vars(dataset))
+        self.assertFalse(dataset.loaded)
+
+    def test_metadata_is_read_on_access(self):
+        dataset = pe.load_by_category('vivienda-4')[0]
+        self.assertEqual(list(dataset.get_files_dict()), ['datos'])
+        self.assertTrue(dataset.loaded)
+        self.assertEqual(dataset.data_dictionary, 'id\tIdentificador')
+
+    def test_round_trip_matches_eager_load(self):
+        lazy = pe.load('dataset-001')
+        eager = pe.load('dataset-001', lazy=False)
+        self.assertNotIsInstance(eager, LazyDataset)
+        self.assertEqual(lazy.to_dict(), eager.to_dict())
+        self.assertEqual(lazy.to_dict(), self.dataset.to_dict())
+
+    def test_assigned_metadata_is_kept(self):
+        dataset = pe.load('id-001')
+        dataset.metadata = {'result': []}
+        self.assertEqual(dataset.to_dict()['metadata'], {'result': []})
+        self.assertEqual(dataset.data_dictionary, 'id\tIdentificador')
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'datasets')
+        self.patch = mock.patch.object(module, 'DATASETS_DIR', self.folder)
+        self.patch.start()
+        self.datasets = [make_local_dataset(i, ['salud-27', {'name': 'vivienda-4'}]) for i in range(20)]
+        self.datasets[3].title = 'Padrón de vacunación – 2024'
+        self.datasets[3].dialects = {'datos.csv': {'encoding': 'cp1252', 'sep': ';'}}
+        self.path = os.path.join(self.folder, 'catalog.jsonl.gz')
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        pe.save(iter(self.datasets), format='jsonl')
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 20)
+        self.assertEqual(os.listdir(self.folder), ['catalog.jsonl.gz'])
+        loaded = pe.load()
+        self.assertEqual([d.to_dict() for d in loaded], [d.to_dict() for d in self.datasets])
+        self.assertEqual(pe.load('dataset-003').title, 'Padrón de vacunación – 2024')
+        with self.assertRaises(FileNotFoundError):
+            pe.load('missing')
+
+    def test_lookup_stops_at_the_match(self):
+        pe.save(self.datasets, format='jsonl')
+        read = []
+        iter_records = snapshot.iter_records
+
+        def record_reads(path):
+            for record in iter_records(path):
+                read.append(record['id'])
+                yield record
+
+        with mock.patch.object(snapshot, 'iter_records', record_reads):
+            self.assertEqual(pe.load('id-004').id, 'id-004')
+        self.assertEqual(read, ['id-000', 'id-001', 'id-002', 'id-003', 'id-004'])
+
+    def test_serializers_agree(self):
+        path = os.path.join(self.tmp.name, 'stdlib.jsonl.gz')
+        with mock.patch.object(snapshot, 'orjson', None):
+            pe.save(self.datasets, format='jsonl', path=path)
+        pe.save(self.datasets, format='jsonl', path=self.path)
+        with mock.patch.object(snapshot, 'orjson', None):
+            from_orjson = [d.to_dict() for d in pe.load(path=self.path)]
+        self.assertEqual([d.to_dict() for d in pe.load(path=path)], from_orjson)
+
+    def test_index_is_preferred_over_snapshot(self):
+        pe.save(self.datasets[:2], format='jsonl')
+        pe.save(self.datasets[5])
+        self.assertEqual([d.id for d in pe.load()], ['id-005'])
+        self.assertEqual(len(pe.load(path=self.path)), 2)
+
+    def test_stats_and_categories_read_the_snapshot(self):
+        pe.save(self.datasets, format='jsonl')
+        self.assertEqual(pe.stats(as_dict=True), {'total': 20, 'categories': {'salud-27': 20, 'vivienda-4': 20}})
+        self.assertEqual(len(pe.load_by_category('vivienda-4')), 20)
+        self.assertEqual(pe.load_by_category('educacion-15'), [])
+        self.assertEqual(len(pe.load()), 20)
+        self.assertEqual(os.listdir(self.folder), ['catalog.jsonl.gz'])
+
+    def test_empty_index_does_not_hide_the_snapshot(self):
+        pe.save(self.datasets, format='jsonl')
+        CatalogIndex(self.folder).connect().close()
+        self.assertEqual(pe.stats(as_dict=True)['total'], 20)
+        self.assertEqual(len(pe.load()), 20)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            pe.save(self.datasets, format='xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import openpe as pe
+from openpe import Dataset, module
+from openpe.page import DatasetPage, ListingPage, lxml
+
+from portal import Portal, make_dataset
+
+
+class TestCrawl(unittest.TestCase):
+
+    def setUp(self):
+        self.portal = Portal.generate(count=25, categories=('salud-27',)).start()
+        self.patch = self.portal.patch_module()
+
+    def tearDown(self):
+        self.patch.close()
+        self.portal.stop()
+
+    def test_get_datasets_sequential(self):
+        datasets = pe.get_datasets('salud-27', show_progress=False)
+        self.assertEqual(len(datasets), 25)
+        self.assertIsInstance(datasets[0], Dataset)
+        self.assertEqual(datasets[0].title, 'Dataset 00000')
+        self.assertEqual(datasets[0].categories, ['salud-27'])
+        self.assertTrue(datasets[0].metadata['result'][0]['resources'])
+
+    def test_get_datasets_workers_keep_page_order(self):
+        expected = [d.id for d in pe.get_datasets('salud-27', show_progress=False)]
+        datasets = pe.get_datasets('salud-27', show_progress=False, workers=8)
+        self.assertEqual([d.id for d in datasets], expected)
+
+    def test_get_datasets_workers_completion_order(self):
+        expected = {d.id for d in pe.get_datasets('salud-27', show_progress=False)}
+        datasets = pe.get_datasets('salud-27', show_progress=False, workers=8, ordered=False)
+        self.assertEqual({d.id for d in datasets}, expected)
+
+    def test_get_datasets_workers_limit(self):
+        datasets = pe.get_datasets('salud-27', limit=13, show_progress=False, workers=4)
+        self.assertEqual(len(datasets), 13)
+        expanded = sum(hits for path, hits in self.portal.hits.items() if path.startswith('/dataset/'))
+        self.assertEqual(expanded, 13)
+
+    def test_get_datasets_workers_as_iterator(self):
+        iterator = pe.get_datasets('salud-27', limit=5, show_progress=False, as_iterator=True, workers=4)
+        self.assertNotIsInstance(iterator, list)
+        self.assertEqual(len(list(iterator)), 5)
+
+    def test_api_backend_matches_scrape_backend(self):
+        scraped = pe.get_datasets('salud-27', show_progress=False)
+        fetched = pe.get_datasets('salud-27', show_progress=False, backend='api', rows=10)
+        self.assertEqual(len(fetched), 25)
+        fields = ('id', 'title', 'description', 'categories', 'url', 'modified_date', 'release_date', 'publisher')
+        for a, b in zip(scraped, fetched):
+            self.assertEqual([getattr(a, f) for f in fields], [getattr(b, f) for f in fields])
+            self.assertEqual(a.metadata['result'], b.metadata['result'])
+        search_calls = self.portal.hits['/api/3/action/package_search']
+        self.assertEqual(search_calls, 3)
+        self.assertEqual(self.portal.hits['/api/3/action/package_show'], 25)  # scrape backend only
+
+    def test_api_backend_limit_and_start_page(self):
+        fetched = pe.get_datasets('salud-27', show_progress=False, backend='api', rows=10, limit=4, start_page=2)
+        expected = [d['id'] for d in self.portal.in_category('salud-27')[10:14]]
+        self.assertEqual([d.id for d in fetched], expected)
+
+    def listing_hits(self):
+        return self.portal.hits['/search/field_topic/salud-27/type/dataset']
+
+    def test_start_page_is_addressed_directly(self):
+        datasets = pe.get_datasets('salud-27', show_progress=False, start_page=3)
+        self.assertEqual([d.id for d in datasets], [d['id'] for d in self.portal.in_category('salud-27')[20:]])
+        self.assertEqual(self.listing_hits(), 1)
+
+    def test_end_page(self):
+        datasets = pe.get_datasets('salud-27', show_progress=False, start_page=2, end_page=2)
+        self.assertEqual([d.id for d in datasets], [d['id'] for d in self.portal.in_category('salud-27')[10:20]])
+        self.assertEqual(self.listing_hits(), 1)
+        api = pe.get_datasets('salud-27', show_progress=False, backend='api', rows=5, start_page=3, end_page=4)
+        self.assertEqual([d.id for d in api], [d.id for d in datasets])
+
+    def test_page_workers(self):
+        expected = [d.id for d in pe.get_datasets('salud-27', show_progress=False)]
+        self.portal.hits.clear()
+        self.portal.delay = 0.02
+        datasets = pe.get_datasets('salud-27', show_progress=False, page_workers=3)
+        self.assertEqual([d.id for d in datasets], expected)
+        self.assertEqual(self.listing_hits(), 4)  # Three shards and the probe for the last page
+        self.assertGreater(self.portal.max_active, 1)
+        unordered = pe.get_datasets('salud-27', show_progress=False, page_workers=2, ordered=False, limit=12)
+        self.assertEqual(len(unordered), 12)
+
+    def test_page_workers_stop_early(self):
+        self.portal.delay = 0.02
+        iterator = pe.get_datasets('salud-27', show_progress=False, page_workers=3, as_iterator=True)
+        self.assertEqual(len([next(iterator), next(iterator)]), 2)
+        iterator.close()
+        expanded = sum(hits for path, hits in self.portal.hits.items() if path.startswith('/dataset/'))
+        self.assertLess(expanded, 10)
+
+    def test_page_workers_unreachable_listing(self):
+        with mock.patch.object(module.scraper, 'get_response', return_value=None), \
+                mock.patch('builtins.print') as printed:
+            self.assertEqual(pe.get_datasets('salud-27', show_progress=False), [])
+            self.assertEqual(pe.get_datasets('salud-27', show_progress=False, page_workers=3), [])
+        self.assertEqual(printed.call_count, 2)
+
+    def test_api_page_workers(self):
+        expected = [d.id for d in pe.get_datasets('salud-27', show_progress=False, backend='api', rows=4)]
+        datasets = pe.get_datasets('salud-27', show_progress=False, backend='api', rows=4, page_workers=3)
+        self.assertEqual([d.id for d in datasets], expected)
+
+
+class TestAllDatasets(unittest.TestCase):
+
+    def setUp(self):
+        datasets = [make_dataset(f'dataset-{index:02d}', categories, index=index) for index, categories in enumerate(
+            [['salud-27'], ['salud-27', 'educacion-15'], ['educacion-15'], ['salud-27', 'educacion-15', 'vivienda-4']]
+            * 6)]
+        self.portal = Portal(datasets).start()
+        self.patch = self.portal.patch_module()
+
+    def tearDown(self):
+        self.patch.close()
+        self.portal.stop()
+
+    def test_each_dataset_is_expanded_once(self):
+        datasets = pe.get_all_datasets(['salud-27', 'educacion-15', 'vivienda-4'], workers=4, show_progress=False)
+        self.assertEqual(sorted(d.title for d in datasets), sorted(d['title'] for d in self.portal.datasets))
+        expanded = [hits for path, hits in self.portal.hits.items() if path.startswith('/dataset/')]
+        self.assertEqual(expanded, [1] * 24)
+        by_title = {d.title: d for d in datasets}
+        self.assertEqual(by_title['Dataset 03'].categories, ['salud-27', 'educacion-15', 'vivienda-4'])
+        self.assertEqual(by_title['Dataset 02'].categories, ['educacion-15'])
+
+    def test_api_backend(self):
+        datasets = pe.get_all_datasets(['salud-27', 'educacion-15', 'vivienda-4'], backend='api', show_progress=False)
+        self.assertEqual(len(datasets), 24)
+        self.assertEqual(self.portal.hits['/api/3/action/package_show'], 0)
+        by_title = {d.title: d for d in datasets}
+        self.assertEqual(sorted(by_title['Dataset 07'].categories), ['educacion-15', 'salud-27', 'vivienda-4'])
+
+    def test_listing_categories_are_merged(self):
+        with mock.patch.object(module, '_parse_dataset_page', return_value=([], None)), \
+                mock.patch('builtins.print'):
+            datasets = pe.get_all_datasets(['salud-27', 'educacion-15'], show_progress=False)
+        by_url = {d.url: d for d in datasets}
+        self.assertEqual(by_url['/dataset/dataset-01'].categories, ['salud-27', 'educacion-15'])
+
+
+class TestSyncCategory(unittest.TestCase):
+
+    def setUp(self):
+        self.portal = Portal.generate(count=25, categories=('salud-27',)).start()
+        self.patch = self.portal.patch_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'datasets')
+        self.folder_patch = mock.patch.object(module, 'DATASETS_DIR', self.folder)
+        self.folder_patch.start()
+        pe.save(pe.get_datasets('salud-27', show_progress=False))
+        # Two datasets change and a new one is published
+        for index, dataset in enumerate(self.portal.datasets[10:12]):
+            dataset['modified'] = f'2024-07-0{index + 1}T00:00:00'
+        self.portal.datasets.append(dict(make_dataset('nuevo', ['salud-27']), modified='2024-07-05T00:00:00'))
+        self.portal.hits.clear()
+
+    def tearDown(self):
+        self.folder_patch.stop()
+        self.patch.close()
+        self.portal.stop()
+        self.tmp.cleanup()
+
+    def test_only_changed_datasets_are_expanded(self):
+        result = pe.sync_category('salud-27')
+        self.assertEqual([d.title for d in result['new']], ['Nuevo'])
+        self.assertEqual([d.title for d in result['updated']], ['Dataset 00011', 'Dataset 00010'])
+        self.assertEqual(result['checked'], 4)
+        expanded = sum(hits for path, hits in self.portal.hits.items() if path.startswith('/dataset/'))
+        self.assertEqual(expanded, 4)
+        self.assertEqual(pe.load('dataset-00010').modified_date, '2024-07-01T00:00:00')
+        self.assertEqual(pe.stats(as_dict=True)['total'], 26)
+        self.assertEqual(pe.sync_category('salud-27')['checked'], 1)
+
+    def test_api_backend(self):
+        result = pe.sync_category('salud-27', backend='api')
+        self.assertEqual(len(result['new'] + result['updated']), 3)
+        self.assertEqual(self.portal.hits['/api/3/action/package_search'], 1)
+        self.assertEqual(self.portal.hits['/api/3/action/package_show'], 0)
+
+    def test_download_changed_datasets(self):
+        result = pe.sync_category('salud-27', download=True, show_progress=False)
+        for dataset in result['new'] + result['updated']:
+            self.assertTrue(os.path.isfile(os.path.join(self.folder, dataset.id, f'{dataset.metadata["result"][0]["name"]}.csv')))
+        downloaded = sum(hits for path, hits in self.portal.hits.items() if path.startswith('/resources/'))
+        self.assertEqual(downloaded, 3)
+
+
+class TestPages(unittest.TestCase):
+
+    portal = Portal.generate(count=25, categories=('salud-27',))
+
+    def test_listing_page(self):
+        page = ListingPage(self.portal.render_listing('salud-27', 0).encode('utf-8'))
+        self.assertEqual(len(page.items), 10)
+        self.assertEqual(page.items[0]['url'], '/dataset/dataset-00000')
+        self.assertEqual(page.items[0]['topic'], 'Salud')
+        self.assertEqual(page.items[0]['organization'], 'Ministerio de Salud')
+        self.assertEqual(page.next_page_url, '/search/field_topic/salud-27/type/dataset?sort_by=changed&page=1')
+        self.assertEqual(page.last_page, 3)
+        last = ListingPage(self.portal.render_listing('salud-27', 2))
+        self.assertEqual(len(last.items), 5)
+        self.assertIsNone(last.next_page_url)
+        self.assertIsNone(last.last_page)
+
+    def test_dataset_page(self):
+        dataset = self.portal.datasets[0]
+        page = DatasetPage(self.portal.render_dataset(dataset).encode('utf-8'))
+        self.assertEqual(page.category_ids, ['salud-27'])
+        self.assertTrue(page.json_url.endswith(f'package_show?id={dataset["id"]}'))
+
+    @unittest.skipIf(lxml is None, "lxml is not installed")
+    def test_backends_agree(self):
+        listing = self.portal.render_listing('salud-27', 1).encode('utf-8')
+        fast, slow = ListingPage(listing, backend='lxml'), ListingPage(listing, backend='html.parser')
+        self.assertEqual(fast.items, slow.items)
+        self.assertEqual(fast.next_page_url, slow.next_page_url)
+        self.assertEqual(fast.last_page, slow.last_page)
+        detail = self.portal.render_dataset(self.portal.datasets[3]).encode('utf-8')
+        fast, slow = DatasetPage(detail, backend='lxml'), DatasetPage(detail, backend='html.parser')
+        self.assertEqual((fast.category_ids, fast.json_url), (slow.category_ids, slow.json_url))
+
+    def test_results_outside_the_listing_are_ignored(self):
+        teaser = ('<aside><article class="node-search-result"><h2 class="node-title">'
+                  '<a href="/dataset/destacado">Destacado</a></h2></article></aside>')
+        listing = self.portal.render_listing('salud-27', 1).replace('</body>', f'{teaser}</body>')
+        backends = ['html.parser'] + (['lxml'] if lxml is not None else [])
+        for backend in backends:
+            items = ListingPage(listing, backend=backend).items
+            self.assertEqual(len(items), 10)
+            self.assertNotIn('/dataset/destacado', [item['url'] for item in items])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,528 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+
+import openpe as pe
+from openpe import Dataset, FrameCache, LazyDataset, WebScraper, module, readers
+from openpe.framecache import pyarrow
+from openpe.sniff import sniff_csv
+
+from portal import Portal, make_dataset
+
+tempfile_mkstemp = tempfile.mkstemp
+
+
+class TestDownloads(unittest.TestCase):
+
+    def setUp(self):
+        rows = '\n'.join(f'{i},nombre {i},{i * 3}' for i in range(5000))
+        self.content = f'id,nombre,valor\n{rows}\n'.encode('utf-8')
+        resources = [{'name': 'grande.csv', 'format': 'CSV', 'content': self.content}]
+        self.portal = Portal([make_dataset('grande', ['salud-27'], resources=resources)]).start()
+        self.patch = self.portal.patch_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f'{self.portal.url}/resources/grande/grande.csv'
+
+    def tearDown(self):
+        self.patch.close()
+        self.portal.stop()
+        self.tmp.cleanup()
+
+    def test_download_streams_to_file(self):
+        path = os.path.join(self.tmp.name, 'grande.csv')
+        response = WebScraper().download(self.url, path, chunk_size=1024)
+        self.assertEqual(response.status_code, 200)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertFalse(os.path.exists(path + '.part'))
+
+    def test_download_resumes_partial_file(self):
+        path = os.path.join(self.tmp.name, 'grande.csv')
+        with open(path + '.part', 'wb') as f:
+            f.write(self.content[:1000])
+        response = WebScraper().download(self.url, path)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.portal.request_headers['/resources/grande/grande.csv']['Range'], 'bytes=1000-')
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_download_complete_partial_file(self):
+        path = os.path.join(self.tmp.name, 'grande.csv')
+        with open(path + '.part', 'wb') as f:
+            f.write(self.content)
+        WebScraper().download(self.url, path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_download_stale_partial_file(self):
+        path = os.path.join(self.tmp.name, 'grande.csv')
+        with open(path + '.part', 'wb') as f:
+            f.write(self.content + b'0,sobrante,0\n')
+        response = WebScraper().download(self.url, path)
+        self.assertEqual(response.status_code, 200)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertFalse(os.path.exists(path + '.part'))
+
+    def test_concurrent_downloads_of_one_file(self):
+        path = os.path.join(self.tmp.name, 'grande.csv')
+        self.portal.delay = 0.02
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(lambda _: WebScraper().download(self.url, path, chunk_size=1024), range(4)))
+        self.assertEqual([r.status_code for r in responses], [200] * 4)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_download_files_and_remote_data(self):
+        dataset = pe.get_dataset('grande')
+        df = dataset.data(cache=False)
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertEqual(len(df), 5000)
+        dataset.download_files(base_folder=self.tmp.name)
+        with open(os.path.join(self.tmp.name, dataset.id, 'grande.csv'), 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_iter_remote_data(self):
+        dataset = pe.get_dataset('grande')
+        created = []
+
+        def mkstemp(*args, **kwargs):
+            created.append(tempfile_mkstemp(*args, **kwargs))
+            return created[-1]
+
+        with mock.patch('tempfile.mkstemp', mkstemp):
+            chunks = list(dataset.iter_data(chunksize=1200, cache=False))
+        self.assertEqual([len(chunk) for chunk in chunks], [1200, 1200, 1200, 1200, 200])
+        self.assertEqual(list(chunks[0].columns), ['id', 'nombre', 'valor'])
+        self.assertEqual(pd.concat(chunks)['valor'].sum(), sum(i * 3 for i in range(5000)))
+        self.assertEqual(len(created), 1)
+        self.assertFalse(os.path.exists(created[0][1]))
+
+    def test_data_all_downloads_every_resource(self):
+        dataset = pe.get_dataset('grande')
+        dataset.metadata['result'][0]['resources'].append(dict(dataset.metadata['result'][0]['resources'][0], name='copia'))
+        df = dataset.data_all(cache_dir=self.tmp.name)
+        self.assertEqual(len(df), 10000)
+        self.assertEqual(sorted(df['source_file'].unique()), ['copia', 'grande.csv'])
+        # Both resources share a URL, so it was stored (and fetched) once
+        self.assertEqual(self.portal.hits['/resources/grande/grande.csv'], 1)
+
+    def test_data_all_failed_download_leaves_no_files(self):
+        dataset = pe.get_dataset('grande')
+        resource = dataset.metadata['result'][0]['resources'][0]
+        dataset.metadata['result'][0]['resources'].append(dict(resource, name='falta', url=resource['url'] + '.bak'))
+        created = []
+
+        def mkstemp(*args, **kwargs):
+            created.append(tempfile_mkstemp(*args, **kwargs))
+            return created[-1]
+
+        with mock.patch('tempfile.mkstemp', mkstemp), self.assertRaises(ValueError):
+            dataset.data_all(cache=False, workers=1)
+        self.assertEqual(len(created), 2)
+        self.assertFalse([path for _, path in created if os.path.exists(path)])
+
+    def test_remote_data_is_cached(self):
+        dataset = pe.get_dataset('grande')
+        first = dataset.data(cache_dir=self.tmp.name)
+        self.assertEqual(self.portal.hits['/resources/grande/grande.csv'], 1)
+        second = pe.get_dataset('grande').data(cache_dir=self.tmp.name)
+        self.assertEqual(self.portal.hits['/resources/grande/grande.csv'], 1)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(len(list(dataset.iter_data(chunksize=2000, cache_dir=self.tmp.name))), 3)
+        self.assertEqual(self.portal.hits['/resources/grande/grande.csv'], 1)
+        folder = os.path.join(self.tmp.name, dataset.id, '.resources')
+        self.assertEqual(len([name for name in os.listdir(folder) if name.endswith('.csv')]), 1)
+
+    def test_cached_resource_is_revalidated_by_last_modified(self):
+        dataset = pe.get_dataset('grande')
+        dataset.data(cache_dir=self.tmp.name)
+        resource = dataset.metadata['result'][0]['resources'][0]
+        resource['last_modified'] = '2030-01-01T00:00:00'
+        dataset.data(cache_dir=self.tmp.name)
+        self.assertEqual(self.portal.hits['/resources/grande/grande.csv'], 2)
+        dataset.data(cache_dir=self.tmp.name)
+        self.assertEqual(self.portal.hits['/resources/grande/grande.csv'], 2)
+
+
+class TestDownloadScheduler(unittest.TestCase):
+
+    def setUp(self):
+        datasets = []
+        for i in range(3):
+            resources = [
+                {'name': f'parte-{j}.csv', 'format': 'CSV', 'content': (f'{i},{j}\n' * 2500).encode('utf-8')}
+                for j in range(2)
+            ]
+            datasets.append(make_dataset(f'serie-{i}', ['salud-27'], index=i, resources=resources))
+        self.portal = Portal(datasets).start()
+        self.patch = self.portal.patch_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.datasets = [pe.get_dataset(f'serie-{i}') for i in range(3)]
+
+    def tearDown(self):
+        self.patch.close()
+        self.portal.stop()
+        self.tmp.cleanup()
+
+    def test_downloads_every_resource(self):
+        report = pe.download_datasets(self.datasets, workers=4, base_folder=self.tmp.name, show_progress=False)
+        self.assertEqual(report['completed'], 6)
+        self.assertEqual(report['failed'], 0)
+        self.assertEqual(report['bytes'], 6 * 10000)
+        self.assertGreater(report['throughput'], 0)
+        for dataset in self.datasets:
+            folder = os.path.join(self.tmp.name, dataset.id)
+            self.assertEqual(sorted(os.listdir(folder)), sorted([f'{dataset.id}.json', 'parte-0.csv', 'parte-1.csv']))
+        for stats in report['files']:
+            self.assertTrue(stats['ok'])
+            self.assertEqual(stats['bytes'], 10000)
+
+    def test_per_host_limit(self):
+        self.portal.delay = 0.05
+        pe.download_datasets(self.datasets, workers=6, per_host=2, base_folder=self.tmp.name, show_progress=False)
+        self.assertLessEqual(self.portal.max_active, 2)
+
+    def test_bandwidth_budget(self):
+        report = pe.download_datasets(self.datasets, workers=6, per_host=6, bandwidth=30000,
+                                      base_folder=self.tmp.name, show_progress=False)
+        # The first second of budget is available at once, the rest is paced
+        self.assertGreaterEqual(report['seconds'], 0.9)
+
+    def test_resumed_downloads_count_transferred_bytes(self):
+        folder = os.path.join(self.tmp.name, self.datasets[0].id)
+        os.makedirs(folder)
+        with open(os.path.join(folder, 'parte-0.csv.part'), 'wb') as f:
+            f.write(b'0,0\n' * 2000)
+        with open(os.path.join(folder, 'parte-1.csv.part'), 'wb') as f:
+            f.write(b'0,1\n' * 2500)
+        report = pe.download_datasets(self.datasets[0], base_folder=self.tmp.name, show_progress=False)
+        files = {stats['file']: stats for stats in report['files']}
+        self.assertEqual(files['parte-0.csv']['status'], 206)
+        self.assertEqual(files['parte-0.csv']['bytes'], 2000)
+        self.assertEqual(files['parte-1.csv']['status'], 416)
+        self.assertEqual(files['parte-1.csv']['bytes'], 0)
+        self.assertEqual([stats['size'] for stats in files.values()], [10000, 10000])
+        self.assertEqual(report['bytes'], 2000)
+
+
+class SavedDatasetTestCase(unittest.TestCase):
+    """Base for tests on datasets saved to a temporary DATASETS_DIR."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'datasets')
+        self.patch = mock.patch.object(module, 'DATASETS_DIR', self.folder)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def save_dataset(self, dataset_id, title, category='salud-27', metadata=None):
+        pe.save(Dataset(dataset_id, title, '', [category], '', '', '', '', metadata or {'result': []}))
+
+
+class TestCsvDialect(SavedDatasetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        rows = ''.join(f'{i};Año {i};Perú;{i},5\n' for i in range(3000))
+        self.content = f'id;nombre;país;valor\n{rows}'.encode('latin1')
+        self.save_dataset('d1', 'Consumo', metadata={'result': [{'name': 'consumo'}]})
+        self.path = os.path.join(self.folder, 'd1', 'consumo.csv')
+        with open(self.path, 'wb') as f:
+            f.write(self.content)
+
+    def test_sniff_from_sample(self):
+        self.assertEqual(sniff_csv(self.path, sample_size=4096), {'encoding': 'cp1252', 'sep': ';'})
+
+    def test_sniff_checks_the_whole_file_span(self):
+        path = os.path.join(self.tmp.name, 'mixed.csv')
+        with open(path, 'wb') as f:
+            f.write(b'a,b\n' + b'1,2\n' * 5000 + 'ñ,3\n'.encode('latin1'))
+        self.assertEqual(sniff_csv(path, sample_size=1024)['encoding'], 'cp1252')
+
+    def test_sniff_utf8_bom_and_tabs(self):
+        path = os.path.join(self.tmp.name, 'tabs.csv')
+        with open(path, 'wb') as f:
+            f.write('\ufeffa\tb\nñ\t1\n'.encode('utf-8'))
+        self.assertEqual(sniff_csv(path), {'encoding': 'utf-8-sig', 'sep': '\t'})
+
+    def test_dialect_is_persisted_and_reused(self):
+        with mock.patch('pandas.read_csv', wraps=pd.read_csv) as read_csv:
+            df = pe.load('d1').data(cache=False)
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertEqual(list(df.columns), ['id', 'nombre', 'país', 'valor'])
+        self.assertEqual(df['nombre'][1], 'Año 1')
+        self.assertEqual(len(df), 3000)
+
+        dataset = pe.load('d1')
+        self.assertEqual(dataset.dialects, {'consumo.csv': {'encoding': 'cp1252', 'sep': ';'}})
+        with mock.patch('openpe.readers.sniff_csv', side_effect=AssertionError('sniffed again')), \
+                mock.patch('pandas.read_csv', wraps=pd.read_csv) as read_csv:
+            self.assertEqual(len(dataset.data(cache=False)), 3000)
+        self.assertEqual(read_csv.call_count, 1)
+
+    def test_eager_dataset_uses_the_datasets_folder(self):
+        dataset = pe.load('d1', lazy=False)
+        self.assertNotIsInstance(dataset, LazyDataset)
+        self.assertEqual(len(dataset.data(cache=False)), 3000)
+        self.assertEqual(pe.load('d1').dialects, {'consumo.csv': {'encoding': 'cp1252', 'sep': ';'}})
+        self.assertFalse(os.path.exists(os.path.join('datasets', 'd1')))
+
+    def test_wrong_stored_dialect_is_replaced(self):
+        dataset = pe.load('d1')
+        dataset.dialects = {'consumo.csv': {'encoding': 'utf-8', 'sep': ','}}
+        self.assertEqual(list(dataset.data(cache=False).columns), ['id', 'nombre', 'país', 'valor'])
+        self.assertEqual(pe.load('d1').dialects['consumo.csv'], {'encoding': 'cp1252', 'sep': ';'})
+
+
+class TestIterData(SavedDatasetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.save_dataset('d1', 'Casos')
+        self.frame = pd.DataFrame({'id': range(2500), 'distrito': [f'Distrito {i % 7}' for i in range(2500)],
+                                   'casos': [i % 13 for i in range(2500)]})
+
+    def path(self, name):
+        return os.path.join(self.folder, 'd1', name)
+
+    def assert_chunks(self, filename, expected):
+        chunks = list(pe.load('d1').iter_data(filename, chunksize=1000))
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected, check_dtype=False)
+
+    def test_csv_chunks(self):
+        self.frame.to_csv(self.path('casos.csv'), sep=';', index=False, encoding='latin1')
+        self.assert_chunks('casos.csv', self.frame)
+        self.assertEqual(pe.load('d1').dialects['casos.csv'], {'encoding': 'utf-8', 'sep': ';'})
+
+    def test_xlsx_chunks(self):
+        self.frame.to_excel(self.path('casos.xlsx'), index=False)
+        self.assert_chunks('casos.xlsx', pd.read_excel(self.path('casos.xlsx')))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_chunks(self):
+        self.frame.to_parquet(self.path('casos.parquet'))
+        self.assert_chunks('casos.parquet', self.frame)
+
+    def test_json_chunks(self):
+        self.frame.to_json(self.path('casos.json'))
+        self.assert_chunks('casos.json', pd.read_json(self.path('casos.json')))
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            next(pe.load('d1').iter_data())
+
+
+class TestDataAll(SavedDatasetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.save_dataset('d1', 'Atenciones')
+        for month in range(1, 4):
+            columns = 'id;distrito;atenciones' + (';observacion' if month == 3 else '')
+            rows = ''.join(f'{i};Distrito {i % 5};{i * month}' + (';ok' if month == 3 else '') + '\n'
+                           for i in range(100 * month))
+            with open(os.path.join(self.folder, 'd1', f'atenciones-2024-0{month}.csv'), 'w', encoding='latin1') as f:
+                f.write(f'{columns}\n{rows}')
+
+    def test_concatenates_every_file(self):
+        with mock.patch('openpe.dataset.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            df = pe.load('d1').data_all(workers=2)
+        pool.assert_called_once_with(max_workers=2)
+        self.assertEqual(len(df), 600)
+        self.assertEqual(list(df.columns), ['id', 'distrito', 'atenciones', 'observacion', 'source_file'])
+        self.assertEqual(df['source_file'].value_counts().to_dict(), {
+            'atenciones-2024-03.csv': 300, 'atenciones-2024-02.csv': 200, 'atenciones-2024-01.csv': 100})
+        self.assertEqual(df['observacion'].isna().sum(), 300)
+        self.assertEqual(pe.load('d1').dialects['atenciones-2024-02.csv'], {'encoding': 'utf-8', 'sep': ';'})
+
+    def test_inner_join_and_no_source_column(self):
+        df = pe.load('d1').data_all(workers=1, join='inner', source_column=None)
+        self.assertEqual(list(df.columns), ['id', 'distrito', 'atenciones'])
+        self.assertEqual(df.index.tolist(), list(range(600)))
+
+    def test_all_files_flag(self):
+        pd.testing.assert_frame_equal(pe.load('d1').data(all_files=True), pe.load('d1').data_all())
+
+
+class TestExcel(SavedDatasetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.save_dataset('d1', 'Padrón')
+        self.path = os.path.join(self.folder, 'd1', 'padron.xlsx')
+        with pd.ExcelWriter(self.path) as writer:
+            pd.DataFrame({'id': range(50), 'distrito': [f'Distrito {i % 7}' for i in range(50)]}).to_excel(
+                writer, sheet_name='2023', index=False)
+            pd.DataFrame({'id': range(80), 'monto': [i / 4 for i in range(80)]}).to_excel(
+                writer, sheet_name='2024', index=False)
+
+    def test_uses_fast_engine(self):
+        with mock.patch('pandas.read_excel', wraps=pd.read_excel) as read_excel:
+            df = pe.load('d1').data(cache=False)
+        self.assertEqual(list(df.columns), ['id', 'distrito'])
+        self.assertEqual(read_excel.call_args.kwargs.get('engine'), readers.EXCEL_ENGINE)
+
+    def test_sheet_and_nrows(self):
+        df = pe.load('d1').data(sheet_name='2024', nrows=10, cache=False)
+        self.assertEqual(df.shape, (10, 2))
+        self.assertEqual(df['monto'].tolist()[-1], 2.25)
+        self.assertEqual(pe.load('d1').data(sheet_name=1, cache=False).shape, (80, 2))
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_sheets_are_cached_separately(self):
+        first = pe.load('d1').data()
+        second = pe.load('d1').data(sheet_name='2024')
+        frames = os.path.join(self.folder, 'd1', '.frames')
+        self.assertTrue(os.path.isfile(os.path.join(frames, 'padron.xlsx.parquet')))
+        self.assertTrue(os.path.isfile(os.path.join(frames, 'padron.xlsx.sheet-2024.parquet')))
+        with mock.patch.object(Dataset, '_load_file_as_dataframe', side_effect=AssertionError('parsed')):
+            pd.testing.assert_frame_equal(pe.load('d1').data(), first)
+            pd.testing.assert_frame_equal(pe.load('d1').data(sheet_name='2024'), second)
+            # Partial reads are parsed, never served from or stored in the cache
+            with self.assertRaises(AssertionError):
+                pe.load('d1').data(nrows=5)
+
+    def test_csv_nrows(self):
+        with open(os.path.join(self.folder, 'd1', 'padron.csv'), 'w', encoding='utf-8') as f:
+            f.write('id;nombre\n' + ''.join(f'{i};fila {i}\n' for i in range(100)))
+        df = pe.load('d1').data('padron.csv', nrows=3)
+        self.assertEqual(df['nombre'].tolist(), ['fila 0', 'fila 1', 'fila 2'])
+        self.assertEqual(len(pe.load('d1').data('padron.csv')), 100)
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowBackend(SavedDatasetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.save_dataset('d1', 'Padrón')
+        self.frame = pd.DataFrame({'id': range(200), 'distrito': [f'Distrito Ñ{i % 7}' for i in range(200)],
+                                   'monto': [i / 4 for i in range(200)]})
+
+    def path(self, name):
+        return os.path.join(self.folder, 'd1', name)
+
+    def assert_arrow(self, df):
+        for dtype in df.dtypes:
+            self.assertIsInstance(dtype, pd.ArrowDtype)
+        self.assertEqual(df['distrito'].tolist(), self.frame['distrito'].tolist())
+        self.assertEqual(df['monto'].tolist(), self.frame['monto'].tolist())
+
+    def test_csv_with_pyarrow_engine(self):
+        self.frame.to_csv(self.path('padron.csv'), sep=';', index=False, encoding='latin1')
+        # The sample is too small to see the accents, pyarrow's binary columns force a re-detection
+        with mock.patch('openpe.readers.sniff_csv', return_value={'encoding': 'utf-8', 'sep': ';'}):
+            self.assert_arrow(pe.load('d1').data(cache=False, dtype_backend='pyarrow'))
+        self.assertEqual(pe.load('d1').dialects['padron.csv']['encoding'], 'cp1252')
+
+    def test_parquet_is_memory_mapped(self):
+        self.frame.to_parquet(self.path('padron.parquet'))
+        with mock.patch('pandas.read_parquet', wraps=pd.read_parquet) as read_parquet:
+            self.assert_arrow(pe.load('d1').data(dtype_backend='pyarrow'))
+        self.assertTrue(read_parquet.call_args.kwargs['memory_map'])
+
+    def test_numpy_nullable(self):
+        self.frame.to_csv(self.path('padron.csv'), index=False)
+        df = pe.load('d1').data(cache=False, dtype_backend='numpy_nullable')
+        self.assertEqual(str(df['id'].dtype), 'Int64')
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestFrameCache(SavedDatasetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for dataset_id, category in (('d1', 'salud-27'), ('d2', 'salud-27'), ('d3', 'educacion-15')):
+            self.save_dataset(dataset_id, dataset_id, category)
+            with open(os.path.join(self.folder, dataset_id, 'datos.csv'), 'w', encoding='utf-8') as f:
+                f.write('id,nombre\n' + ''.join(f'{i},fila {i}\n' for i in range(100)))
+        self.path = os.path.join(self.folder, 'd1', 'datos.csv')
+
+    def parses(self, dataset):
+        with mock.patch.object(Dataset, '_load_file_as_dataframe', autospec=True,
+                               side_effect=Dataset._load_file_as_dataframe) as load:
+            df = dataset.data()
+        return df, load.call_count
+
+    def test_second_load_reads_the_cache(self):
+        first, parsed = self.parses(pe.load('d1'))
+        self.assertEqual(parsed, 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, 'd1', '.frames', 'datos.csv.parquet')))
+        second, parsed = self.parses(pe.load('d1'))
+        self.assertEqual(parsed, 0)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_changed_source_is_parsed_again(self):
+        pe.load('d1').data()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('100,fila 100\n')
+        df, parsed = self.parses(pe.load('d1'))
+        self.assertEqual(parsed, 1)
+        self.assertEqual(len(df), 101)
+
+    def test_touched_source_is_checked_by_hash(self):
+        pe.load('d1').data()
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.parses(pe.load('d1'))[1], 0)
+        with open(self.path, 'r+', encoding='utf-8') as f:
+            f.seek(len('id,nombre\n'))
+            f.write('9')  # Same size, different content
+        df, parsed = self.parses(pe.load('d1'))
+        self.assertEqual(parsed, 1)
+        self.assertEqual(df['id'][0], 9)
+
+    def test_cache_can_be_bypassed(self):
+        pe.load('d1').data()
+        self.assertEqual(pe.load('d1').data(cache=False).shape, (100, 2))
+        with mock.patch.object(FrameCache, 'get', side_effect=AssertionError('cache read')):
+            pe.load('d1').data(cache=False)
+
+    def test_prewarm_category(self):
+        self.assertEqual(pe.prewarm_cache('salud-27', workers=2, show_progress=False),
+                         {'cached': 2, 'up_to_date': 0, 'failed': 0})
+        self.assertEqual(pe.prewarm_cache('salud-27', show_progress=False),
+                         {'cached': 0, 'up_to_date': 2, 'failed': 0})
+        self.assertFalse(os.path.exists(os.path.join(self.folder, 'd3', '.frames')))
+        self.assertEqual(self.parses(pe.load('d2'))[1], 0)
+
+    def test_prewarm_rewrites_metadata_atomically(self):
+        for index in range(8):
+            with open(os.path.join(self.folder, 'd1', f'parte-{index}.csv'), 'w', encoding='utf-8') as f:
+                f.write('id;nombre\n' + ''.join(f'{i};fila {i}\n' for i in range(100)))
+        self.assertEqual(pe.prewarm_cache('salud-27', workers=4, show_progress=False)['failed'], 0)
+        self.assertEqual([name for name in os.listdir(os.path.join(self.folder, 'd1')) if name.endswith('.tmp')], [])
+        with open(os.path.join(self.folder, 'd1', 'd1.json'), encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['dialects']), 9)
+
+    def test_backends_are_cached_separately(self):
+        numpy_frame = pe.load('d1').data()
+        arrow_frame = pe.load('d1').data(dtype_backend='pyarrow')
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, 'd1', '.frames', 'datos.csv.pyarrow.parquet')))
+        cached, parsed = self.parses(pe.load('d1'))
+        self.assertEqual(parsed, 0)
+        self.assertFalse(isinstance(cached['nombre'].dtype, pd.ArrowDtype))
+        pd.testing.assert_frame_equal(cached, numpy_frame)
+        with mock.patch.object(Dataset, '_load_file_as_dataframe', side_effect=AssertionError('parsed')):
+            cached = pe.load('d1').data(dtype_backend='pyarrow')
+        self.assertIsInstance(cached['nombre'].dtype, pd.ArrowDtype)
+        pd.testing.assert_frame_equal(cached, arrow_frame)
+
+    def test_feather_format(self):
+        cache = FrameCache(os.path.join(self.folder, 'd1'), format='feather')
+        df = cache.load(self.path, pd.read_csv)
+        pd.testing.assert_frame_equal(cache.get(self.path), df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import openpe as pe
+from openpe import Dataset, dictionary, module
+from openpe.dictionary import parse_dictionary
+
+from portal import Portal, make_dataset
+
+
+def dictionary_xlsx(rows):
+    buffer = io.BytesIO()
+    pd.DataFrame(rows, columns=['Variable', 'Descripción']).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+class TestDataDictionary(unittest.TestCase):
+
+    def setUp(self):
+        content = dictionary_xlsx([
+            ('id', 'Identificador del registro'),
+            ('distrito', '  Distrito   de residencia\ndel paciente '),
+            ('nota', None),
+        ])
+        resources = [
+            {'name': 'casos.csv', 'format': 'CSV', 'content': b'id,distrito\n1,Lima\n'},
+            {'name': 'Diccionario de Datos', 'format': 'XLSX', 'content': content},
+        ]
+        self.portal = Portal([make_dataset('casos', ['salud-27'], resources=resources)]).start()
+        self.patch = self.portal.patch_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, 'datasets')
+        self.folder_patch = mock.patch.object(module, 'DATASETS_DIR', self.folder)
+        self.folder_patch.start()
+        self.path = '/resources/casos/Diccionario de Datos'
+        dictionary.clear_cache()
+
+    def tearDown(self):
+        self.folder_patch.stop()
+        self.patch.close()
+        self.portal.stop()
+        self.tmp.cleanup()
+
+    def test_repr_makes_no_requests(self):
+        dataset = pe.get_dataset('casos')
+        repr(dataset)
+        dataset.to_json()
+        self.assertIsNone(dataset.data_dictionary)
+        self.assertEqual(self.portal.hits[self.path], 0)
+
+    def test_structured_dictionary(self):
+        dataset = pe.get_dataset('casos')
+        self.assertEqual(dataset.get_data_dictionary(),
+                         'id\tIdentificador del registro\ndistrito\tDistrito de residencia del paciente')
+        self.assertEqual(dataset.column_descriptions(), {
+            'id': 'Identificador del registro', 'distrito': 'Distrito de residencia del paciente'})
+        self.assertEqual(list(dataset.data_dictionary_frame().columns), ['column', 'description'])
+        self.assertEqual(self.portal.hits[self.path], 1)
+
+    def test_dictionary_is_saved_with_the_dataset(self):
+        pe.save(pe.get_dataset('casos'))
+        dataset = pe.load('casos')
+        self.assertEqual(dataset.column_descriptions()['id'], 'Identificador del registro')
+        with open(os.path.join(self.folder, dataset.id, f'{dataset.id}.json'), encoding='utf-8') as f:
+            self.assertTrue(json.load(f)['data_dictionary'].startswith('id\t'))
+        self.assertEqual(pe.load('casos').column_descriptions()['id'], 'Identificador del registro')
+        self.assertEqual(self.portal.hits[self.path], 1)
+
+    def test_module_and_dataset_agree(self):
+        dataset = pe.get_dataset('casos')
+        url = module.get_data_dictionary_url(dataset.metadata)
+        self.assertEqual(module.get_data_dictionary(url), dataset.get_data_dictionary())
+
+    def test_missing_dictionary(self):
+        dataset = Dataset('d1', '', '', [], '', '', '', '', {'result': [{'resources': []}]})
+        self.assertIsNone(dataset.get_data_dictionary())
+        self.assertEqual(dataset.column_descriptions(), {})
+
+    def test_parse_aligned_text(self):
+        # Dictionaries saved by older versions were aligned with spaces
+        frame = parse_dictionary('id       Identificador\nPDF data dictionary available at: x')
+        self.assertEqual(frame.values.tolist(), [['id', 'Identificador']])
+
+
+class TestFetchDataDictionaries(unittest.TestCase):
+
+    def setUp(self):
+        datasets = []
+        for index in range(6):
+            content = dictionary_xlsx([('id', f'Identificador {index}')])
+            resources = [{'name': 'datos.csv', 'format': 'CSV', 'content': b'id\n1\n'},
+                         {'name': 'Diccionario de datos', 'format': 'XLSX', 'content': content}]
+            datasets.append(make_dataset(f'dataset-{index}', ['salud-27'], index=index, resources=resources))
+        self.portal = Portal(datasets).start()
+        self.patch = self.portal.patch_module()
+        dictionary.clear_cache()
+        self.datasets = [pe.get_dataset(f'dataset-{index}') for index in range(6)]
+        # The first three datasets share the dictionary of dataset-0
+        shared = self.datasets[0].metadata['result'][0]['resources'][1]['url']
+        for dataset in self.datasets[1:3]:
+            dataset.metadata['result'][0]['resources'][1]['url'] = shared
+
+    def tearDown(self):
+        self.patch.close()
+        self.portal.stop()
+
+    def dictionary_hits(self):
+        return sum(count for path, count in self.portal.hits.items() if path.endswith('/Diccionario de datos'))
+
+    def test_fetches_each_file_once(self):
+        self.portal.delay = 0.05
+        pe.fetch_data_dictionaries(self.datasets, workers=4, show_progress=False)
+        self.assertEqual(self.dictionary_hits(), 4)
+        self.assertGreater(self.portal.max_active, 1)
+        self.assertEqual([d.column_descriptions()['id'] for d in self.datasets], [
+            'Identificador 0', 'Identificador 0', 'Identificador 0',
+            'Identificador 3', 'Identificador 4', 'Identificador 5'])
+        self.assertEqual(self.dictionary_hits(), 4)
+
+    def test_parsed_dictionaries_are_reused(self):
+        pe.fetch_data_dictionaries(self.datasets[:3], show_progress=False)
+        fresh = pe.get_dataset('dataset-0')
+        self.assertEqual(fresh.get_data_dictionary(), 'id\tIdentificador 0')
+        pe.fetch_data_dictionaries(self.datasets, show_progress=False)
+        self.assertEqual(self.dictionary_hits(), 4)
+        pe.fetch_data_dictionaries(self.datasets, refresh=True, show_progress=False)
+        self.assertEqual(self.dictionary_hits(), 8)
+
+    def test_failed_download(self):
+        self.portal.fail_next('/resources/dataset-5/Diccionario de datos', 404)
+        with mock.patch('builtins.print'):
+            pe.fetch_data_dictionaries(self.datasets[5], show_progress=False)
+        self.assertIsNone(self.datasets[5].data_dictionary)
+
+
+if __name__ == '__main__':
+    unittest.main()
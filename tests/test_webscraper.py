@@ -0,0 +1,203 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import openpe as pe
+from openpe import RateLimiter, ResponseCache, WebScraper, configure_session, get_session
+from openpe.ratelimit import parse_retry_after
+
+from portal import Portal, make_dataset
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.portal = Portal.generate(count=3).start()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.portal.stop()
+        self.tmp.cleanup()
+
+    def test_fresh_entries_skip_the_network(self):
+        scraper = WebScraper(cache=ResponseCache(self.tmp.name, ttl=60))
+        url = f'{self.portal.url}/dataset/dataset-00000'
+        first = scraper.get_response(url)
+        second = scraper.get_response(url)
+        self.assertEqual(first.content, second.content)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 1)
+        self.assertEqual(scraper.cache.stats()['hits'], 1)
+        self.assertEqual(scraper.cache.stats()['misses'], 1)
+
+    def test_stale_entries_are_revalidated(self):
+        scraper = WebScraper(cache=ResponseCache(self.tmp.name, ttl=0))
+        url = f'{self.portal.url}/dataset/dataset-00000'
+        first = scraper.get_response(url)
+        second = scraper.get_response(url)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 2)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(scraper.cache.stats()['revalidated'], 1)
+
+    def test_entry_evicted_before_revalidation(self):
+        cache = ResponseCache(self.tmp.name, ttl=0)
+        scraper = WebScraper(cache=cache)
+        url, other_url = (f'{self.portal.url}/dataset/dataset-0000{i}' for i in range(2))
+        first = scraper.get_response(url)
+        other = WebScraper().get_response(other_url)
+        get = cache.get
+
+        def get_then_evict(lookup_url):
+            # Another thread stores a response that pushes this entry out
+            result = get(lookup_url)
+            cache.max_size = len(other.content)
+            cache.update(other_url, other)
+            return result
+
+        with mock.patch.object(cache, 'get', get_then_evict):
+            second = scraper.get_response(url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 3)
+        self.assertEqual(cache.stats()['revalidated'], 0)
+
+    def test_cache_persists_across_instances(self):
+        url = f'{self.portal.url}/dataset/dataset-00000'
+        WebScraper(cache=ResponseCache(self.tmp.name, ttl=60)).get_response(url)
+        scraper = WebScraper(cache=ResponseCache(self.tmp.name, ttl=60))
+        self.assertTrue(scraper.get_response(url).from_cache)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 1)
+
+    def test_url_pattern_ttls(self):
+        cache = ResponseCache(self.tmp.name, ttl=0, ttls={r'/api/3/action/': 3600})
+        self.assertEqual(cache.ttl_for(f'{self.portal.url}/api/3/action/package_show?id=x'), 3600)
+        self.assertEqual(cache.ttl_for(f'{self.portal.url}/dataset/x'), 0)
+
+    def test_lru_eviction(self):
+        scraper = WebScraper(cache=ResponseCache(self.tmp.name, ttl=60))
+        urls = [f'{self.portal.url}/dataset/dataset-0000{i}' for i in range(3)]
+        sizes = [len(scraper.get_response(url).content) for url in urls[:2]]
+        scraper.cache.max_size = sum(sizes)
+        scraper.get_response(urls[0])  # urls[1] becomes least recently used
+        scraper.get_response(urls[2])
+        stats = scraper.cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertLessEqual(stats['size'], scraper.cache.max_size)
+        scraper.get_response(urls[1])
+        self.assertEqual(self.portal.hits['/dataset/dataset-00001'], 2)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.portal = Portal.generate(count=3).start()
+        self.url = f'{self.portal.url}/dataset/dataset-00000'
+
+    def tearDown(self):
+        self.portal.stop()
+
+    def test_token_bucket_paces_requests(self):
+        scraper = WebScraper(rate_limiter=RateLimiter(rate=20, burst=1))
+        start = time.monotonic()
+        for _ in range(6):
+            scraper.get_response(self.url)
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_retry_after_is_honored(self):
+        limiter = RateLimiter(rate=100)
+        scraper = WebScraper(rate_limiter=limiter)
+        self.portal.fail_next('/dataset/dataset-00000', 429, headers={'Retry-After': '1'})
+        start = time.monotonic()
+        response = scraper.get_response(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 2)
+        self.assertEqual(limiter.throttled, 1)
+
+    def test_backs_off_and_recovers(self):
+        limiter = RateLimiter(rate=100, recovery=0.25)
+        scraper = WebScraper(rate_limiter=limiter)
+        self.portal.fail_next('/dataset/dataset-00000', 503, 503)
+        scraper.get_response(self.url)
+        self.assertLess(limiter.rate, 100)
+        for _ in range(4):
+            scraper.get_response(self.url)
+        self.assertEqual(limiter.rate, 100)
+
+    def test_gives_up_after_max_retries(self):
+        scraper = WebScraper(rate_limiter=RateLimiter(rate=100, max_retries=1, max_wait=0.01))
+        self.portal.fail_next('/dataset/dataset-00000', 429, 429, 429)
+        self.assertEqual(scraper.get_response(self.url).status_code, 429)
+        self.assertEqual(self.portal.hits['/dataset/dataset-00000'], 2)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertAlmostEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+
+
+class RecordingSession(requests.Session):
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def request(self, method, url, *args, **kwargs):
+        self.urls.append(url)
+        return super().request(method, url, *args, **kwargs)
+
+
+class TestSharedSession(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = get_session()
+
+    def tearDown(self):
+        configure_session(self.previous)
+
+    def test_scrapers_share_one_session(self):
+        sessions = []
+        threads = [threading.Thread(target=lambda: sessions.append(WebScraper().session)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual({id(session) for session in sessions}, {id(get_session())})
+        own = requests.Session()
+        self.assertIs(WebScraper(session=own).session, own)
+
+    def test_configure_pool_and_retries(self):
+        session = configure_session(pool_maxsize=4, retries=1, keep_alive=False)
+        adapter = session.get_adapter('https://www.datosabiertos.gob.pe')
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 1)
+        self.assertEqual(adapter.max_retries.status, 0)  # 429/503 are left to the rate limiter
+        self.assertEqual(session.headers['Connection'], 'close')
+        self.assertIs(WebScraper().session, session)
+
+    def test_injected_session_serves_every_path(self):
+        content = b'id,nombre\n1,Lima\n'
+        resources = [{'name': 'datos.csv', 'format': 'CSV', 'content': content},
+                     {'name': 'Diccionario de datos', 'format': 'TXT', 'content': b'id\tIdentificador'}]
+        with Portal([make_dataset('casos', ['salud-27'], resources=resources)]) as portal, portal.patch_module(), \
+                tempfile.TemporaryDirectory() as folder:
+            session = configure_session(RecordingSession())
+            dataset = pe.get_dataset('casos')
+            dataset.data(cache=False)
+            dataset.get_data_dictionary()
+            dataset.download_files(base_folder=folder, max_size=1000)
+            pe.module.get_data_dictionary(f'{portal.url}/resources/casos/Diccionario de datos')
+        paths = [url.replace(portal.url, '') for url in session.urls]
+        self.assertIn('/dataset/casos', paths)
+        self.assertEqual(paths.count('/resources/casos/datos.csv'), 3)  # data(), size check and download
+        self.assertEqual(paths.count('/resources/casos/Diccionario de datos'), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()